@@ -0,0 +1,115 @@
+from typing import Any, Callable, Dict, List, Mapping
+
+import numpy as np
+import pandas as pd
+
+from OutputParsers import TARGET_SERVICES
+
+
+class EfficiencyMetrics:
+    """
+    Energy-efficiency metrics derived from the parsed measurements and the Locust stats of a run.
+
+    Every metric is registered (`register`) as a formula over named inputs, which are run table columns. Formulas are
+    plain NumPy arithmetic on arrays, so a definition is evaluated the same way for one run (`per_run`), for a whole
+    run table at once (`evaluate` on a DataFrame, e.g. `data/run_table.csv`), and for every second of a run
+    (`per_second`, which maps the per-second series onto the same inputs: the power of a second is its energy,
+    its requests are its throughput). A metric whose inputs are missing, or whose denominator is zero, is NaN.
+    """
+    # metric column -> (input columns, formula taking one float64 array per input)
+    metrics: Dict[str, tuple] = {}
+
+    # Per-second series metric -> run table column it stands for over a one-second window
+    series_inputs = {
+        'PACKAGE_POWER (W)': 'PACKAGE_ENERGY (J)',
+        'DRAM_POWER (W)': 'DRAM_ENERGY (J)',
+        'requests': 'requests',
+        'failures': 'failures',
+        'latency_p50': 'latency_p50',
+        'latency_p95': 'latency_p95',
+        **{f"{service}_power (W)": f"{service}_energy_joules" for service in TARGET_SERVICES},
+    }
+
+    @classmethod
+    def register(cls, name: str, inputs: List[str]) -> Callable:
+        """Decorator declaring the metric `name`, computed by the decorated formula from `inputs`."""
+        def decorator(formula: Callable) -> Callable:
+            cls.metrics[name] = (inputs, formula)
+            return formula
+        return decorator
+
+    @classmethod
+    def data_columns(cls) -> list:
+        return list(cls.metrics)
+
+    @staticmethod
+    def _array(values) -> np.ndarray:
+        # Run table rows read back from the CSV hold strings, and '' for a missing value
+        return pd.to_numeric(pd.Series(np.atleast_1d(values)), errors='coerce').to_numpy(dtype=np.float64)
+
+    @classmethod
+    def evaluate(cls, inputs: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """Every registered metric over `inputs` (column -> scalar or array, e.g. a DataFrame), element-wise."""
+        arrays = {column: cls._array(inputs[column]) for column in
+                  {column for columns, _ in cls.metrics.values() for column in columns} if column in inputs}
+        length = max((len(array) for array in arrays.values()), default=1)
+        missing = np.full(length, np.nan)
+        results = {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for name, (columns, formula) in cls.metrics.items():
+                result = np.asarray(formula(*(arrays.get(column, missing) for column in columns)), dtype=np.float64)
+                results[name] = np.where(np.isfinite(result), result, np.nan)
+        return results
+
+    @classmethod
+    def per_run(cls, row: Mapping[str, Any]) -> Dict[str, float]:
+        return {name: float(values[0]) for name, values in cls.evaluate(row).items()}
+
+    @classmethod
+    def complete(cls, row: Mapping[str, Any]) -> Dict[str, Any]:
+        """`row` with the metrics computed from it."""
+        return {**row, **cls.per_run(row)}
+
+    @classmethod
+    def per_second(cls, series: pd.DataFrame) -> pd.DataFrame:
+        """The metrics of every second of a run's per-second series (second, metric, value), in the same form."""
+        wide = series[series['metric'].isin(cls.series_inputs)].pivot_table(index='second', columns='metric', values='value')
+        if wide.empty:
+            return pd.DataFrame(columns=['second', 'metric', 'value'])
+        inputs = {cls.series_inputs[metric]: wide[metric].to_numpy() for metric in wide}
+        inputs['window_duration'] = np.ones(len(wide))
+        metrics = pd.DataFrame(cls.evaluate(inputs), index=wide.index).rename_axis('second').reset_index()
+        return metrics.melt(id_vars='second', var_name='metric', value_name='value').dropna(subset=['value'])
+
+
+def _span(run_time, window_duration):
+    """Seconds the energy columns cover: the measurement window if there is one, else the whole run."""
+    return np.where(np.isnan(window_duration), run_time, window_duration)
+
+
+@EfficiencyMetrics.register('mean_power_watts', ['PACKAGE_ENERGY (J)', 'DRAM_ENERGY (J)', 'run_time', 'window_duration'])
+def mean_power(package, dram, run_time, window_duration):
+    return (package + dram) / _span(run_time, window_duration)
+
+
+@EfficiencyMetrics.register('joules_per_request', ['PACKAGE_ENERGY (J)', 'DRAM_ENERGY (J)', 'requests'])
+def joules_per_request(package, dram, requests):
+    return (package + dram) / requests
+
+
+@EfficiencyMetrics.register('joules_per_successful_request', ['PACKAGE_ENERGY (J)', 'DRAM_ENERGY (J)', 'requests', 'failures'])
+def joules_per_successful_request(package, dram, requests, failures):
+    return (package + dram) / (requests - failures)
+
+
+for _service in TARGET_SERVICES:
+    # Each load type exercises one service, so this is the energy of its endpoint's requests
+    EfficiencyMetrics.register(f'{_service}_joules_per_request', [f'{_service}_energy_joules', 'requests'])(
+        lambda energy, requests: energy / requests
+    )
+
+
+@EfficiencyMetrics.register('energy_delay_product', ['PACKAGE_ENERGY (J)', 'DRAM_ENERGY (J)', 'requests', 'latency_p95'])
+def energy_delay_product(package, dram, requests, latency_p95):
+    """Energy per request times its tail latency, in J*s: lower is better on both counts."""
+    return (package + dram) / requests * latency_p95 / 1000
@@ -1,81 +1,438 @@
 from ProgressManager.Output.OutputProcedure import OutputProcedure as output
 
+import atexit
+import hashlib
+import os
+import select
+import shutil
+import socket
+import subprocess
+import tarfile
+import threading
 import time
 import paramiko
 from os import getenv, path
 from dotenv import load_dotenv
+from paramiko.channel import ChannelFile, ChannelStderrFile, ChannelStdinFile
 from scp import SCPClient
+from PhaseTracer import PhaseTracer
 load_dotenv()
 
+# "local" runs the testbed commands on this machine, e.g. against the stand-in testbed (standin/standin_testbed.py)
+LOCAL_BACKEND = getenv("GL3_BACKEND", "ssh").lower() == "local"
+
+class SSHConnectionPool:
+    """
+    Process-wide pool of authenticated SSH connections, one per (host, key).
+    Every ExternalMachineAPI borrows the pooled client and opens its own channels on the shared transport,
+    so a hook creating several API objects pays for a single TCP + key-auth handshake.
+    """
+    KEEPALIVE_INTERVAL = 30     # seconds
+    HEALTH_CHECK_INTERVAL = 5   # seconds between active probes of an idle transport
+
+    _lock = threading.Lock()
+    _clients = {}               # (hostname, key_filename) -> paramiko.SSHClient
+    _last_checked = {}          # (hostname, key_filename) -> time.monotonic() of the last successful probe
+
+    @classmethod
+    def get_client(cls, hostname: str, key_filename: str) -> paramiko.SSHClient:
+        """Return a connected client for the host, reconnecting if the pooled transport is no longer healthy."""
+        key = (hostname, key_filename)
+        with cls._lock:
+            client = cls._clients.get(key)
+            if client is not None and cls._is_healthy(key, client):
+                return client
+            if client is not None:
+                output.console_log_WARNING(f"SSH connection to {hostname} lost, reconnecting...")
+                cls._close_quietly(client)
+            client = cls._connect(hostname, key_filename)
+            cls._clients[key] = client
+            cls._last_checked[key] = time.monotonic()
+            return client
+
+    @classmethod
+    def invalidate(cls, client: paramiko.SSHClient) -> None:
+        """Drop a client from the pool so the next `get_client` call opens a fresh connection."""
+        with cls._lock:
+            for key, pooled in list(cls._clients.items()):
+                if pooled is client:
+                    del cls._clients[key]
+                    cls._last_checked.pop(key, None)
+            cls._close_quietly(client)
+
+    @classmethod
+    def close_all(cls) -> None:
+        with cls._lock:
+            for client in cls._clients.values():
+                cls._close_quietly(client)
+            cls._clients.clear()
+            cls._last_checked.clear()
+
+    @classmethod
+    def _reset_after_fork(cls) -> None:
+        # A forked child inherits the parent's sockets but not its transport threads.
+        # Forget them without sending a disconnect, which would tear down the parent's session.
+        cls._lock = threading.Lock()
+        cls._clients = {}
+        cls._last_checked = {}
+
+    @staticmethod
+    def _connect(hostname: str, key_filename: str) -> paramiko.SSHClient:
+        with PhaseTracer.span("ssh.connect"):
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client.connect(hostname=hostname, key_filename=key_filename)
+            client.get_transport().set_keepalive(SSHConnectionPool.KEEPALIVE_INTERVAL)
+        return client
+
+    @classmethod
+    def _is_healthy(cls, key, client: paramiko.SSHClient) -> bool:
+        transport = client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        now = time.monotonic()
+        if now - cls._last_checked.get(key, 0.0) < cls.HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            # Cheap, reply-less packet: fails fast if the underlying socket is dead
+            transport.send_ignore()
+        except (paramiko.SSHException, EOFError, OSError):
+            return False
+        cls._last_checked[key] = now
+        return True
+
+    @staticmethod
+    def _close_quietly(client: paramiko.SSHClient) -> None:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+os.register_at_fork(after_in_child=SSHConnectionPool._reset_after_fork)
+atexit.register(SSHConnectionPool.close_all)
+
+READ_CHUNK_SIZE = 32768  # bytes per recv() on a ready channel
+COMMAND_TRACE_LENGTH = 80  # characters of a command kept in its phase trace span
+BUNDLE_MANIFEST = ".bundle.sha256"  # Checksum manifest, the first member of every bundle
+
+def _iter_channel_lines(streams: dict, timeout=None, buffers: dict = None):
+    """
+    Multiplex several remote stdout streams and yield `(key, line)` as soon as a full line is available.
+    Waits on channel readiness with select() instead of polling, reads in chunks and only scans new data for newlines.
+    Stops when every stream reached EOF, or when no stream produced stdout data for `timeout` seconds.
+    Partial lines are kept in `buffers` (key -> bytearray, filled in place), so a caller that stops iterating and
+    resumes later loses nothing. Data the stream's own file object buffered (readline()) is not seen here.
+    """
+    buffers = {} if buffers is None else buffers
+    channels = {}
+    for key, stream in streams.items():
+        channels[stream.channel] = key
+        buffers.setdefault(key, bytearray())
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while channels:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            return
+        # A paramiko channel is also readable when only stderr data arrived, or at EOF
+        ready, _, _ = select.select(list(channels), [], [], remaining)
+        for channel in ready:
+            key = channels[channel]
+            buffer = buffers[key]
+            if channel.recv_ready():
+                data = channel.recv(READ_CHUNK_SIZE)
+            elif channel.recv_stderr_ready():
+                # Not part of the lines; drained so the channel stops signalling readiness
+                while channel.recv_stderr_ready() and channel.recv_stderr(READ_CHUNK_SIZE):
+                    pass
+                continue
+            elif channel.eof_received:
+                data = b''
+            else:
+                continue
+            if not data:
+                # EOF: flush a trailing line that was not newline-terminated
+                if buffer:
+                    yield key, buffer.decode('utf-8', errors='replace').rstrip('\r')
+                    buffer.clear()
+                del channels[channel]
+                continue
+            if deadline is not None:
+                deadline = time.monotonic() + timeout
+            buffer += data
+            if b'\n' not in data:
+                continue
+            end = buffer.rindex(b'\n')
+            lines = buffer[:end].split(b'\n')
+            del buffer[:end + 1]
+            for line in lines:
+                yield key, line.decode('utf-8', errors='replace').rstrip('\r')
+
+class LocalChannel:
+    """
+    The part of a paramiko Channel that ExternalMachineAPI and its callers use, around a command running on this
+    machine (GL3_BACKEND=local). paramiko's channel files work on top of it, so callers get the same stdin, stdout
+    and stderr as for a remote command, and select() waits on the command's stdout pipe.
+    """
+    def __init__(self, process: subprocess.Popen):
+        self.process = process
+        self.closed = False
+        self.eof_received = False  # EOF shows as an empty recv(), as on a ready pipe
+
+    @classmethod
+    def exec_command(cls, command: str, env: dict, home: str):
+        """Run `command` with bash in `home` (also $HOME, with $HOME/bin first on the PATH), like a remote login."""
+        process = subprocess.Popen(
+            ["bash", "-c", command], cwd=home, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            env={**os.environ, "HOME": home, "PATH": f"{home}/bin:{os.environ.get('PATH', '')}", **env},
+            start_new_session=True,  # Like a remote command, it outlives an interrupted orchestrator
+        )
+        channel = cls(process)
+        return ChannelStdinFile(channel, "wb"), ChannelFile(channel, "r"), ChannelStderrFile(channel, "r")
+
+    def fileno(self) -> int:
+        return self.process.stdout.fileno()
+
+    @staticmethod
+    def _read(fd: int, nbytes: int) -> bytes:
+        while True:
+            try:
+                return os.read(fd, nbytes)
+            except BlockingIOError:
+                # Non-blocking pipe (gevent's subprocess, once locust is imported): wait until readable
+                select.select([fd], [], [])
+
+    def recv_ready(self) -> bool:
+        return self.closed or bool(select.select([self.process.stdout], [], [], 0)[0])
+
+    def recv_stderr_ready(self) -> bool:
+        return not self.closed and bool(select.select([self.process.stderr], [], [], 0)[0])
+
+    def recv(self, nbytes: int) -> bytes:
+        return b"" if self.closed else self._read(self.process.stdout.fileno(), nbytes)
+
+    def recv_stderr(self, nbytes: int) -> bytes:
+        return b"" if self.closed else self._read(self.process.stderr.fileno(), nbytes)
+
+    def sendall(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            try:
+                view = view[os.write(self.process.stdin.fileno(), view):]
+            except BlockingIOError:
+                select.select([], [self.process.stdin.fileno()], [])
+
+    def shutdown_write(self) -> None:
+        if not self.process.stdin.closed:
+            self.process.stdin.close()
+
+    def recv_exit_status(self) -> int:
+        return self.process.wait()
+
+    def exit_status_ready(self) -> bool:
+        return self.process.poll() is not None
+
+    def close(self) -> None:
+        # As with a closed SSH channel, the command gets SIGPIPE on its next write
+        self.closed = True
+        for pipe in (self.process.stdin, self.process.stdout, self.process.stderr):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
 class ExternalMachineAPI:
     """
     API to interact with external machine via SSH.
+    The underlying connection is shared process-wide through `SSHConnectionPool`;
+    each instance only owns the channels of the commands it executes.
+    With GL3_BACKEND=local the commands run on this machine instead, in GL3_LOCAL_HOME (see LocalChannel).
     This code is adapted from: https://github.com/S2-group/python-compilers-rep-pkg
     """
     def __init__(self):
-        self.ssh = paramiko.SSHClient()
-        self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.hostname = getenv("GL3_HOSTNAME")
+        self.key_filename = path.expanduser(getenv("GL3_KEY_PATH", ""))
+        self.local_home = path.expanduser(getenv("GL3_LOCAL_HOME") or "~") if LOCAL_BACKEND else None
+        self.ssh = None
 
         self.stdin = None
         self.stdout = None
         self.stderr = None
-        
+        self._line_stream = None
+        self._line_stream_source = None
+        self._line_buffer = bytearray()
+        self._line_buffer_source = None
+
+        if self.local_home is not None:
+            return
         try:
-            self.ssh.connect(
-                hostname=getenv("GL3_HOSTNAME"),
-                key_filename=path.expanduser(getenv("GL3_KEY_PATH")),
-            )
-            self.ssh.get_transport().set_keepalive(30)
+            self._client()
         except paramiko.SSHException:
             output.console_log_FAIL('Failed to send run command to machine!')
-            
+
+    def _client(self) -> paramiko.SSHClient:
+        """Fetch a healthy pooled client, transparently reconnecting if the transport was lost."""
+        self.ssh = SSHConnectionPool.get_client(self.hostname, self.key_filename)
+        return self.ssh
+
+    def _exec_command(self, command: str, env: dict, timeout=None):
+        # Times opening the channel and starting the command; its output is read by the caller's phase
+        with PhaseTracer.span("ssh.exec", command=command[:COMMAND_TRACE_LENGTH]):
+            if self.local_home is not None:
+                return LocalChannel.exec_command(command, env, self.local_home)
+            try:
+                return self._client().exec_command(command, environment=env, timeout=timeout)
+            except (paramiko.SSHException, EOFError):
+                # The pooled transport may have died between the health check and opening the channel: retry once
+                if self.ssh is not None:
+                    SSHConnectionPool.invalidate(self.ssh)
+                return self._client().exec_command(command, environment=env, timeout=timeout)
+
     def execute_remote_command(self, command : str = '', env : dict = {}, overwrite_channels : bool = True):
         try:
             # Execute the command
             if overwrite_channels:
-                self.stdin, self.stdout, self.stderr = self.ssh.exec_command(command,environment=env)
+                self.stdin, self.stdout, self.stderr = self._exec_command(command, env)
             else:
-                self.ssh.exec_command(command,environment=env, timeout=4200)
+                self._exec_command(command, env, timeout=4200)
         except paramiko.SSHException:
             output.console_log_FAIL('Failed to send run command to machine.')
         except TimeoutError:
             output.console_log_FAIL('Timeout reached while waiting for command output.')
 
     def copy_file_from_remote(self, remote_path, local_path):
-        # Create SSH client and SCP client
-        with SCPClient(self.ssh.get_transport()) as scp:
-            # Copy the file from remote to local
-            scp.get(remote_path, local_path, recursive=True)
+        with PhaseTracer.span("ssh.copy", file=path.basename(remote_path)):
+            if self.local_home is not None:
+                source = path.join(self.local_home, remote_path[2:]) if remote_path.startswith("~/") else remote_path
+                if path.isdir(source):
+                    shutil.copytree(source, local_path, dirs_exist_ok=True)
+                else:
+                    shutil.copy2(source, local_path)
+            else:
+                # Create SCP client on a new channel of the pooled connection
+                with SCPClient(self._client().get_transport()) as scp:
+                    # Copy the file from remote to local
+                    scp.get(remote_path, local_path, recursive=True)
+            if path.isfile(local_path):
+                PhaseTracer.add_bytes(path.getsize(local_path))
         output.console_log_OK(f"Copied {remote_path} to {local_path}")
 
-    def read_line_indefinitely(self):
-        buffer = ""
-        while True:
-            char = self.stdout.read(1).decode('utf-8')  # Read one byte at a time
-            if char:  # If data is received
-                buffer += char
-                if '\n' in buffer:  # Check if a full line has been read
-                    line, buffer = buffer.split('\n', 1)
-                    return line.strip()
-            else:
-                # Check if the stream is closed
-                if self.stdout.channel.exit_status_ready():
-                    break
-                # Optional: Add a small sleep to avoid busy loop
-                time.sleep(0.1)
+    def fetch_bundle(self, remote_dir: str, file_names: list, local_dir) -> dict:
+        """
+        Fetch several files of `remote_dir` into `local_dir` as one gzip-compressed tar stream over a single channel,
+        instead of one SCP session per file. The testbed puts a sha256 manifest first in the archive, and every file
+        is checked against it while it is written. Returns the checksums by file name.
+        Raises RuntimeError if the archive command fails or a file is missing or corrupt.
+        """
+        with PhaseTracer.span("ssh.bundle", files=len(file_names)):
+            return self._fetch_bundle(remote_dir, file_names, local_dir)
+
+    def _fetch_bundle(self, remote_dir: str, file_names: list, local_dir) -> dict:
+        names = " ".join(file_names)
+        command = (
+            f"bash -o pipefail -c 'cd {remote_dir} && sha256sum {names} > {BUNDLE_MANIFEST} && "
+            f"tar -cf - {BUNDLE_MANIFEST} {names} | gzip -1'"
+        )
+        _, stdout, stderr = self._exec_command(command, {})
+        expected, checksums = {}, {}
+        try:
+            self._extract_bundle(stdout, remote_dir, file_names, local_dir, expected, checksums)
+        except (tarfile.TarError, EOFError) as e:
+            error = e  # An empty or truncated stream: the exit status below tells why
+        else:
+            error = None
+        status = stdout.channel.recv_exit_status()
+        if status != 0 or error is not None:
+            raise RuntimeError(f"Bundling {remote_dir} failed (exit code {status}): "
+                               f"{stderr.read().decode().strip() or error}")
+        corrupt = [name for name in file_names if name not in checksums or checksums[name] != expected.get(name)]
+        if corrupt:
+            raise RuntimeError(f"Checksum mismatch for {', '.join(corrupt)} from {remote_dir}")
+        size = sum(path.getsize(path.join(local_dir, name)) for name in checksums)
+        PhaseTracer.add_bytes(size)
+        output.console_log_OK(f"Fetched {len(checksums)} files ({size / 1e6:.1f} MB) from {remote_dir} to {local_dir}")
+        return checksums
+
+    @staticmethod
+    def _extract_bundle(stdout, remote_dir: str, file_names: list, local_dir, expected: dict, checksums: dict):
+        with tarfile.open(fileobj=stdout, mode="r|gz") as archive:
+            for member in archive:
+                source = archive.extractfile(member)
+                if member.name == BUNDLE_MANIFEST:
+                    for line in source.read().decode().splitlines():
+                        digest, name = line.split(maxsplit=1)
+                        expected[name.lstrip("*")] = digest
+                    continue
+                if member.name not in file_names:
+                    raise RuntimeError(f"Unexpected file {member.name} in the bundle of {remote_dir}")
+                digest = hashlib.sha256()
+                with open(path.join(local_dir, member.name), "wb") as f:
+                    for chunk in iter(lambda: source.read(READ_CHUNK_SIZE), b""):
+                        digest.update(chunk)
+                        f.write(chunk)
+                checksums[member.name] = digest.hexdigest()
 
-        # If we exit the loop, no more data will be received
-        return None
+    def open_local_channel(self, port: int) -> paramiko.Channel:
+        """Open a channel to 127.0.0.1:`port` on the testbed (SSH direct-tcpip), e.g. to talk to a local-only service."""
+        if self.local_home is not None:
+            try:
+                return socket.create_connection(("127.0.0.1", port))
+            except ConnectionRefusedError:
+                raise paramiko.ChannelException(paramiko.common.OPEN_FAILED_CONNECT_FAILED, "Connection refused")
+        try:
+            return self._client().get_transport().open_channel("direct-tcpip", ("127.0.0.1", port), ("127.0.0.1", 0))
+        except paramiko.ChannelException:
+            raise  # Nothing listens on the port; the connection itself is fine
+        except (paramiko.SSHException, EOFError):
+            if self.ssh is not None:
+                SSHConnectionPool.invalidate(self.ssh)
+            return self._client().get_transport().open_channel("direct-tcpip", ("127.0.0.1", port), ("127.0.0.1", 0))
+
+    def iter_lines(self, stdout=None, timeout=None):
+        """
+        Yield complete lines from the stdout of the last executed command (or the given stdout) as they arrive.
+        Ends when the remote command closes its output, or after `timeout` seconds without new data.
+        A partial line left when iteration stops is kept for the next call on the same stdout.
+        """
+        stdout = stdout or self.stdout
+        if self._line_buffer_source is not stdout:
+            self._line_buffer, self._line_buffer_source = bytearray(), stdout
+        for _, line in _iter_channel_lines({None: stdout}, timeout, {None: self._line_buffer}):
+            yield line
+
+    def stream_commands(self, commands: dict, env : dict = {}, timeout=None):
+        """
+        Run several commands concurrently, each on its own channel of the pooled connection,
+        and yield `(name, line)` tuples in arrival order. `commands` maps a caller-chosen name to a command.
+        e.g. `for name, line in ssh.stream_commands({'power': 'tail -F power.log', 'temp': 'sensors -j'}): ...`
+        """
+        streams = {}
+        try:
+            for name, command in commands.items():
+                _, streams[name], _ = self._exec_command(command, env)
+            yield from _iter_channel_lines(streams, timeout)
+        finally:
+            for stream in streams.values():
+                stream.channel.close()
+
+    def read_line_indefinitely(self):
+        # Keep one line iterator per command so partially received lines survive between calls
+        if self._line_stream is None or self._line_stream_source is not self.stdout:
+            self._line_stream = self.iter_lines()
+            self._line_stream_source = self.stdout
+        line = next(self._line_stream, None)
+        # If the stream ended, no more data will be received
+        return line.strip() if line is not None else None
 
     def __del__(self):
+        # Only release this instance's channel; the connection itself stays pooled for the next caller
         if self.stdin:
             self.stdin.close()
         if self.stdout:
             self.stdout.close()
+            self.stdout.channel.close()
         if self.stderr:
             self.stderr.close()
-        if self.ssh:
-            self.ssh.close()
 
 if __name__ == "__main__":
     ssh = ExternalMachineAPI()
@@ -0,0 +1,593 @@
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+
+import math
+import re
+import json
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from RequestTimeSeries import RequestTimeSeries
+
+CPU_COUNT = 32
+RAPL_OVERFLOW_VALUE = 262143.328850 # Fallback wrap value in J, found via `cat /sys/class/powercap/intel-rapl:0/max_energy_range_uj` (in uJ)
+TARGET_SERVICES = ["media_service", "home_timeline_service", "compose_post_service"]
+
+class EnergibridgeOutputParser:
+    target_columns = ['TOTAL_MEMORY', 'TOTAL_SWAP', 'USED_MEMORY', 'USED_SWAP'] + [f'CPU_USAGE_{i}' for i in range(CPU_COUNT)] + [f'CPU_FREQUENCY_{i}' for i in range(CPU_COUNT)]
+
+    delta_target_columns = [
+        'DRAM_ENERGY (J)', 'PACKAGE_ENERGY (J)'
+    ]
+
+    # RAPL powercap zone name -> energy column it feeds in the EnergiBridge output
+    rapl_domain_columns = {
+        'package-0': 'PACKAGE_ENERGY (J)',
+        'dram': 'DRAM_ENERGY (J)',
+    }
+
+    # Prints "<zone name> <max_energy_range_uj>" for every RAPL zone of the testbed
+    RAPL_WRAP_VALUES_COMMAND = (
+        "for d in /sys/class/powercap/intel-rapl:*; do "
+        "echo \"$(cat $d/name) $(cat $d/max_energy_range_uj)\"; done 2>/dev/null"
+    )
+
+    # Rows per chunk when streaming the CSV: bounds memory use regardless of the file size
+    DEFAULT_CHUNKSIZE = 50_000
+    # Sample timestamp column, epoch milliseconds
+    TIME_COLUMN = 'Time'
+
+    @classmethod
+    def data_columns(cls) -> list:
+        return cls.target_columns + cls.delta_target_columns
+
+    @classmethod
+    def parse_wrap_values(cls, lines) -> dict:
+        """
+        Map the output of `RAPL_WRAP_VALUES_COMMAND` to the wrap value (in J) of each energy column.
+        Columns of domains that could not be sampled are left out and fall back to `RAPL_OVERFLOW_VALUE`.
+        """
+        wrap_values = {}
+        for line in lines:
+            name, _, value = line.strip().partition(' ')
+            column = cls.rapl_domain_columns.get(name)
+            if column is None:
+                continue
+            try:
+                wrap_values[column] = float(value) / 1e6  # uJ -> J
+            except ValueError:
+                continue
+        return wrap_values
+
+    @staticmethod
+    def unwrap_energy_counters(counters: np.ndarray, wrap_values: np.ndarray):
+        """
+        Undo RAPL wraparound on a (samples x domains) array of cumulative energy counters.
+        Every backwards step of a counter adds exactly one more wrap value to all later readings of that domain.
+        Motivation behind Section IV-B from https://arxiv.org/pdf/2401.15985
+        Returns the corrected counters and the (sample, domain) indices at which a wrap was detected.
+        """
+        wraps = np.diff(counters, axis=0) < 0
+        corrections = np.cumsum(wraps, axis=0) * wrap_values
+        unwrapped = counters.copy()
+        unwrapped[1:] += corrections
+        return unwrapped, np.argwhere(wraps)
+
+    @classmethod
+    def column_dtypes(cls) -> dict:
+        """Per-column dtypes: usage (%) and frequency (MHz) fit float32, byte and joule counters need float64."""
+        return {column: (np.float32 if column.startswith('CPU_') else np.float64) for column in cls.data_columns()}
+
+    @classmethod
+    def read_chunks(cls, file_path, chunksize: int = DEFAULT_CHUNKSIZE, coerce: bool = False, window: tuple = None):
+        """
+        Yield only the columns the parser needs, `chunksize` rows at a time (the whole file at once if None).
+        With `coerce`, malformed cells become NaN instead of failing the typed parse.
+        With `window` (epoch seconds, testbed clock), only the samples taken inside it.
+        """
+        wanted = set(cls.data_columns()) | ({cls.TIME_COLUMN} if window is not None else set())
+        dtypes = cls.column_dtypes()
+        reader = pd.read_csv(
+            file_path,
+            usecols=lambda column: column in wanted,
+            dtype=None if coerce else dtypes,
+            chunksize=chunksize,
+        )
+        for chunk in ([reader] if chunksize is None else reader):
+            if coerce:
+                chunk = chunk.apply(pd.to_numeric, errors='coerce').astype({c: t for c, t in dtypes.items() if c in chunk})
+            if window is not None:
+                seconds = chunk[cls.TIME_COLUMN] / 1000
+                chunk = chunk[(seconds >= window[0]) & (seconds <= window[1])]
+            yield chunk.reindex(columns=cls.data_columns())
+
+    @classmethod
+    def _aggregate(cls, chunks, wrap_values: dict) -> dict:
+        """Compute the column means and the overflow-corrected energy deltas in a single pass over the chunks."""
+        columns = cls.delta_target_columns
+        wrap_array = np.array([wrap_values.get(column, RAPL_OVERFLOW_VALUE) for column in columns])
+        sums = np.zeros(len(cls.target_columns))
+        counts = np.zeros(len(cls.target_columns), dtype=np.int64)
+        first = np.full(len(columns), np.nan)
+        last = np.full(len(columns), np.nan)
+        wraps = np.zeros(len(columns), dtype=np.int64)
+        rows = 0
+
+        for chunk in chunks:
+            # Calculate column-wise sums and counts, ignoring NaN values
+            values = chunk[cls.target_columns].to_numpy(dtype=np.float64)
+            sums += np.nansum(values, axis=0)
+            counts += np.count_nonzero(~np.isnan(values), axis=0)
+
+            # Account and mitigate potential RAPL overflow during metric collection.
+            # The last reading of the previous chunk is carried over so wraps on chunk boundaries are seen,
+            # and missing readings are bridged with the previous one so they never look like a wrap.
+            counters = np.vstack([last, chunk[columns].to_numpy(dtype=np.float64)])
+            counters = pd.DataFrame(counters).ffill().to_numpy()
+            _, overflows = cls.unwrap_energy_counters(counters, wrap_array)
+            for i, j in overflows:
+                output.console_log_WARNING(f"RAPL Overflow found in {columns[j]}:\nReading {rows + i - 1}: {counters[i, j]}\nReading {rows + i}: {counters[i + 1, j]}")
+            wraps += np.bincount(overflows[:, 1], minlength=len(columns))
+
+            valid = ~np.isnan(counters)
+            first_valid = counters[valid.argmax(axis=0), np.arange(len(columns))]
+            first = np.where(np.isnan(first), first_valid, first)
+            last = counters[-1]
+            rows += len(chunk)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averages = sums / counts
+        deltas = last - first + wraps * wrap_array
+        return dict(zip(cls.target_columns + columns, (averages.tolist() + deltas.tolist())))
+
+    @classmethod
+    def parse_output(cls, file_path, wrap_values: dict = None, chunksize: int = DEFAULT_CHUNKSIZE,
+                     window: tuple = None) -> dict:
+        """
+        Parses the energibridge CSV output file to compute average values for specified metrics
+        and deltas from start of experiment to finish (or over the samples inside `window`, see `read_chunks`).
+        `wrap_values` maps an energy column to the RAPL wrap value (in J) sampled from its domain's `max_energy_range_uj`.
+        The file is streamed `chunksize` rows at a time, so memory use does not grow with the trace length.
+        This code is adapted from: https://github.com/S2-group/python-compilers-rep-pkg
+        """
+        wrap_values = wrap_values or {}
+        try:
+            return cls._aggregate(cls.read_chunks(file_path, chunksize, window=window), wrap_values)
+        except ValueError:
+            output.console_log_WARNING(f"Non-numeric values in {file_path}, falling back to coercing parse.")
+            return cls._aggregate(cls.read_chunks(file_path, chunksize, coerce=True, window=window), wrap_values)
+
+    @classmethod
+    def from_summary(cls, summary: dict) -> dict:
+        """Columns from the `system` summary of the testbed measurement agent (means and energy deltas computed there)."""
+        means = summary.get("means", {})
+        energy = summary.get("energy", {})
+        return {
+            **{column: math.nan if means.get(column) is None else means[column] for column in cls.target_columns},
+            **{column: math.nan if energy.get(column) is None else energy[column] for column in cls.delta_target_columns},
+        }
+
+    @classmethod
+    def per_second(cls, file_path, wrap_values: dict = None, chunksize: int = DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+        """
+        Per-second series (second, metric, value) of the run: the mean of every target column in each second,
+        and the power (W) of every energy domain from the overflow-corrected counter at the end of each second.
+        """
+        columns = cls.delta_target_columns
+        dtypes = cls.column_dtypes()
+        sums, counts, counters = [], [], []
+        for chunk in pd.read_csv(file_path, usecols=lambda column: column in dtypes or column == cls.TIME_COLUMN,
+                                 dtype=dtypes, chunksize=chunksize):
+            chunk = chunk.reindex(columns=[cls.TIME_COLUMN] + cls.data_columns())
+            groups = chunk.groupby(chunk[cls.TIME_COLUMN] // 1000)
+            sums.append(groups[cls.target_columns].sum(min_count=1))
+            counts.append(groups[cls.target_columns].count())
+            counters.append(groups[columns].last())
+        if not sums:
+            return pd.DataFrame(columns=['second', 'metric', 'value'])
+        # A second can straddle two chunks
+        means = pd.concat(sums).groupby(level=0).sum(min_count=1) / pd.concat(counts).groupby(level=0).sum()
+        counters = pd.concat(counters).groupby(level=0).last().ffill()
+        wrap_array = np.array([(wrap_values or {}).get(column, RAPL_OVERFLOW_VALUE) for column in columns])
+        unwrapped, _ = cls.unwrap_energy_counters(counters.to_numpy(dtype=np.float64), wrap_array)
+        seconds = counters.index.to_numpy(dtype=np.float64)
+        power = pd.DataFrame(
+            np.diff(unwrapped, axis=0) / np.diff(seconds)[:, None],
+            index=counters.index[1:], columns=[column.replace('ENERGY (J)', 'POWER (W)') for column in columns],
+        )
+        series = pd.concat([means, power], axis=1).rename_axis('second').reset_index()
+        return series.melt(id_vars='second', var_name='metric', value_name='value').dropna(subset=['value'])
+
+class ScaphandreOutputParser:
+    @classmethod
+    def data_columns(cls) -> list:
+        return [f"{service}_energy_joules" for service in TARGET_SERVICES]
+
+    @staticmethod
+    def _iso_to_epoch(ts: str) -> float:
+        # "2025-10-06T13:15:24Z" -> seconds since epoch
+        return datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp()
+
+    @classmethod
+    def parse_output(cls, file_path: str, window: tuple = None) -> dict:
+        """
+        Parse .jsonl file containing per-service power readings in microwatts.
+        Compute energy (J) for each service using trapezoid rule,
+        over the readings inside `window` (epoch seconds, testbed clock) if given.
+        Returns dict:
+        {
+            "media_service_energy_joules": ...,
+            "home_timeline_service_energy_joules": ...,
+            "compose_post_service_energy_joules": ...
+        }
+        """
+        rows = []
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    t = cls._iso_to_epoch(entry["timestamp"])
+                    row = {"t": t}
+                    for service in TARGET_SERVICES:
+                        key = f"{service}_power_uW"
+                        if key in entry:
+                            row[service] = entry[key] / 1e6  # convert µW → W
+                        else:
+                            row[service] = 0.0
+                    rows.append(row)
+                except Exception as e:
+                    print(f"[ScaphandreOutputParser] Skipped invalid line: {e}")
+
+        if not rows:
+            return {f"{service}_energy_joules": None for service in TARGET_SERVICES}
+
+        df = pd.DataFrame(rows).sort_values("t").reset_index(drop=True)
+        if window is not None:
+            df = df[(df["t"] >= window[0]) & (df["t"] <= window[1])]
+
+        result = {}
+        for service in TARGET_SERVICES:
+            t = df["t"].to_numpy(dtype=float)
+            p = df[service].to_numpy(dtype=float)
+            if len(t) > 1:
+                # integrate power (Watts) over time (seconds) → Joules
+                E = float(np.trapz(p, t))
+                result[f"{service}_energy_joules"] = round(E, 2)
+            else:
+                result[f"{service}_energy_joules"] = 0.0
+
+        return result
+
+    @classmethod
+    def from_summary(cls, summary: dict) -> dict:
+        """Columns from the `scaphandre` summary of the testbed measurement agent (energy integrated there)."""
+        if not summary.get("samples"):
+            return {f"{service}_energy_joules": None for service in TARGET_SERVICES}
+        return {
+            f"{service}_energy_joules": round(summary["energy_joules"][service], 2) if summary["samples"] > 1 else 0.0
+            for service in TARGET_SERVICES
+        }
+
+    @classmethod
+    def per_second(cls, file_path: str) -> pd.DataFrame:
+        """Per-second series (second, metric, value) of every target service's mean power, in W."""
+        rows = []
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    second = int(cls._iso_to_epoch(entry["timestamp"]))
+                except (ValueError, KeyError):
+                    continue
+                for service in TARGET_SERVICES:
+                    rows.append((second, f"{service}_power (W)", entry.get(f"{service}_power_uW", 0.0) / 1e6))
+        df = pd.DataFrame(rows, columns=["second", "metric", "value"])
+        return df.groupby(["second", "metric"], as_index=False)["value"].mean()
+
+class DockerStatsOutputParser:
+    @staticmethod
+    def _mem_to_bytes(mem_usage_str: str) -> float:
+        """
+        Convert the 'used' part of docker's MemUsage to bytes.
+        Example: '824.3MiB / 2.00GiB' -> 824.3 * 1024**2
+        """
+        if not isinstance(mem_usage_str, str):
+            return math.nan
+        # Only the "used" side before the slash
+        used = mem_usage_str.split('/', 1)[0].strip()
+        m = re.match(r'^\s*([0-9]+(?:\.[0-9]+)?)\s*([KMGT]?i?B)\s*$', used, re.IGNORECASE)
+        if not m:
+            parts = used.split()
+            if len(parts) != 2:
+                return math.nan
+            val_str, unit = parts[0].replace(',', '.'), parts[1]
+            try:
+                val = float(val_str)
+            except Exception:
+                return math.nan
+            unit = unit.upper()
+        else:
+            val = float(m.group(1))
+            unit = m.group(2).upper()
+
+        mult = {
+            'B': 1,
+            'KB': 1000,
+            'MB': 1000**2,
+            'GB': 1000**3,
+            'TB': 1000**4,
+            'KIB': 1024,
+            'MIB': 1024**2,
+            'GIB': 1024**3,
+            'TIB': 1024**4,
+        }
+        return val * mult.get(unit, 1)
+
+    @staticmethod
+    def _cpu_to_float(cpu_str: str) -> float:
+        """Convert '5.23%' -> 5.23"""
+        if not isinstance(cpu_str, str):
+            return math.nan
+        s = cpu_str.strip().rstrip('%').replace(',', '.')
+        try:
+            return float(s)
+        except Exception:
+            return math.nan
+
+    @staticmethod
+    def _p95(series: pd.Series) -> float:
+        x = pd.to_numeric(series, errors='coerce').dropna()
+        return float(np.percentile(x, 95)) if not x.empty else math.nan
+
+    @classmethod
+    def data_columns(cls):
+        base_metrics = [
+            "cpu_usage_mean", "cpu_usage_p95", "cpu_usage_max", "cpu_usage_samples",
+            "mem_usage_mean", "mem_usage_p95", "mem_usage_max", "mem_usage_samples"
+        ]
+        return [f"{service}_{metric}" for service in TARGET_SERVICES for metric in base_metrics]
+
+    @classmethod
+    def parse_output(cls, file_path: str, window: tuple = None) -> dict:
+        """
+        Parse CSV with header: ts,Container,CPU%,MemUsage
+        Aggregate per service type (strip numeric suffixes),
+        over the samples inside `window` (epoch seconds, testbed clock) if given.
+        """
+        df = pd.read_csv(file_path)
+
+        expected = {'ts', 'Container', 'CPU%', 'MemUsage'}
+        if not expected.issubset(df.columns):
+            raise ValueError(
+                f"Expected header {sorted(expected)} in {file_path}, found {list(df.columns)}"
+            )
+        if window is not None:
+            df = df[(df['ts'] >= window[0]) & (df['ts'] <= window[1])]
+
+        # Parse numeric columns
+        df['cpu_pct']   = df['CPU%'].map(cls._cpu_to_float)
+        df['mem_bytes'] = df['MemUsage'].map(cls._mem_to_bytes)
+
+        # Remove suffix like -1, -2, ...
+        df['Service'] = df['Container'].str.replace(r'-\d+$', '', regex=True)
+
+        include = [f"socialnetwork-{service.replace('_', '-')}" for service in TARGET_SERVICES]
+        df = df[df['Service'].isin(include)]
+
+        if df.empty:
+            return {}
+
+        # Aggregate by Service (not by instance)
+        grp = df.groupby('Service', as_index=True)
+        metrics = {
+            "cpu_usage_mean":    grp['cpu_pct'].mean().to_dict(),
+            "cpu_usage_p95":     grp['cpu_pct'].apply(cls._p95).to_dict(),
+            "cpu_usage_max":     grp['cpu_pct'].max().to_dict(),
+            "cpu_usage_samples": grp['cpu_pct'].count().astype(int).to_dict(),
+            "mem_usage_mean":    grp['mem_bytes'].mean().to_dict(),
+            "mem_usage_p95":     grp['mem_bytes'].apply(cls._p95).to_dict(),
+            "mem_usage_max":     grp['mem_bytes'].max().to_dict(),
+            "mem_usage_samples": grp['mem_bytes'].count().astype(int).to_dict(),
+        }
+        result = {}
+        for metric, service_map in metrics.items():
+            for service, val in service_map.items():
+                short_service = service.replace("socialnetwork-", "").replace("-", "_")
+                result[f"{short_service}_{metric}"] = (
+                    None if (isinstance(val, float) and math.isnan(val)) else val / CPU_COUNT
+                )
+
+        return result
+
+    @classmethod
+    def from_summary(cls, summary: dict) -> dict:
+        """Columns from the `containers` summary of the testbed measurement agent, scaled like `parse_output`."""
+        include = {f"socialnetwork-{service.replace('_', '-')}" for service in TARGET_SERVICES}
+        result = {}
+        for service, resources in summary.get("services", {}).items():
+            if service not in include:
+                continue
+            short_service = service.replace("socialnetwork-", "").replace("-", "_")
+            for resource, stats in (("cpu_usage", resources["cpu"]), ("mem_usage", resources["mem"])):
+                for statistic, val in stats.items():
+                    result[f"{short_service}_{resource}_{statistic}"] = None if val is None else val / CPU_COUNT
+        return result
+
+    @classmethod
+    def per_second(cls, file_path: str) -> pd.DataFrame:
+        """
+        Per-second series (second, metric, value) of every target service's CPU and memory usage,
+        summed over its instances and scaled like `parse_output`.
+        """
+        df = pd.read_csv(file_path)
+        df['second'] = df['ts'].astype(np.int64)
+        df['cpu_usage'] = df['CPU%'].map(cls._cpu_to_float) / CPU_COUNT
+        df['mem_usage'] = df['MemUsage'].map(cls._mem_to_bytes) / CPU_COUNT
+        df['Service'] = df['Container'].str.replace(r'-\d+$', '', regex=True)
+        include = {f"socialnetwork-{service.replace('_', '-')}": service for service in TARGET_SERVICES}
+        df = df[df['Service'].isin(include)]
+        # Mean of each instance within the second, then summed over the service's instances
+        instances = df.groupby(['second', 'Service', 'Container'])[['cpu_usage', 'mem_usage']].mean()
+        services = instances.groupby(level=['second', 'Service']).sum(min_count=1).reset_index()
+        services['Service'] = services['Service'].map(include)
+        series = services.melt(id_vars=['second', 'Service'], var_name='resource', value_name='value')
+        series['metric'] = series['Service'] + '_' + series['resource']
+        return series[['second', 'metric', 'value']].dropna(subset=['value'])
+
+class CpuFreqOutputParser:
+    """
+    Frequency residency and transitions of the testbed's cores between the start and the end of the measurement,
+    from the document written by testbed/cpufreq_sampler.py (the measurement agent's `cpufreq` summary is the same).
+    The package is all cores together.
+    """
+    # Package residency shares: at the lowest and at the highest frequency, and in each quarter of the range
+    residency_columns = [
+        'cpufreq_residency_min', 'cpufreq_residency_q1', 'cpufreq_residency_q2', 'cpufreq_residency_q3',
+        'cpufreq_residency_q4', 'cpufreq_residency_max',
+    ]
+
+    @classmethod
+    def data_columns(cls) -> list:
+        return (['cpufreq_mean_mhz', 'cpufreq_transitions_per_s'] + cls.residency_columns
+                + [f'CPU_TRANSITION_RATE_{i}' for i in range(CPU_COUNT)])
+
+    @staticmethod
+    def residency(document: dict) -> pd.DataFrame:
+        """
+        Seconds each core spent at each frequency (core, frequency_mhz, seconds): the difference of the kernel's
+        time_in_state between the snapshots where the driver keeps it, else the residency of the polled trace.
+        """
+        start, end = document["snapshots"]
+        trace = (document.get("trace") or {}).get("residency", {})
+        rows = []
+        for core, stats in end["cpus"].items():
+            before, after = start["cpus"].get(core, {}).get("time_in_state"), stats.get("time_in_state")
+            if before is not None and after is not None:
+                # In units of 10 ms
+                rows += [(int(core), int(khz) / 1000, (ticks - before.get(khz, 0)) / 100) for khz, ticks in after.items()]
+            else:
+                rows += [(int(core), int(khz) / 1000, seconds) for khz, seconds in trace.get(core, {}).items()]
+        return pd.DataFrame(rows, columns=["core", "frequency_mhz", "seconds"])
+
+    @staticmethod
+    def transitions(document: dict) -> dict:
+        """Frequency changes of each core: the kernel's total_trans difference, else those seen by the trace (a lower bound)."""
+        start, end = document["snapshots"]
+        trace = (document.get("trace") or {}).get("transitions", {})
+        counts = {}
+        for core, stats in end["cpus"].items():
+            before, after = start["cpus"].get(core, {}).get("total_trans"), stats.get("total_trans")
+            if before is not None and after is not None:
+                counts[int(core)] = after - before
+            elif core in trace:
+                counts[int(core)] = trace[core]
+        return counts
+
+    @classmethod
+    def from_summary(cls, document: dict) -> dict:
+        result = {column: math.nan for column in cls.data_columns()}
+        if not document or len(document.get("snapshots") or []) != 2:
+            return result
+        start, end = document["snapshots"]
+        duration = end["ts"] - start["ts"]
+        transitions = cls.transitions(document)
+        if duration > 0 and transitions:
+            result['cpufreq_transitions_per_s'] = sum(transitions.values()) / duration
+            for core, count in transitions.items():
+                if core < CPU_COUNT:
+                    result[f'CPU_TRANSITION_RATE_{core}'] = count / duration
+
+        package = cls.residency(document).groupby("frequency_mhz")["seconds"].sum()
+        total = package.sum()
+        if total <= 0:
+            return result
+        frequencies = package.index.to_numpy(dtype=float)
+        limits = [stats.get(key) for stats in end["cpus"].values() for key in ("min_khz", "max_khz")]
+        low = min([limit / 1000 for limit in limits[0::2] if limit] or [frequencies.min()])
+        high = max([limit / 1000 for limit in limits[1::2] if limit] or [frequencies.max()])
+        shares = package.to_numpy() / total
+        result['cpufreq_mean_mhz'] = float((frequencies * shares).sum())
+        result['cpufreq_residency_min'] = float(shares[frequencies <= low].sum())
+        result['cpufreq_residency_max'] = float(shares[frequencies >= high].sum())
+        quarters = np.clip(np.floor((frequencies - low) / max(high - low, 1e-9) * 4), 0, 3).astype(int)
+        for quarter in range(4):
+            result[f'cpufreq_residency_q{quarter + 1}'] = float(shares[quarters == quarter].sum())
+        return result
+
+    @classmethod
+    def parse_output(cls, file_path) -> dict:
+        """Run table columns from the sampler's JSON document; NaN if the sampler left none (e.g. it did not run)."""
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                document = json.load(f)
+        except (OSError, ValueError) as e:
+            output.console_log_WARNING(f"No frequency statistics in {file_path}: {e}")
+            return cls.from_summary(None)
+        return cls.from_summary(document)
+
+class LocustStatsOutputParser:
+    # Client-side metrics reported by WorkloadGenerator.run_summary
+    client_columns = [
+        'client_cpu_usage_mean', 'client_cpu_usage_max', 'client_cpu_busiest_process_max',
+        'target_rps', 'achieved_rps', 'load_users',
+    ]
+
+    @classmethod
+    def data_columns(cls) -> list:
+        return ['throughput', 'requests', 'failures', 'latency_p50', 'latency_p90', 'latency_p95', 'latency_p99'] + cls.client_columns
+
+    @classmethod
+    def parse_output(cls, locust_stats, run_summary: dict = None, series_path=None, window: tuple = None) -> dict:
+        """
+        Throughput and latency percentiles of the run from the Locust stats totals, or, with `window`
+        (epoch seconds, orchestrator clock), from the seconds of the per-second series at `series_path` inside it.
+        """
+        run_summary = run_summary or {}
+        if window is not None and series_path is not None:
+            return {**cls._parse_series(series_path, window), **{column: run_summary.get(column) for column in cls.client_columns}}
+        # Requests per second over the measurement window (when the load ran), not per second of response time
+        if run_summary.get("window_end") is not None:
+            throughput = locust_stats.num_requests / (run_summary["window_end"] - run_summary["window_start"])
+        else:
+            throughput = locust_stats.total_rps
+        return {
+            "throughput": throughput,
+            "requests": locust_stats.num_requests,
+            "failures": locust_stats.num_failures,
+            "latency_p50": locust_stats.get_response_time_percentile(0.50),
+            "latency_p90": locust_stats.get_response_time_percentile(0.90),
+            "latency_p95": locust_stats.get_response_time_percentile(0.95),
+            "latency_p99": locust_stats.get_response_time_percentile(0.99),
+            **{column: run_summary.get(column) for column in cls.client_columns}
+        }
+
+    @staticmethod
+    def per_second(series_path) -> pd.DataFrame:
+        """Per-second series (second, metric, value) of the requests, failures and latency percentiles (ms) of all endpoints."""
+        series, histograms, _ = RequestTimeSeries.load(series_path)
+        histograms = histograms.assign(second=series["second"].to_numpy()[histograms["row"]])
+        per_second = series.groupby("second")[["requests", "failures"]].sum()
+        latencies = histograms.groupby("second")
+        for q in (0.50, 0.95, 0.99):
+            per_second[f"latency_p{round(q * 100)}"] = latencies.apply(RequestTimeSeries.percentile, q, include_groups=False)
+        per_second = per_second.reset_index()
+        return per_second.melt(id_vars="second", var_name="metric", value_name="value").dropna(subset=["value"])
+
+    @staticmethod
+    def _parse_series(series_path, window: tuple) -> dict:
+        series, histograms, _ = RequestTimeSeries.load(series_path)
+        # Whole seconds only: a second's bucket covers [second, second + 1)
+        first, end = math.ceil(window[0]), math.floor(window[1])
+        rows = series.index[(series["second"] >= first) & (series["second"] + 1 <= end)]
+        histograms = histograms[histograms["row"].isin(rows)]
+        return {
+            "throughput": series.loc[rows, "requests"].sum() / max(end - first, 1),
+            "requests": series.loc[rows, "requests"].sum(),
+            "failures": series.loc[rows, "failures"].sum(),
+            "latency_p50": RequestTimeSeries.percentile(histograms, 0.50),
+            "latency_p90": RequestTimeSeries.percentile(histograms, 0.90),
+            "latency_p95": RequestTimeSeries.percentile(histograms, 0.95),
+            "latency_p99": RequestTimeSeries.percentile(histograms, 0.99),
+        }
@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+
+class PhaseTracer:
+    """
+    Span-based timing of where a run's time goes: the RunnerConfig phases (governor switch, warmup, collector
+    start, load, transfer, parse, ...) and, nested inside them, every SSH connect, command and copy.
+
+    `span(name)` is a context manager recording the span's start, wall time, CPU time of the thread running it
+    (work in child processes, e.g. Locust workers or the parse pool, is not included) and the bytes it moved
+    (`add_bytes`, also counted in the enclosing spans). Spans nest per thread. Spans on the main thread without a
+    parent are the run's critical path; spans of other threads (e.g. the previous run's transfer during warmup)
+    overlap it. ExternalMachineAPI instances are created all over the hooks, so the spans of the current run are
+    kept by the class, per process; `write` stores them in the run directory as JSON lines and `reset` starts
+    the next run.
+    """
+    FILE_NAME = "phase_trace.jsonl"
+    REPORT_FILE_NAME = "phase_report.txt"
+    # Phases of a run, in order; each gets a run table column
+    PHASES = [
+        "before_run", "governor", "settle", "run_setup", "warmup", "transfer_wait", "cooldown",
+        "collectors_start", "load", "collectors_stop", "transfer", "parse",
+    ]
+    SSH_PREFIX = "ssh."
+
+    spans: List[Dict] = []
+    _local = threading.local()
+    _lock = threading.Lock()
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls.spans = []
+
+    @classmethod
+    @contextmanager
+    def span(cls, name: str, **attributes):
+        stack = cls._local.__dict__.setdefault("stack", [])
+        record = {
+            "name": name, "parent": stack[-1]["name"] if stack else None,
+            "thread": threading.current_thread().name, "start": time.time(), "bytes": 0, **attributes,
+        }
+        wall, cpu = time.perf_counter(), time.thread_time()
+        stack.append(record)
+        try:
+            yield record
+        finally:
+            stack.pop()
+            record["wall"] = time.perf_counter() - wall
+            record["cpu"] = time.thread_time() - cpu
+            if stack:
+                stack[-1]["bytes"] += record["bytes"]
+            with cls._lock:
+                cls.spans.append(record)
+
+    @classmethod
+    def add_bytes(cls, count: int) -> None:
+        """Count `count` bytes moved by the innermost open span of this thread (if any)."""
+        stack = cls._local.__dict__.get("stack")
+        if stack:
+            stack[-1]["bytes"] += count
+
+    @classmethod
+    def data_columns(cls) -> list:
+        return [f"phase_{phase}_time" for phase in cls.PHASES] + [
+            "phase_total_time", "phase_cpu_time", "phase_ssh_time", "phase_ssh_calls", "phase_transfer_bytes",
+        ]
+
+    @classmethod
+    def summary(cls, spans: List[Dict] = None) -> Dict[str, float]:
+        """Run table columns of the run's spans: seconds per critical-path phase and totals over the run."""
+        spans = cls.spans if spans is None else spans
+        critical = [span for span in spans if span["parent"] is None and span["thread"] == "MainThread"]
+        # Outermost SSH spans only, so a command inside a bundle fetch is not counted twice
+        ssh = [span for span in spans
+               if span["name"].startswith(cls.SSH_PREFIX) and not (span["parent"] or "").startswith(cls.SSH_PREFIX)]
+        columns = {f"phase_{phase}_time": sum(span["wall"] for span in critical if span["name"] == phase)
+                   for phase in cls.PHASES}
+        columns.update({
+            "phase_total_time": sum(span["wall"] for span in critical),
+            "phase_cpu_time": sum(span["cpu"] for span in critical),
+            "phase_ssh_time": sum(span["wall"] for span in ssh),
+            "phase_ssh_calls": len(ssh),
+            "phase_transfer_bytes": sum(span["bytes"] for span in ssh),
+        })
+        return columns
+
+    @classmethod
+    def write(cls, run_dir: Path) -> None:
+        with cls._lock:
+            spans = sorted(cls.spans, key=lambda span: span["start"])
+        with open(Path(run_dir) / cls.FILE_NAME, "w", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span) + "\n")
+
+    @classmethod
+    def load(cls, experiment_path: Path) -> pd.DataFrame:
+        """Every span of every traced run of the experiment, with the run id."""
+        frames = []
+        for path in sorted(Path(experiment_path).glob(f"*/{cls.FILE_NAME}")):
+            spans = pd.read_json(path, lines=True)
+            if not spans.empty:
+                frames.append(spans.assign(run_id=path.parent.name))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+class PhaseReport:
+    """
+    Experiment-level breakdown of the traced runs: the mean time of every critical-path phase and its share of a
+    run's cycle (from the start of one run to the start of the next, so the runner's untraced time between runs
+    is part of it), the work overlapped with it, and the projected time left.
+    """
+    def __init__(self, spans: pd.DataFrame):
+        self.spans = spans
+        main = spans["thread"] == "MainThread"
+        self.critical = spans[main & spans["parent"].isna()]
+        self.background = spans[~main & spans["parent"].isna()]
+        starts = self.critical.groupby("run_id")["start"].min().sort_values()
+        ends = (self.critical["start"] + self.critical["wall"]).groupby(self.critical["run_id"]).max()
+        self.runs = pd.DataFrame({"start": starts, "traced": ends[starts.index] - starts})
+        # The last run has no next start yet; its cycle is its traced time plus the mean untraced gap
+        gaps = (starts.shift(-1) - starts - self.runs["traced"]).dropna()
+        self.gap = gaps.mean() if not gaps.empty else 0.0
+        self.runs["cycle"] = self.runs["traced"] + gaps.reindex(self.runs.index).fillna(self.gap)
+
+    def phase_means(self, spans: pd.DataFrame) -> pd.DataFrame:
+        """Mean wall, CPU time and bytes per run of every phase in `spans` (a run without the phase counts 0)."""
+        per_run = spans.groupby(["name", "run_id"])[["wall", "cpu", "bytes"]].sum()
+        means = per_run.groupby("name").sum() / len(self.runs)
+        return means.assign(runs=per_run.groupby("name").size())
+
+    def phase_time(self, phase: str) -> float:
+        """Mean seconds per run of a critical-path phase."""
+        means = self.phase_means(self.critical)
+        return float(means.loc[phase, "wall"]) if phase in means.index else 0.0
+
+    @property
+    def cycle(self) -> float:
+        return float(self.runs["cycle"].mean())
+
+    def render(self, remaining_runs: int, remaining_seconds: float, upper_bound: bool = False) -> str:
+        lines = [
+            f"{len(self.runs)} runs traced, mean cycle {self.cycle:.1f} s (start of a run to the start of the next)",
+            "",
+            f"{'critical path':24s} {'runs':>5s} {'mean (s)':>9s} {'share':>6s} {'cpu (s)':>8s} {'MB':>8s}",
+        ]
+        means = self.phase_means(self.critical)
+        order = [phase for phase in PhaseTracer.PHASES if phase in means.index]
+        order += [phase for phase in means.index if phase not in order]
+        for phase in order:
+            row = means.loc[phase]
+            lines.append(f"{phase:24s} {int(row['runs']):5d} {row['wall']:9.2f} {row['wall'] / self.cycle:6.1%} "
+                         f"{row['cpu']:8.2f} {row['bytes'] / 1e6:8.2f}")
+        lines.append(f"{'(between runs)':24s} {len(self.runs):5d} {self.gap:9.2f} {self.gap / self.cycle:6.1%}")
+        if not self.background.empty:
+            lines += ["", f"{'overlapped':24s} {'runs':>5s} {'mean (s)':>9s} {'':>6s} {'cpu (s)':>8s} {'MB':>8s}"]
+            for phase, row in self.phase_means(self.background).iterrows():
+                lines.append(f"{phase:24s} {int(row['runs']):5d} {row['wall']:9.2f} {'':>6s} "
+                             f"{row['cpu']:8.2f} {row['bytes'] / 1e6:8.2f}")
+        ssh = self.spans[self.spans["name"].str.startswith(PhaseTracer.SSH_PREFIX)]
+        if not ssh.empty:
+            lines += ["", f"{'ssh':24s} {'calls':>5s} {'mean (s)':>9s} {'max (s)':>9s}"]
+            for name, walls in ssh.groupby("name")["wall"]:
+                lines.append(f"{name:24s} {len(walls):5d} {walls.mean():9.3f} {walls.max():9.3f}")
+        lines += ["", f"Remaining: {remaining_runs} runs, projected {'at most ' if upper_bound else ''}"
+                      f"{remaining_seconds / 3600:.1f} h"]
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def of_experiment(cls, experiment_path: Path) -> Optional["PhaseReport"]:
+        spans = PhaseTracer.load(experiment_path)
+        return cls(spans) if not spans.empty else None
@@ -0,0 +1,138 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List
+
+from ProgressManager.Output.CSVOutputManager import CSVOutputManager
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+
+from OutputParsers import EnergibridgeOutputParser, ScaphandreOutputParser, DockerStatsOutputParser, CpuFreqOutputParser
+from EfficiencyMetrics import EfficiencyMetrics
+
+
+RESULT_FILE_NAME = "measurements.json"
+
+
+def parse_run(job: Dict) -> Dict:
+    """Run table columns from the measurement files of one run, described by a parse job (see RunnerConfig.parse_job)."""
+    run_dir = Path(job["run_dir"])
+    window = job["window"]
+    return {
+        **EnergibridgeOutputParser.parse_output(
+            run_dir / job["energibridge"], job["rapl_wrap_values"], job["chunksize"], window
+        ),
+        **DockerStatsOutputParser.parse_output(run_dir / job["docker_stats"], window),
+        **ScaphandreOutputParser.parse_output(run_dir / job["scaphandre"], window),
+        # Statistics snapshots at the start and end of the measurement, never windowed
+        **CpuFreqOutputParser.parse_output(run_dir / job["cpufreq"]),
+    }
+
+
+def _nice_worker():
+    # The pool shares the orchestrator with the next run's load generator
+    os.nice(19)
+
+
+def _parse_to_file(job: Dict) -> None:
+    """Pool worker: parse one run and store its columns next to its artifacts, replacing the file atomically."""
+    data = parse_run(job)
+    path = Path(job["run_dir"]) / RESULT_FILE_NAME
+    partial = path.with_suffix(".partial")
+    partial.write_text(json.dumps(data, default=float))
+    os.replace(partial, path)
+
+
+class PostProcessor:
+    """
+    Parses the measurement files of finished runs in a pool of worker processes, so the next run starts while
+    the previous one's results are computed.
+
+    Runs execute in their own processes, so they only queue parse jobs in a ledger file (`enqueue`). The
+    experiment's process owns the pool: between runs `sync` submits the queued jobs and merges the finished ones
+    into the run table. A worker writes each run's columns to `measurements.json` in the run directory before the
+    run leaves the ledger, so a crash (of a worker or the whole orchestrator) loses no finished parse: the next
+    `sync` merges what is on disk and resubmits the rest. A job that fails `max_attempts` times stays in the
+    ledger with its error; its row keeps empty measurement columns and its files stay in the run directory.
+    """
+    LEDGER_FILE_NAME = "pending_parses.json"
+
+    def __init__(self, experiment_path: Path, workers: int = 1, max_attempts: int = 2):
+        self.ledger = Path(experiment_path) / self.LEDGER_FILE_NAME
+        self.experiment_path = experiment_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.pool = None
+        self.futures = {}
+
+    @classmethod
+    def enqueue(cls, experiment_path: Path, job: Dict) -> None:
+        """Queue the parse of a run. Called from the run's process; the experiment's process picks it up in `sync`."""
+        ledger = Path(experiment_path) / cls.LEDGER_FILE_NAME
+        pending = json.loads(ledger.read_text()) if ledger.exists() else []
+        pending.append({**job, "attempts": 0, "error": None})
+        ledger.write_text(json.dumps(pending))
+
+    def _submit(self, job: Dict) -> None:
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_nice_worker)
+        self.futures[job["run_id"]] = self.pool.submit(_parse_to_file, job)
+
+    def _settle(self, job: Dict) -> None:
+        """Record the outcome of the job's finished future, if it has one."""
+        future = self.futures.get(job["run_id"])
+        if future is None or not future.done():
+            return
+        del self.futures[job["run_id"]]
+        error = future.exception()
+        if error is None:
+            return
+        job["attempts"] += 1
+        job["error"] = repr(error)
+        if isinstance(error, BrokenProcessPool) and self.pool is not None:
+            # A worker died (e.g. out of memory); every unfinished job of the pool is lost with it
+            self.pool.shutdown(wait=False)
+            self.pool = None
+        retry = "retrying" if job["attempts"] < self.max_attempts else "giving up, its files stay in the run directory"
+        output.console_log_WARNING(f"Parsing {job['run_id']} failed ({job['error']}), {retry}")
+
+    def sync(self) -> List[Dict]:
+        """Merge the finished parses into the run table and submit the queued ones. Returns the jobs still pending."""
+        if not self.ledger.exists():
+            return []
+        csv_output = None
+        pending = []
+        for job in json.loads(self.ledger.read_text()):
+            self._settle(job)
+            result = Path(job["run_dir"]) / RESULT_FILE_NAME
+            if result.exists():
+                csv_output = csv_output or CSVOutputManager(self.experiment_path)
+                row = next(row for row in csv_output.read_run_table() if row['__run_id'] == job["run_id"])
+                csv_output.update_row_data(EfficiencyMetrics.complete({**row, **json.loads(result.read_text())}))
+                output.console_log_OK(f"Filled in the measurements of {job['run_id']}")
+                continue
+            if job["run_id"] not in self.futures and job["attempts"] < self.max_attempts:
+                self._submit(job)
+            pending.append(job)
+        # Only the runs not yet in the run table stay, so a crash here at most merges a run twice
+        if pending:
+            self.ledger.write_text(json.dumps(pending))
+        else:
+            self.ledger.unlink()
+        return pending
+
+    def drain(self) -> None:
+        """Wait for every queued parse and merge it; reports the runs whose parsing failed for good."""
+        pending = self.sync()
+        while self.futures:
+            wait(list(self.futures.values()))
+            pending = self.sync()
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if pending:
+            output.console_log_FAIL(
+                f"Could not parse {', '.join(job['run_id'] for job in pending)}; "
+                f"see {self.ledger} for the errors"
+            )
@@ -0,0 +1,132 @@
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+class RequestTimeSeries:
+    """
+    Per-second request counts, failures and latency histograms of every endpoint of a Locust run.
+
+    Latencies are counted in HDR-style log-linear buckets (the latency in microseconds truncated to
+    SIGNIFICANT_DIGITS digits), so histograms of different seconds, endpoints or worker processes merge
+    by adding counts, and any percentile can be read back with at most 1% relative error.
+    In distributed mode each worker records its own requests and ships them to the master with its stats reports.
+    """
+    FILE_NAME = "locust_timeseries.npz"
+    REPORT_KEY = "dsb_timeseries"
+    SIGNIFICANT_DIGITS = 3
+
+    def __init__(self):
+        # (second, method, name) -> [requests, failures, {latency bucket (us): count}]
+        self.buckets = {}
+
+    @classmethod
+    def latency_bucket(cls, response_time_ms: float) -> int:
+        """Lower bound (us) of the bucket holding `response_time_ms`."""
+        us = int(response_time_ms * 1000)
+        if us < 10 ** cls.SIGNIFICANT_DIGITS:
+            return us
+        step = 10 ** (int(math.log10(us)) + 1 - cls.SIGNIFICANT_DIGITS)
+        return us // step * step
+
+    def _entry(self, key: tuple) -> list:
+        entry = self.buckets.get(key)
+        if entry is None:
+            entry = self.buckets[key] = [0, 0, {}]
+        return entry
+
+    def on_request(self, request_type, name, response_time, exception=None, **kwargs):
+        entry = self._entry((int(time.time()), request_type, name))
+        entry[0] += 1
+        if exception is not None:
+            entry[1] += 1
+        if response_time is not None:
+            bucket = self.latency_bucket(response_time)
+            entry[2][bucket] = entry[2].get(bucket, 0) + 1
+
+    def on_report_to_master(self, client_id, data):
+        # Ship what was recorded since the last report; msgpack needs string map keys, so histograms go as pairs
+        data[self.REPORT_KEY] = [
+            [second, method, name, requests, failures, list(histogram.items())]
+            for (second, method, name), (requests, failures, histogram) in self.buckets.items()
+        ]
+        self.buckets = {}
+
+    def on_worker_report(self, client_id, data):
+        for second, method, name, requests, failures, histogram in data.get(self.REPORT_KEY, ()):
+            entry = self._entry((second, method, name))
+            entry[0] += requests
+            entry[1] += failures
+            for bucket, count in histogram:
+                entry[2][bucket] = entry[2].get(bucket, 0) + count
+
+    def attach(self, events):
+        """Record the requests of a local runner."""
+        events.request.add_listener(self.on_request)
+
+    def attach_worker(self, events):
+        events.request.add_listener(self.on_request)
+        events.report_to_master.add_listener(self.on_report_to_master)
+
+    def attach_master(self, events):
+        events.worker_report.add_listener(self.on_worker_report)
+
+    def save(self, path: Path, window_start: float, window_end: float):
+        """Write the series as compressed columnar arrays (.npz), with the measurement window (epoch seconds)."""
+        rows = sorted(self.buckets.items())
+        endpoints = sorted({(method, name) for (_, method, name), _ in rows})
+        endpoint_index = {endpoint: i for i, endpoint in enumerate(endpoints)}
+        hist_row, hist_latency, hist_count = [], [], []
+        for row, (_, (_, _, histogram)) in enumerate(rows):
+            hist_row += [row] * len(histogram)
+            hist_latency += histogram.keys()
+            hist_count += histogram.values()
+        np.savez_compressed(
+            path,
+            window=np.array([window_start, window_end], dtype=np.float64),
+            endpoint_method=np.array([method for method, _ in endpoints], dtype=str),
+            endpoint_name=np.array([name for _, name in endpoints], dtype=str),
+            second=np.array([second for (second, _, _), _ in rows], dtype=np.int64),
+            endpoint=np.array([endpoint_index[key[1:]] for key, _ in rows], dtype=np.int32),
+            requests=np.array([entry[0] for _, entry in rows], dtype=np.int64),
+            failures=np.array([entry[1] for _, entry in rows], dtype=np.int64),
+            hist_row=np.array(hist_row, dtype=np.int32),
+            hist_latency_us=np.array(hist_latency, dtype=np.int64),
+            hist_count=np.array(hist_count, dtype=np.int64),
+        )
+
+    @staticmethod
+    def load(path: Path):
+        """
+        Read a saved series. Returns (series, histograms, (window_start, window_end)):
+        series has one row per second and endpoint (second, method, name, requests, failures),
+        histograms one row per non-empty bucket (row of series, latency_us, count).
+        """
+        with np.load(path) as data:
+            names = pd.Series(data["endpoint_name"])
+            methods = pd.Series(data["endpoint_method"])
+            series = pd.DataFrame({
+                "second": data["second"],
+                "method": methods.iloc[data["endpoint"]].to_numpy(),
+                "name": names.iloc[data["endpoint"]].to_numpy(),
+                "requests": data["requests"],
+                "failures": data["failures"],
+            })
+            histograms = pd.DataFrame({
+                "row": data["hist_row"], "latency_us": data["hist_latency_us"], "count": data["hist_count"],
+            })
+            window = tuple(data["window"])
+        return series, histograms, window
+
+    @staticmethod
+    def percentile(histograms: pd.DataFrame, q: float) -> float:
+        """Latency percentile (ms) of the merged histogram rows, q in [0, 1]."""
+        merged = histograms.groupby("latency_us")["count"].sum().sort_index()
+        if merged.empty:
+            return float("nan")
+        cumulative = merged.cumsum().to_numpy()
+        position = np.searchsorted(cumulative, q * cumulative[-1])
+        return merged.index[min(position, len(merged) - 1)] / 1000
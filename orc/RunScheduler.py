@@ -0,0 +1,215 @@
+import math
+import random
+from enum import Enum
+from pathlib import Path
+from statistics import NormalDist
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from ConfigValidator.Config.Models.RunTableModel import RunTableModel
+from ProgressManager.Output.CSVOutputManager import CSVOutputManager
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+from ProgressManager.RunTable.Models.RunProgress import RunProgress
+
+
+class RunSchedule(Enum):
+    SHUFFLE         = "shuffle"          # All runs in random order
+    GOVERNOR_BLOCKS = "governor_blocks"  # Per repetition one block per governor, blocks counterbalanced, runs shuffled within
+
+
+def williams_square(n: int) -> List[List[int]]:
+    """
+    Orders of n conditions forming a Williams design: every condition takes every position once and directly
+    follows every other condition equally often, which balances first-order carry-over between conditions.
+    n rows for even n, 2n (the rows and their mirror images) for odd n.
+    """
+    first = [0] + [(k + 1) // 2 if k % 2 else n - k // 2 for k in range(1, n)]  # 0, 1, n-1, 2, n-2, ...
+    rows = [[(condition + shift) % n for condition in first] for shift in range(n)]
+    if n % 2:
+        rows += [row[::-1] for row in rows]
+    return rows
+
+
+def repetition(row: Dict) -> int:
+    """Repetition index of a run table row, from its run id (`run_<i>_repetition_<j>`)."""
+    return int(row['__run_id'].rsplit('_', 1)[1])
+
+
+class ScheduledRunTableModel(RunTableModel):
+    """
+    Run table whose order follows a RunSchedule instead of a plain shuffle.
+
+    GOVERNOR_BLOCKS groups the runs of each repetition by `block_factor`, so the governor changes once per
+    block instead of on almost every run. The blocks of consecutive repetitions follow the rows of a Williams
+    square (levels assigned to the square at random), so every governor runs equally often early and late in
+    a repetition and after every other governor; the balance is exact when the repetitions are a multiple
+    of the square's rows. Within a block the runs are shuffled, which keeps the load_type/load_level
+    comparisons randomized.
+
+    The order is drawn from `seed`, so regenerating the table gives the same schedule.
+    With `shuffle=False` the runs stay in generation order, whatever the schedule.
+    With `stopping`, the table is an AdaptiveRunTable that skips the remaining runs of converged cells.
+    """
+    def __init__(self, *args, schedule: RunSchedule = RunSchedule.SHUFFLE, block_factor: str = "cpu_governor",
+                 seed: int = None, shuffle: bool = False, stopping: "SequentialStopping" = None, **kwargs):
+        super().__init__(*args, shuffle=False, **kwargs)
+        self.schedule = schedule
+        self.block_factor = block_factor
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.randomize = shuffle
+        self.stopping = stopping
+
+    def generate_experiment_run_table(self) -> List[Dict]:
+        rows = super().generate_experiment_run_table()
+        if self.randomize:
+            rng = random.Random(self.seed)
+            if self.schedule is RunSchedule.SHUFFLE:
+                rng.shuffle(rows)
+            else:
+                rows = self._blocked(rows, rng)
+        return AdaptiveRunTable(rows, self.stopping) if self.stopping is not None else rows
+
+    def _blocked(self, rows: List[Dict], rng: random.Random) -> List[Dict]:
+        blocks = {}
+        for row in rows:
+            blocks.setdefault((repetition(row), row[self.block_factor]), []).append(row)
+        levels = list(dict.fromkeys(row[self.block_factor] for row in rows))
+        rng.shuffle(levels)
+        square = williams_square(len(levels))
+        rng.shuffle(square)
+
+        ordered = []
+        for rep in sorted({rep for rep, _ in blocks}):
+            for level in square[rep % len(square)]:
+                block = blocks.get((rep, levels[level]), [])
+                rng.shuffle(block)
+                ordered += block
+        return ordered
+
+
+def project_wall_clock(rows: List[Dict], run_seconds: Callable[[Dict, bool], float],
+                       block_factor: str = "cpu_governor") -> Tuple[float, int]:
+    """
+    Projected duration (s) of running `rows` in order, and the number of `block_factor` switches.
+    `run_seconds(row, switched)` estimates one run, given whether the factor changes before it.
+    """
+    total, switches, previous = 0.0, 0, None
+    for row in rows:
+        switched = row[block_factor] != previous
+        switches += switched
+        total += run_seconds(row, switched)
+        previous = row[block_factor]
+    return total, switches
+
+
+def t_quantile(p: float, df: int) -> float:
+    """Quantile `p` of Student's t distribution, by the Cornish-Fisher expansion around the normal quantile."""
+    z = NormalDist().inv_cdf(p)
+    return (z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+
+
+def is_done(row: Dict) -> bool:
+    # RunProgress.DONE in memory, "DONE" once read back from the CSV
+    return str(row['__done']).endswith("DONE")
+
+
+SKIPPED = "skipped"  # Run table column of the runs AdaptiveRunTable skipped
+
+
+def is_skipped(row: Dict) -> bool:
+    # True in memory, "True" once read back from the CSV
+    return str(row.get(SKIPPED, "")).strip() == "True"
+
+
+class SequentialStopping:
+    """
+    Sequential stopping rule for the repetitions of each cell (combination of factor treatments).
+
+    A cell needs no further runs once it has `min_repetitions` completed runs and, for every metric in `targets`,
+    the confidence interval half-width relative to the mean is at most the metric's target. The completed runs are
+    read from the experiment's results CSV. Once `budget` runs are completed in total no further runs are scheduled,
+    so the run table can hold more repetitions than the fixed design: the time converged cells free up goes to the
+    cells that still vary, up to the table's repetitions.
+    """
+    def __init__(self, results_csv: Callable[[], Path], factors: List[str], targets: Dict[str, float],
+                 min_repetitions: int, budget: int, confidence: float = 0.95):
+        self.results_csv = results_csv
+        self.factors = factors
+        self.targets = targets
+        self.min_repetitions = min_repetitions
+        self.budget = budget
+        self.confidence = confidence
+        self.converged = set()
+        self.completed = 0
+
+    def precision(self, results: pd.DataFrame) -> pd.DataFrame:
+        """Per cell: completed runs, and the relative confidence interval half-width of every target metric."""
+        done = results[results['__done'].astype(str).str.endswith("DONE")]
+        if SKIPPED in done:
+            done = done[done[SKIPPED].astype(str).str.strip() != "True"]
+        cells = [done[factor] for factor in self.factors]
+        table = done.groupby(cells).size().to_frame("runs")
+        for metric in self.targets:
+            stats = pd.to_numeric(done[metric], errors="coerce").groupby(cells).agg(["mean", "std", "count"])
+            t = stats["count"].map(lambda n: t_quantile(0.5 + self.confidence / 2, n - 1) if n > 1 else math.nan)
+            table[metric] = t * stats["std"] / stats["count"] ** 0.5 / stats["mean"].abs()
+        return table
+
+    def update(self):
+        """Re-read the completed runs and mark the cells whose metrics are precise enough."""
+        path = self.results_csv()
+        if path is None or not Path(path).exists():
+            return
+        try:
+            results = pd.read_csv(path)
+        except pd.errors.EmptyDataError:
+            return  # The runner iterates the table while writing it out
+        table = self.precision(results)
+        self.completed = int(table["runs"].sum())
+        precise = table["runs"] >= self.min_repetitions
+        for metric, target in self.targets.items():
+            precise &= table[metric] <= target
+        for cell, row in table[precise].iterrows():
+            cell = cell if isinstance(cell, tuple) else (cell,)
+            if cell not in self.converged:
+                self.converged.add(cell)
+                widths = ", ".join(f"{metric} ±{row[metric]:.1%}" for metric in self.targets)
+                output.console_log_OK(f"Cell {'/'.join(map(str, cell))} converged after {int(row['runs'])} runs ({widths})")
+
+    def should_run(self, row: Dict) -> bool:
+        self.update()
+        if self.completed >= self.budget:
+            return False
+        return tuple(str(row[factor]) for factor in self.factors) not in self.converged
+
+
+class AdaptiveRunTable(list):
+    """
+    Run table that asks `stopping` before handing out each run that is still to do, and skips it once its cell has
+    converged or the run budget is spent. A skipped run is marked done with the `skipped` column set, in the table
+    and in the results CSV, so the runner passes over it (also after a restart, which resumes from the CSV) and the
+    analysis can tell it from a measured run.
+    """
+    def __init__(self, rows: List[Dict], stopping: SequentialStopping):
+        super().__init__(rows)
+        self.stopping = stopping
+
+    def __iter__(self):
+        for row in super().__iter__():
+            self._settle(row)
+            yield row
+
+    def skip_remaining(self) -> int:
+        """Skip every run still to do that `stopping` rules out now (e.g. of a table read back). Returns how many."""
+        return sum(self._settle(row) for row in super().__iter__())
+
+    def _settle(self, row: Dict) -> bool:
+        if is_done(row) or self.stopping.should_run(row):
+            return False
+        row.update({'__done': RunProgress.DONE, SKIPPED: True})
+        path = self.stopping.results_csv()
+        if path is not None and Path(path).exists():
+            CSVOutputManager(Path(path).parent).update_row_data(row)
+        return True
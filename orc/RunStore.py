@@ -0,0 +1,226 @@
+import argparse
+import json
+import math
+import os
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+class RunStore:
+    """
+    Append-only columnar store of finished runs, next to (or instead of) the wide run_table.csv.
+
+    Runs live in hive-style partitions of their factors (`runs/cpu_governor=performance/load_type=media/...`) as
+    zstd-compressed Parquet: one typed row per run with the run table columns, and under `series/` the run's
+    per-second series in long form (second, metric, value). `append` writes a run as its own small files, so adding
+    a run never rewrites earlier ones; `compact` packs the small files of each partition into one (a Parquet footer
+    costs more than a run's row). Queries read only the partitions and columns they ask for, and `export_csv`
+    writes the run table layout the R scripts read.
+    """
+    RUNS_DIR = "runs"
+    SERIES_DIR = "series"
+    MANIFEST_FILE_NAME = "store.json"
+    COMPRESSION = "zstd"
+    SERIES_SCHEMA = pa.schema([
+        ("__run_id", pa.string()), ("second", pa.int64()), ("metric", pa.string()), ("value", pa.float64()),
+    ])
+    # Run table columns that are not float64; per-core usage (%) and frequency (MHz) fit float32
+    COLUMN_TYPES = {"__run_id": pa.string(), "__done": pa.string(), "governor_switched": pa.bool_()}
+    FLOAT32_PREFIX = "CPU_"
+
+    def __init__(self, path: Path, factors: List[str] = None):
+        """Open the store at `path`; a new store needs the names of the factors its runs are partitioned by."""
+        self.path = Path(path)
+        manifest = self.path / self.MANIFEST_FILE_NAME
+        if manifest.exists():
+            self.factors = json.loads(manifest.read_text())["factors"]
+            if factors is not None and list(factors) != self.factors:
+                raise RuntimeError(f"{self.path} is partitioned by {self.factors}, not {list(factors)}")
+        elif factors is None:
+            raise RuntimeError(f"No run store at {self.path}")
+        else:
+            self.factors = list(factors)
+            self.path.mkdir(parents=True, exist_ok=True)
+            manifest.write_text(json.dumps({"factors": self.factors}))
+        self.partitioning = ds.partitioning(pa.schema([(factor, pa.string()) for factor in self.factors]), flavor="hive")
+
+    def _partition_dir(self, kind: str, row: Dict) -> Path:
+        return self.path.joinpath(kind, *(f"{factor}={quote(str(row[factor]), safe='')}" for factor in self.factors))
+
+    @staticmethod
+    def _write(table: pa.Table, path: Path) -> None:
+        # Dot-files are invisible to dataset discovery, so readers never see a half-written run
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f".{path.name}.partial")
+        pq.write_table(table, partial, compression=RunStore.COMPRESSION)
+        os.replace(partial, path)
+
+    @classmethod
+    def _table(cls, rows: List[Dict], columns: List[str]) -> pa.Table:
+        """`columns` of run table rows (whose values may be the run table's strings), typed."""
+        arrays = {}
+        for column in columns:
+            data_type = cls.COLUMN_TYPES.get(column, pa.float32() if column.startswith(cls.FLOAT32_PREFIX) else pa.float64())
+            values = [row.get(column) for row in rows]
+            values = [None if value is None or value in ("", "nan", "None") or (isinstance(value, float) and math.isnan(value))
+                      else value for value in values]
+            if pa.types.is_boolean(data_type):
+                arrays[column] = pa.array([None if value is None else str(value).lower() in ("true", "1") for value in values])
+            elif pa.types.is_string(data_type):
+                arrays[column] = pa.array([None if value is None else str(value) for value in values], type=data_type)
+            else:
+                try:
+                    arrays[column] = pa.array([None if value is None else float(value) for value in values], type=data_type)
+                except (TypeError, ValueError):
+                    arrays[column] = pa.array([None if value is None else str(value) for value in values])  # Kept as text
+        return pa.table(arrays)
+
+    def append(self, row: Dict, series: Optional[pd.DataFrame] = None) -> None:
+        """Store a finished run: its run table row and, if given, its per-second series (second, metric, value)."""
+        run_id = row["__run_id"]
+        table = self._table([row], [column for column in row if column not in self.factors])
+        self._write(table, self._partition_dir(self.RUNS_DIR, row) / f"{run_id}.parquet")
+        if series is not None and not series.empty:
+            series = series.assign(__run_id=run_id).sort_values(["metric", "second"])
+            table = pa.Table.from_pandas(series, schema=self.SERIES_SCHEMA, preserve_index=False)
+            self._write(table, self._partition_dir(self.SERIES_DIR, row) / f"{run_id}.parquet")
+
+    def run_ids(self) -> set:
+        dataset = self._dataset(self.RUNS_DIR)
+        return set() if dataset is None else set(dataset.to_table(columns=["__run_id"]).column("__run_id").to_pylist())
+
+    def compact(self) -> int:
+        """Pack the files of every partition with more than one into a single file. Returns the files removed."""
+        removed = 0
+        for kind in (self.RUNS_DIR, self.SERIES_DIR):
+            partitions = {}
+            for path in (self.path / kind).rglob("*.parquet"):
+                partitions.setdefault(path.parent, []).append(path)
+            for directory, paths in partitions.items():
+                if len(paths) < 2:
+                    continue
+                table = pa.concat_tables([pq.read_table(path, partitioning=None) for path in paths], promote_options="default")
+                self._write(table, directory / f"part-{uuid.uuid4().hex}.parquet")
+                # Until the parts are gone a reader may see their runs twice; `runs` and `series` drop the repeats
+                for path in paths:
+                    path.unlink()
+                removed += len(paths) - 1
+        return removed
+
+    def sync(self, rows: Iterable[Dict], skip: set, series_of: Callable[[Dict], Optional[pd.DataFrame]] = None) -> int:
+        """Append the finished rows of a run table not yet stored, except the runs in `skip`. Returns how many."""
+        stored = self.run_ids()
+        appended = 0
+        for row in rows:
+            if not str(row["__done"]).endswith("DONE") or str(row.get("skipped", "")).strip() == "True" \
+                    or row["__run_id"] in stored or row["__run_id"] in skip:
+                continue
+            self.append(row, series_of(row) if series_of else None)
+            appended += 1
+        return appended
+
+    def _filter(self, factors: Dict) -> Optional[ds.Expression]:
+        """Expression selecting `factors` (name -> value or list of values); the matching partitions are all that is read."""
+        expression = None
+        for factor, values in factors.items():
+            if factor not in self.factors and factor != "__run_id":
+                raise RuntimeError(f"Unknown factor {factor}, the store is partitioned by {self.factors}")
+            values = [values] if isinstance(values, str) else list(values)
+            condition = ds.field(factor).isin(values)
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def _dataset(self, kind: str) -> Optional[ds.Dataset]:
+        paths = [str(path) for path in (self.path / kind).rglob("*.parquet")]
+        if not paths:
+            return None
+        # Runs of other experiments (or versions) may have other columns; a file lacking one reads as nulls
+        schema = pa.unify_schemas([pq.read_schema(path) for path in paths] + [self.partitioning.schema])
+        return ds.dataset(paths, schema=schema, format="parquet", partitioning=self.partitioning,
+                          partition_base_dir=str(self.path / kind))
+
+    def runs(self, columns: List[str] = None, **factors) -> pd.DataFrame:
+        """
+        Run table rows of the runs matching `factors`, e.g. `runs(["PACKAGE_ENERGY (J)"], cpu_governor="powersave",
+        load_level=["low", "medium"])`. Only the given columns (besides the run id and factors) are read.
+        """
+        dataset = self._dataset(self.RUNS_DIR)
+        if dataset is None:
+            return pd.DataFrame(columns=["__run_id", *self.factors, *(columns or [])])
+        if columns is not None:
+            columns = list(dict.fromkeys(["__run_id", *self.factors, *columns]))
+        frame = dataset.to_table(columns=columns, filter=self._filter(factors)).to_pandas()
+        # Run table layout: the run's identity, its factors, then the measurements
+        leading = [column for column in ("__run_id", "__done", *self.factors) if column in frame]
+        frame = frame[leading + [column for column in frame if column not in leading]].drop_duplicates("__run_id")
+        return frame.sort_values([*self.factors, "__run_id"], ignore_index=True)
+
+    def series(self, metrics: List[str] = None, **factors) -> pd.DataFrame:
+        """
+        Per-second series (long form: run id, factors, second, metric, value) of the runs matching `factors`,
+        only of the given metrics if any. `pivot_table(index=["__run_id", "second"], columns="metric")` makes it wide.
+        """
+        dataset = self._dataset(self.SERIES_DIR)
+        if dataset is None:
+            return pd.DataFrame(columns=[*self.SERIES_SCHEMA.names, *self.factors])
+        expression = self._filter(factors)
+        if metrics is not None:
+            condition = ds.field("metric").isin(list(metrics))
+            expression = condition if expression is None else expression & condition
+        return dataset.to_table(filter=expression).to_pandas().drop_duplicates(["__run_id", "second", "metric"])
+
+    def export_csv(self, csv_path: Path, **factors) -> int:
+        """Write the runs matching `factors` as a run_table.csv (what the R scripts read). Returns the number of runs."""
+        frame = self.runs(**factors)
+        frame.to_csv(csv_path, index=False)
+        return len(frame)
+
+    def import_csv(self, csv_path: Path) -> int:
+        """Append the finished runs of a run_table.csv that are not in the store yet. Returns how many."""
+        table = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        table = table[table["__done"].str.endswith("DONE") & ~table["__run_id"].isin(self.run_ids())]
+        if "skipped" in table:
+            # Runs skipped by adaptive repetitions are done, but were never measured
+            table = table[table["skipped"].str.strip() != "True"]
+        columns = [column for column in table if column not in self.factors]
+        # A file per partition rather than per run; compacted with what the store already holds
+        for _, rows in table.groupby(self.factors):
+            rows = rows.to_dict("records")
+            self._write(self._table(rows, columns), self._partition_dir(self.RUNS_DIR, rows[0]) / f"part-{uuid.uuid4().hex}.parquet")
+        self.compact()
+        return len(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move run tables in and out of a run store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    importer = subparsers.add_parser("import", help="Append the finished runs of a run_table.csv to a store")
+    importer.add_argument("csv", type=Path)
+    importer.add_argument("store", type=Path)
+    importer.add_argument("--factors", nargs="+", default=["cpu_governor", "load_type", "load_level"],
+                          help="Factors a new store is partitioned by")
+    exporter = subparsers.add_parser("export", help="Write the runs of a store as a run_table.csv")
+    exporter.add_argument("store", type=Path)
+    exporter.add_argument("csv", type=Path)
+    exporter.add_argument("--where", nargs="+", default=[], metavar="FACTOR=VALUE[,VALUE...]",
+                          help="Only the runs with these factor values")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        store = RunStore(args.store, args.factors if not (args.store / RunStore.MANIFEST_FILE_NAME).exists() else None)
+        print(f"Stored {store.import_csv(args.csv)} runs of {args.csv} in {args.store}")
+    else:
+        factors = dict(condition.split("=", 1) for condition in args.where)
+        runs = RunStore(args.store).export_csv(args.csv, **{factor: values.split(",") for factor, values in factors.items()})
+        print(f"Exported {runs} runs of {args.store} to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
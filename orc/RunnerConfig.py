@@ -6,19 +6,18 @@ from ConfigValidator.Config.Models.RunnerContext import RunnerContext
 from ConfigValidator.Config.Models.OperationType import OperationType
 from ExtendedTyping.Typing import SupportsStr
 from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+from ProgressManager.Output.CSVOutputManager import CSVOutputManager
 
+import json
+import math
+import pandas as pd
+import threading
 import time
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 from os import getenv
 from os.path import dirname, realpath
 from dotenv import load_dotenv
-import pandas as pd
-import math
-import re
-import numpy as np
-import json
-from datetime import datetime
 
 # Add the current directory to Python path to allow local imports
 import sys
@@ -27,240 +26,63 @@ config_dir = str(Path(__file__).parent.resolve())
 if config_dir not in sys.path:
     sys.path.insert(0, config_dir)
 from ExternalMachineAPI import ExternalMachineAPI
-from WorkloadGenerator import WorkloadGenerator, LoadType, LoadLevel
+from WorkloadGenerator import WorkloadGenerator, LoadType, LoadLevel, ArrivalSchedule, HttpClient
+from UserPool import UserPool
+from SteadyState import SteadyStateDetector, wait_for_steady_state
+from TestbedAgent import TestbedAgent
+from TimeBase import MeasurementWindow, estimate_clock_offset
+from RequestTimeSeries import RequestTimeSeries
+from PostProcessing import PostProcessor, parse_run
+from RunStore import RunStore
+from EfficiencyMetrics import EfficiencyMetrics
+from RunScheduler import ScheduledRunTableModel, RunSchedule, SequentialStopping, AdaptiveRunTable, project_wall_clock, is_done, SKIPPED
+from PhaseTracer import PhaseTracer, PhaseReport
+from OutputParsers import EnergibridgeOutputParser, ScaphandreOutputParser, DockerStatsOutputParser, LocustStatsOutputParser, CpuFreqOutputParser, TARGET_SERVICES
 
 # Load environment variables from .env file
 load_dotenv()
 
 DEBUG_MODE = getenv("DEBUG_MODE", "False").lower() in ("true", "1", "t")
-CPU_COUNT = 32
-RAPL_OVERFLOW_VALUE = 262143.328850 # Found via `cat /sys/class/powercap/intel-rapl:0/max_energy_range_uj` in uJ
-TARGET_SERVICES = ["media_service", "home_timeline_service", "compose_post_service"]
-
-class EnergibridgeOutputParser:
-    target_columns = ['TOTAL_MEMORY', 'TOTAL_SWAP', 'USED_MEMORY', 'USED_SWAP'] + [f'CPU_USAGE_{i}' for i in range(CPU_COUNT)] + [f'CPU_FREQUENCY_{i}' for i in range(CPU_COUNT)]
-
-    delta_target_columns = [
-        'DRAM_ENERGY (J)', 'PACKAGE_ENERGY (J)'
-    ]
-
-    @classmethod
-    def data_columns(cls) -> list:
-        return cls.target_columns + cls.delta_target_columns
-
-    @classmethod
-    def parse_output(cls, file_path) -> dict:
-        """
-        Parses the energibridge CSV output file to compute average values for specified metrics.
-        This code is adapted from: https://github.com/S2-group/python-compilers-rep-pkg
-        """
-        # Read the file into a pandas DataFrame
-        df = pd.read_csv(file_path).apply(pd.to_numeric, errors='coerce')
-
-        # Calculate column-wise averages, ignoring NaN values and deltas from start of experiment to finish
-        averages = df[cls.target_columns].mean().to_dict()
-        
-        # Account and mitigate potential RAPL overflow during metric collection
-        deltas = {}
-        for column in cls.delta_target_columns:
-            overflow_counter = 0
-            # Iterate and adjust values in the array
-            column_data = df[column].to_numpy()
-            for i in range(1, len(column_data)):
-                # Motivation behind Section IV-B from https://arxiv.org/pdf/2401.15985
-                if column_data[i] < column_data[i - 1]:
-                    output.console_log_WARNING(f"RAPL Overflow found:\nReading {i-1}: {column_data[i-1]}\nReading {i}: {column_data[i]}")
-                    overflow_counter += 1
-                    column_data[i:] += overflow_counter * RAPL_OVERFLOW_VALUE
-            deltas[column] = column_data[-1] - column_data[0]
-
-        return dict(averages.items() | deltas.items())
-
-class ScaphandreOutputParser:
-    @classmethod
-    def data_columns(cls) -> list:
-        return [f"{service}_energy_joules" for service in TARGET_SERVICES]
-
-    @staticmethod
-    def _iso_to_epoch(ts: str) -> float:
-        # "2025-10-06T13:15:24Z" -> seconds since epoch
-        return datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp()
-
-    @classmethod
-    def parse_output(cls, file_path: str) -> dict:
-        """
-        Parse .jsonl file containing per-service power readings in microwatts.
-        Compute energy (J) for each service using trapezoid rule.
-        Returns dict:
-        {
-            "media_service_energy_joules": ...,
-            "home_timeline_service_energy_joules": ...,
-            "compose_post_service_energy_joules": ...
-        }
-        """
-        rows = []
-        with open(file_path, "r", encoding="utf-8") as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    entry = json.loads(line)
-                    t = cls._iso_to_epoch(entry["timestamp"])
-                    row = {"t": t}
-                    for service in TARGET_SERVICES:
-                        key = f"{service}_power_uW"
-                        if key in entry:
-                            row[service] = entry[key] / 1e6  # convert µW → W
-                        else:
-                            row[service] = 0.0
-                    rows.append(row)
-                except Exception as e:
-                    print(f"[ScaphandreOutputParser] Skipped invalid line: {e}")
-
-        if not rows:
-            return {f"{service}_energy_joules": None for service in TARGET_SERVICES}
-
-        df = pd.DataFrame(rows).sort_values("t").reset_index(drop=True)
-
-        result = {}
-        for service in TARGET_SERVICES:
-            t = df["t"].to_numpy(dtype=float)
-            p = df[service].to_numpy(dtype=float)
-            if len(t) > 1:
-                # integrate power (Watts) over time (seconds) → Joules
-                E = float(np.trapz(p, t))
-                result[f"{service}_energy_joules"] = round(E, 2)
-            else:
-                result[f"{service}_energy_joules"] = 0.0
-
-        return result
-
-class DockerStatsOutputParser:
-    @staticmethod
-    def _mem_to_bytes(mem_usage_str: str) -> float:
-        """
-        Convert the 'used' part of docker's MemUsage to bytes.
-        Example: '824.3MiB / 2.00GiB' -> 824.3 * 1024**2
-        """
-        if not isinstance(mem_usage_str, str):
-            return math.nan
-        # Only the "used" side before the slash
-        used = mem_usage_str.split('/', 1)[0].strip()
-        m = re.match(r'^\s*([0-9]+(?:\.[0-9]+)?)\s*([KMGT]?i?B)\s*$', used, re.IGNORECASE)
-        if not m:
-            parts = used.split()
-            if len(parts) != 2:
-                return math.nan
-            val_str, unit = parts[0].replace(',', '.'), parts[1]
-            try:
-                val = float(val_str)
-            except Exception:
-                return math.nan
-            unit = unit.upper()
-        else:
-            val = float(m.group(1))
-            unit = m.group(2).upper()
-
-        mult = {
-            'B': 1,
-            'KB': 1000,
-            'MB': 1000**2,
-            'GB': 1000**3,
-            'TB': 1000**4,
-            'KIB': 1024,
-            'MIB': 1024**2,
-            'GIB': 1024**3,
-            'TIB': 1024**4,
-        }
-        return val * mult.get(unit, 1)
-
-    @staticmethod
-    def _cpu_to_float(cpu_str: str) -> float:
-        """Convert '5.23%' -> 5.23"""
-        if not isinstance(cpu_str, str):
-            return math.nan
-        s = cpu_str.strip().rstrip('%').replace(',', '.')
-        try:
-            return float(s)
-        except Exception:
-            return math.nan
-
-    @staticmethod
-    def _p95(series: pd.Series) -> float:
-        x = pd.to_numeric(series, errors='coerce').dropna()
-        return float(np.percentile(x, 95)) if not x.empty else math.nan
-
-    @classmethod
-    def data_columns(cls):
-        base_metrics = [
-            "cpu_usage_mean", "cpu_usage_p95", "cpu_usage_max", "cpu_usage_samples",
-            "mem_usage_mean", "mem_usage_p95", "mem_usage_max", "mem_usage_samples"
-        ]
-        return [f"{service}_{metric}" for service in TARGET_SERVICES for metric in base_metrics]
-
-    @classmethod
-    def parse_output(cls, file_path: str) -> dict:
-        """
-        Parse CSV with header: ts,Container,CPU%,MemUsage
-        Aggregate per service type (strip numeric suffixes).
-        """
-        df = pd.read_csv(file_path)
-
-        expected = {'ts', 'Container', 'CPU%', 'MemUsage'}
-        if not expected.issubset(df.columns):
-            raise ValueError(
-                f"Expected header {sorted(expected)} in {file_path}, found {list(df.columns)}"
-            )
-
-        # Parse numeric columns
-        df['cpu_pct']   = df['CPU%'].map(cls._cpu_to_float)
-        df['mem_bytes'] = df['MemUsage'].map(cls._mem_to_bytes)
-
-        # Remove suffix like -1, -2, ...
-        df['Service'] = df['Container'].str.replace(r'-\d+$', '', regex=True)
-
-        include = [f"socialnetwork-{service.replace('_', '-')}" for service in TARGET_SERVICES]
-        df = df[df['Service'].isin(include)]
-
-        if df.empty:
-            return {}
-
-        # Aggregate by Service (not by instance)
-        grp = df.groupby('Service', as_index=True)
-        metrics = {
-            "cpu_usage_mean":    grp['cpu_pct'].mean().to_dict(),
-            "cpu_usage_p95":     grp['cpu_pct'].apply(cls._p95).to_dict(),
-            "cpu_usage_max":     grp['cpu_pct'].max().to_dict(),
-            "cpu_usage_samples": grp['cpu_pct'].count().astype(int).to_dict(),
-            "mem_usage_mean":    grp['mem_bytes'].mean().to_dict(),
-            "mem_usage_p95":     grp['mem_bytes'].apply(cls._p95).to_dict(),
-            "mem_usage_max":     grp['mem_bytes'].max().to_dict(),
-            "mem_usage_samples": grp['mem_bytes'].count().astype(int).to_dict(),
-        }
-        result = {}
-        for metric, service_map in metrics.items():
-            for service, val in service_map.items():
-                short_service = service.replace("socialnetwork-", "").replace("-", "_")
-                result[f"{short_service}_{metric}"] = (
-                    None if (isinstance(val, float) and math.isnan(val)) else val / CPU_COUNT
-                )
-
-        return result
-
-class LocustStatsOutputParser:
-    @classmethod
-    def data_columns(cls) -> list:
-        return ['throughput', 'latency_p50', 'latency_p90', 'latency_p95', 'latency_p99'] 
-
-    @classmethod
-    def parse_output(cls, locust_stats) -> dict:
-        return {
-            "throughput": locust_stats.num_requests / locust_stats.total_response_time,
-            "latency_p50": locust_stats.get_response_time_percentile(0.50),
-            "latency_p90": locust_stats.get_response_time_percentile(0.90),
-            "latency_p95": locust_stats.get_response_time_percentile(0.95),
-            "latency_p99": locust_stats.get_response_time_percentile(0.99)
-        }
+# Generate load from a Locust master plus worker processes (default: one per core) instead of a single process
+LOCUST_DISTRIBUTED = getenv("LOCUST_DISTRIBUTED", "False").lower() in ("true", "1", "t")
+LOCUST_WORKERS = int(getenv("LOCUST_WORKERS") or 0) or None
+# Add the open-loop (constant arrival rate) load levels to the run table, and pick their inter-arrival schedule
+OPEN_LOOP_LEVELS = getenv("OPEN_LOOP_LEVELS", "False").lower() in ("true", "1", "t")
+ARRIVAL_SCHEDULE = ArrivalSchedule(getenv("ARRIVAL_SCHEDULE", "poisson").lower())
+# HTTP client of the simulated users (requests | fasthttp), and the fasthttp keep-alive connections per process and host
+LOCUST_HTTP_CLIENT = HttpClient(getenv("LOCUST_HTTP_CLIENT", "requests").lower())
+LOCUST_FRONTEND_CONNECTIONS = int(getenv("LOCUST_FRONTEND_CONNECTIONS") or 0) or None
+LOCUST_MEDIA_CONNECTIONS = int(getenv("LOCUST_MEDIA_CONNECTIONS") or 0) or None
+# Pre-provisioned user accounts (0: every simulated user signs up itself), with follows and seed posts per account
+USER_POOL_SIZE = int(getenv("USER_POOL_SIZE") or 0)
+USER_POOL_FOLLOWS = int(getenv("USER_POOL_FOLLOWS") or 0)
+USER_POOL_POSTS = int(getenv("USER_POOL_POSTS") or 0)
+# End warmup and cooldown once testbed power and temperature are steady, instead of after fixed sleeps
+ADAPTIVE_WARMUP = getenv("ADAPTIVE_WARMUP", "False").lower() in ("true", "1", "t")
+# Also warm the DeathStarBench services with a short low-rate replay of the run's load type
+SERVICE_WARMUP = getenv("SERVICE_WARMUP", "False").lower() in ("true", "1", "t")
+# Order of the runs (shuffle | governor_blocks), and the seed it is drawn from (default: random)
+RUN_SCHEDULE = RunSchedule(getenv("RUN_SCHEDULE", "shuffle").lower())
+RUN_SCHEDULE_SEED = int(getenv("RUN_SCHEDULE_SEED")) if getenv("RUN_SCHEDULE_SEED") else None
+# Stop repeating a cell once its primary metrics are precise enough (bounds and targets in RunnerConfig)
+ADAPTIVE_REPETITIONS = getenv("ADAPTIVE_REPETITIONS", "False").lower() in ("true", "1", "t")
+# Fetch a run's artifacts as one compressed, checksummed archive instead of one SCP per file;
+# with OVERLAP_TRANSFER they are fetched and parsed during the next run's warmup instead
+BUNDLE_TRANSFER = getenv("BUNDLE_TRANSFER", "False").lower() in ("true", "1", "t")
+OVERLAP_TRANSFER = getenv("OVERLAP_TRANSFER", "False").lower() in ("true", "1", "t")
+# Measure with the resident testbed agent, which returns the summary columns as soon as a run stops;
+# with AGENT_RAW_TRACES it also writes the raw traces, fetched in the background during the next warmup
+TESTBED_AGENT = getenv("TESTBED_AGENT", "False").lower() in ("true", "1", "t")
+AGENT_RAW_TRACES = getenv("AGENT_RAW_TRACES", "False").lower() in ("true", "1", "t")
+DEFERRED_TRANSFER = OVERLAP_TRANSFER or (TESTBED_AGENT and AGENT_RAW_TRACES)
+# Summarise every data source over the same load window (bounds in RunnerConfig), mapped to the testbed clock
+MEASUREMENT_WINDOW = getenv("MEASUREMENT_WINDOW", "False").lower() in ("true", "1", "t")
+
+PARALLEL_PARSING = getenv("PARALLEL_PARSING", "False").lower() in ("true", "1", "t")
+# Also keep every finished run, with its per-second series, in a columnar store (see RunStore)
+RUN_STORE = getenv("RUN_STORE", "False").lower() in ("true", "1", "t")
+# Sleep between runs in the runner only when start_run does not settle the testbed itself
+SETTLE_IN_RUN = ADAPTIVE_WARMUP or RUN_SCHEDULE is RunSchedule.GOVERNOR_BLOCKS
 
 class RunnerConfig:
     ROOT_DIR = Path(dirname(realpath(__file__)))
@@ -278,8 +100,10 @@ class RunnerConfig:
     operation_type:             OperationType   = OperationType.AUTO
 
     """The time Experiment Runner will wait after a run completes.
-    This can be essential to accommodate for cooldown periods on some systems."""
-    time_between_runs_in_ms:    int             = 90_000 if not DEBUG_MODE else 1_000  # milliseconds
+    This can be essential to accommodate for cooldown periods on some systems.
+    With ADAPTIVE_WARMUP the next run's warmup and steady-state cooldown take care of this,
+    with governor blocks the settle time at the start of the next run."""
+    time_between_runs_in_ms:    int             = 0 if SETTLE_IN_RUN else 90_000 if not DEBUG_MODE else 1_000  # milliseconds
 
     # Dynamic configurations can be one-time satisfied here before the program takes the config as-is
     # e.g. Setting some variable based on some criteria
@@ -304,10 +128,57 @@ class RunnerConfig:
         self.energibridge_csv_filename = "energibridge.csv"
         self.scaphandre_json_filename = "scaphandre_energy.jsonl"
         self.docker_stats_csv_filename = "docker_stats.csv"
+        self.cpufreq_json_filename = "cpufreq_stats.json"
+        self.cpufreq_trace_filename = "cpufreq_trace.csv"
+        self.pending_transfers_filename = "pending_transfers.json"
+        self.agent_summary = None
+        self.post_processor = None  # Created in before_experiment, lives in the experiment's process
+        self.run_store = None       # Likewise
+        self.factor_names = None
+        self.application_host = f"http://{getenv('APPLICATION_IP')}:{getenv('APPLICATION_PORT')}"
+        self.user_pool_file = self.results_output_path / self.name / "user_pool.json" if USER_POOL_SIZE else None
 
         self.energibridge_metric_capturing_interval : int = 1000                        # milliseconds
+        self.energibridge_parse_chunksize           : int = EnergibridgeOutputParser.DEFAULT_CHUNKSIZE # rows
+        self.parse_workers                          : int = 1                           # processes (PARALLEL_PARSING), niced
+        self.docker_stats_interval                  : float = 1.0                       # seconds
+        self.scaphandre_interval                    : float = 2.0                       # seconds
+        self.cpufreq_trace_interval                 : float = 0.0                       # seconds between scaling_cur_freq polls, 0 = kernel statistics only
         self.warmup_time                            : int = 60 if not DEBUG_MODE else 5 # seconds
+        self.warmup_utilization                     : float = 0.5                       # target utilization of every core
+        self.warmup_memory_mb                       : int = 1024                        # MiB streamed by the warmup workers
+        self.warmup_io_mb                           : int = 0                           # MiB rewritten by the warmup I/O phase
         self.post_warmup_cooldown_time              : int = 30 if not DEBUG_MODE else 1 # seconds
+        # Adaptive warmup/cooldown (ADAPTIVE_WARMUP): each phase ends once the rolling window is steady, within bounds
+        self.warmup_min_time                        : int = 20 if not DEBUG_MODE else 5  # seconds
+        self.warmup_max_time                        : int = 180 if not DEBUG_MODE else 10 # seconds
+        self.cooldown_min_time                      : int = 10 if not DEBUG_MODE else 1  # seconds
+        self.cooldown_max_time                      : int = 120 if not DEBUG_MODE else 5 # seconds
+        self.steady_state_window                    : int = 15                          # samples, one per second
+        self.steady_state_power_tolerance           : float = 0.05                      # relative spread of package power
+        self.steady_state_temperature_tolerance     : float = 1.0                       # degrees C
+        # Governor blocks (RUN_SCHEDULE=governor_blocks): idle before warmup, fully after a governor switch
+        self.governor_switch_settle_time            : int = 90 if not DEBUG_MODE else 1 # seconds
+        self.load_switch_settle_time                : int = 30 if not DEBUG_MODE else 1 # seconds, governor unchanged
+        self.run_overhead_time                      : int = 20                          # seconds per run (projection only)
+        # Measurement window (MEASUREMENT_WINDOW): the load window, without the ramp-up, trimmed at both ends
+        self.window_exclude_ramp                    : bool = True
+        self.window_trim_start                      : float = 0.0                       # seconds
+        self.window_trim_end                        : float = 0.0                       # seconds
+        self.clock_offset_samples                   : int = 8                           # round trips per estimate
+        self.repetitions                            : int = 15 if not DEBUG_MODE else 1 # per cell; the run budget with ADAPTIVE_REPETITIONS
+        # Adaptive repetitions (ADAPTIVE_REPETITIONS): a cell stops once every metric's CI half-width is below its target
+        self.min_repetitions                        : int = 5 if not DEBUG_MODE else 1  # per cell
+        self.max_repetitions                        : int = 30 if not DEBUG_MODE else 2 # per cell
+        self.repetition_confidence                  : float = 0.95
+        self.repetition_targets                     : Dict[str, float] = {              # half-width relative to the mean
+            'PACKAGE_ENERGY (J)': 0.02,
+            'latency_p95': 0.05,
+        }
+        # Every file a run leaves on the testbed; fixed for the experiment, as parked runs are fetched by later ones
+        self.run_artifacts = [self.energibridge_csv_filename, self.docker_stats_csv_filename, self.scaphandre_json_filename, self.cpufreq_json_filename]
+        if self.cpufreq_trace_interval > 0:
+            self.run_artifacts.append(self.cpufreq_trace_filename)
 
         output.console_log("Custom config loaded")
         output.console_log("Current environment: " + ("DEBUG" if DEBUG_MODE else "PRODUCTION"))
@@ -315,63 +186,205 @@ class RunnerConfig:
     def create_run_table_model(self) -> RunTableModel:
         """Create and return the run_table model here. A run_table is a List (rows) of tuples (columns),
         representing each run performed"""
+        load_levels = ['low', 'medium', 'high']
+        if OPEN_LOOP_LEVELS:
+            load_levels += ['open_low', 'open_medium', 'open_high']
         if not DEBUG_MODE:
             factor1 = FactorModel("cpu_governor", ['performance', 'powersave', 'userspace', 'ondemand', 'conservative', 'schedutil'])
             factor2 = FactorModel("load_type", ['media', 'home_timeline', 'compose_post'])
-            factor3 = FactorModel("load_level", ['low', 'medium', 'high'])
+            factor3 = FactorModel("load_level", load_levels)
         else:
             factor1 = FactorModel("cpu_governor", ['performance'])
             factor2 = FactorModel("load_type", ['media', 'home_timeline', 'compose_post'])
-            factor3 = FactorModel("load_level", ['low', 'medium', 'high'])
+            factor3 = FactorModel("load_level", load_levels)
         # Data columns for measurement results of run_table.csv
         energybridge_data_columns = EnergibridgeOutputParser.data_columns()
         scaphandre_data_columns = ScaphandreOutputParser.data_columns()
         docker_stats_data_columns = DockerStatsOutputParser.data_columns()
+        cpufreq_data_columns = CpuFreqOutputParser.data_columns()
         client_metric_data_columns = LocustStatsOutputParser.data_columns()  
-        run_table_data_columns = ["run_time"] + energybridge_data_columns + scaphandre_data_columns + docker_stats_data_columns + client_metric_data_columns
-        self.run_table_model = RunTableModel(
-            factors=[factor1, factor2, factor3],
-            repetitions=15 if not DEBUG_MODE else 1,
+        efficiency_data_columns = EfficiencyMetrics.data_columns()
+        phase_data_columns = PhaseTracer.data_columns()
+        run_table_data_columns = ["run_time", "governor_switched", "settle_time", "warmup_time", "cooldown_time", "clock_offset", "window_duration"] + energybridge_data_columns + scaphandre_data_columns + docker_stats_data_columns + cpufreq_data_columns + client_metric_data_columns + efficiency_data_columns + phase_data_columns
+        factors = [factor1, factor2, factor3]
+        self.factor_names = [factor.factor_name for factor in factors]
+        budget = self.repetitions * math.prod(len(factor.treatments) for factor in factors)
+        stopping = None
+        if ADAPTIVE_REPETITIONS:
+            stopping = SequentialStopping(
+                lambda: self.experiment_path / "run_table.csv" if self.experiment_path else None,
+                self.factor_names, self.repetition_targets,
+                self.min_repetitions, budget, self.repetition_confidence,
+            )
+            run_table_data_columns.append(SKIPPED)
+            if self.experiment_path is not None and (self.experiment_path / "run_table.csv").exists():
+                # Restart: the runner resumes from run_table.csv, not from the AdaptiveRunTable. Skip the runs of cells
+                # that converged (or all runs, if the budget is spent) there before it reads the table back; cells that
+                # converge after the restart keep their runs until the next restart.
+                rows = CSVOutputManager(self.experiment_path).read_run_table()
+                skipped = AdaptiveRunTable(rows, stopping).skip_remaining()
+                if skipped:
+                    output.console_log_OK(f"Skipped {skipped} runs of the resumed run table (adaptive repetitions)")
+        self.run_table_model = ScheduledRunTableModel(
+            factors=factors,
+            repetitions=self.max_repetitions if ADAPTIVE_REPETITIONS else self.repetitions,
             shuffle=True if not DEBUG_MODE else False,
-            data_columns=run_table_data_columns
+            data_columns=run_table_data_columns,
+            schedule=RUN_SCHEDULE,
+            seed=RUN_SCHEDULE_SEED,
+            stopping=stopping,
+        )
+        # With adaptive repetitions at most `budget` runs of the table are executed
+        runs = self.run_table_model.generate_experiment_run_table()[:budget]
+        projected, switches = project_wall_clock(runs, self.projected_run_time)
+        output.console_log(
+            f"Run schedule {RUN_SCHEDULE.value} (seed {self.run_table_model.seed}): {len(runs)} runs, "
+            f"{switches} governor switches, projected wall-clock time "
+            f"{'at most ' if ADAPTIVE_WARMUP or ADAPTIVE_REPETITIONS else ''}{projected / 3600:.1f} h"
         )
         return self.run_table_model
 
+    def projected_run_time(self, run: Dict[str, Any], governor_switched: bool) -> float:
+        """Estimated seconds from the end of the previous run to the end of `run` (upper bound with ADAPTIVE_WARMUP)."""
+        if ADAPTIVE_WARMUP:
+            warmup = self.warmup_max_time + self.cooldown_max_time
+        else:
+            replay = LoadLevel.WARMUP.duration if SERVICE_WARMUP else 0
+            warmup = max(self.warmup_time, replay) + self.post_warmup_cooldown_time
+        return (
+            self.settle_time(governor_switched) + self.time_between_runs_in_ms / 1000 + warmup
+            + LoadLevel[run['load_level'].upper()].duration + self.run_overhead_time
+        )
+
+    def settle_time(self, governor_switched: bool) -> float:
+        if RUN_SCHEDULE is not RunSchedule.GOVERNOR_BLOCKS or ADAPTIVE_WARMUP:
+            return 0
+        return self.governor_switch_settle_time if governor_switched else self.load_switch_settle_time
+
     def before_experiment(self) -> None:
         """Perform any activity required before starting the experiment here
         Invoked only once during the lifetime of the program."""
+        if PARALLEL_PARSING:
+            # Also merges the parses a previous, interrupted session left behind
+            self.post_processor = PostProcessor(self.experiment_path, self.parse_workers)
+            self.post_processor.sync()
+        if RUN_STORE:
+            self.run_store = RunStore(self.experiment_path / "run_store", self.factor_names)
+
         ssh = ExternalMachineAPI()
         ssh.execute_remote_command(f"mkdir -p {self.external_run_dir}")
         output.console_log_OK(f"Created experiment directory at {self.external_run_dir} on remote machine.")
+        if TESTBED_AGENT:
+            TestbedAgent.launch(ssh, self.testbed_project_directory).close()
         del ssh
 
+        if self.user_pool_file is not None:
+            output.console_log(f"Provisioning a pool of {USER_POOL_SIZE} user accounts...")
+            UserPool.provision(self.user_pool_file, self.application_host, USER_POOL_SIZE, USER_POOL_FOLLOWS, USER_POOL_POSTS)
+            output.console_log_OK(f"User pool written to {self.user_pool_file}")
+
     def before_run(self) -> None:
         """Perform any activity required before starting a run.
         No context is available here as the run is not yet active (BEFORE RUN)"""
+        # The run's phase trace starts here; the run's own process inherits it
+        PhaseTracer.reset()
+        with PhaseTracer.span("before_run"):
+            if self.post_processor is not None:
+                # Runs up to the previous one are written to the run table; the pool takes the new parse jobs
+                self.post_processor.sync()
+            if self.run_store is not None:
+                self.store_finished_runs()
+            self.write_phase_report()
+
         self.run_time = None
+        self.governor_switched = None
+        self.settle_seconds = None
+        self.warmup_seconds = None
+        self.cooldown_seconds = None
         self.workload_result = None
+        self.workload_summary = {}
+        self.rapl_wrap_values = {}
+        self.agent_summary = None
+        self.clock_offset = None
+        self.measurement_window = None
 
     def start_run(self, context: RunnerContext) -> None:
         """Perform any activity required for starting the run here.
         For example, starting the target system to measure.
         Activities after starting the run should also be performed here."""
-        ssh = ExternalMachineAPI()
-
-        # SSH Set CPU governor
-        cpu_governor = context.execute_run['cpu_governor']
-        ssh.execute_remote_command(f"sudo set-governor.sh {cpu_governor}")
-        output.console_log_OK(f"Set CPU governor to {cpu_governor}")
+        with PhaseTracer.span("governor"):
+            ssh = ExternalMachineAPI()
+
+            # SSH Set CPU governor, unless it is already active (consecutive runs of a governor block)
+            cpu_governor = context.execute_run['cpu_governor']
+            ssh.execute_remote_command("cat /sys/devices/system/cpu/cpu0/cpufreq/scaling_governor")
+            self.governor_switched = ssh.stdout.readline().strip() != cpu_governor
+            if self.governor_switched:
+                ssh.execute_remote_command(f"sudo set-governor.sh {cpu_governor}")
+                output.console_log_OK(f"Set CPU governor to {cpu_governor}")
+            else:
+                output.console_log_OK(f"CPU governor {cpu_governor} already active")
+
+        # Let the testbed settle from the previous run: shorter if only load_type/load_level change
+        self.settle_seconds = self.settle_time(self.governor_switched)
+        if self.settle_seconds:
+            output.console_log(f"Settling for {self.settle_seconds} seconds...")
+            with PhaseTracer.span("settle"):
+                time.sleep(self.settle_seconds)
+
+        with PhaseTracer.span("run_setup"):
+            # Sample the RAPL wrap value of each energy domain for overflow correction
+            ssh.execute_remote_command(EnergibridgeOutputParser.RAPL_WRAP_VALUES_COMMAND)
+            self.rapl_wrap_values = EnergibridgeOutputParser.parse_wrap_values(ssh.iter_lines())
+
+            # Testbed clock relative to ours, to map the load window onto the testbed's samples
+            if MEASUREMENT_WINDOW:
+                self.clock_offset, rtt = estimate_clock_offset(ExternalMachineAPI(), self.clock_offset_samples)
+                if rtt is not None:
+                    output.console_log_OK(f"Testbed clock offset {self.clock_offset * 1000:+.1f} ms (+-{rtt * 500:.1f} ms)")
+
+            # Renew the pool's login tokens before they can expire during the measurement
+            if self.user_pool_file is not None:
+                UserPool.load(self.user_pool_file).refresh_tokens(self.application_host, UserPool.TOKEN_MAX_AGE)
 
         # Warmup machine
-        output.console_log(f"Warming up machine for {self.warmup_time} seconds...")
-        # SSH start warmup task
-        ssh.execute_remote_command(f"python3 {self.testbed_project_directory}/warmup.py 1000 & pid=$!; echo $pid")
-        warmup_pid = ssh.stdout.readline().strip()
-        time.sleep(self.warmup_time)
-        # SSH stop warmup task
-        ssh.execute_remote_command(f"kill {warmup_pid}")
+        if ADAPTIVE_WARMUP:
+            output.console_log(f"Warming up machine until steady (max {self.warmup_max_time} seconds)...")
+        else:
+            output.console_log(f"Warming up machine for {self.warmup_time} seconds...")
+        with PhaseTracer.span("warmup"):
+            # SSH start warmup task: every core at the target utilization, plus the memory and I/O phases
+            ssh.execute_remote_command(
+                f"python3 {self.testbed_project_directory}/warmup.py --utilization {self.warmup_utilization} "
+                f"--memory-mb {self.warmup_memory_mb} --io-mb {self.warmup_io_mb} "
+                f"> {self.external_run_dir}/warmup.log 2>&1 & pid=$!; echo $pid"
+            )
+            warmup_pid = ssh.stdout.readline().strip()
+            warmup_start = time.monotonic()
+            # Fetch and parse the previous run's artifacts while the machine warms up
+            pending_transfers = threading.Thread(target=self.complete_pending_runs) if DEFERRED_TRANSFER else None
+            if pending_transfers is not None:
+                pending_transfers.start()
+            if SERVICE_WARMUP:
+                load_type = LoadType[context.execute_run['load_type'].upper()]
+                output.console_log(f"Warming up the services with a low-rate {load_type.name} replay...")
+                self.workload_generator().fire_load(load_type, LoadLevel.WARMUP)
+            replay_time = time.monotonic() - warmup_start
+            self.warmup_seconds = replay_time + self.wait_phase(
+                "Warmup", max(0, self.warmup_time - replay_time), max(0, self.warmup_min_time - replay_time),
+                max(0, self.warmup_max_time - replay_time)
+            )
+            # SSH stop warmup task
+            ssh.execute_remote_command(f"kill {warmup_pid}")
         # Cooldown a bit after warmup
-        time.sleep(self.post_warmup_cooldown_time)
+        # The transfer must not overlap the measurement; waiting for it here is on the run's critical path
+        if pending_transfers is not None:
+            with PhaseTracer.span("transfer_wait"):
+                pending_transfers.join()
+        with PhaseTracer.span("cooldown"):
+            self.cooldown_seconds = self.wait_phase(
+                "Cooldown", self.post_warmup_cooldown_time, self.cooldown_min_time, self.cooldown_max_time
+            )
         del ssh
         output.console_log_OK("Warmup finished. Experiment is starting now!")
         
@@ -379,73 +392,164 @@ class RunnerConfig:
         # Server-level energy measurement with EnergiBridge
         sleep_duration_seconds = 300 # Long enough for the whole workload generation to finish
         self.energibridge_command = f"energibridge --interval {self.energibridge_metric_capturing_interval} --summary --output {self.external_run_dir}/{self.energibridge_csv_filename} --command-output {self.external_run_dir}/output.txt sleep {sleep_duration_seconds}"
-        # TODO: Container-level energy measurement tools with scaphandre, interval: 2s
+        # Container-level energy measurement tools with scaphandre
         self.scaphandre_start = (
             f"bash -lc 'DIR={self.testbed_project_directory}; "
-            f"nohup python3 $DIR/scaphandre_collector.py > $DIR/scaphandre_collector.out 2>&1 & "
+            f"nohup python3 $DIR/scaphandre_collector.py --interval {self.scaphandre_interval} "
+            f"--output {self.external_run_dir}/{self.scaphandre_json_filename} > $DIR/scaphandre_collector.out 2>&1 & "
             f"echo $! > $DIR/scaphandre_collector.pid'"
         )
+        # Waits until the collector exited: it writes its last batch of readings on the way out
         self.scaphandre_stop = (
             f"bash -lc 'DIR={self.testbed_project_directory}; "
-            f"[ -f $DIR/scaphandre_collector.pid ] && "
-            f"kill -TERM $(cat $DIR/scaphandre_collector.pid) && "
-            f"rm -f $DIR/scaphandre_collector.pid || true'"
+            f"[ -f $DIR/scaphandre_collector.pid ] && PID=$(cat $DIR/scaphandre_collector.pid) && "
+            f"kill -TERM $PID && rm -f $DIR/scaphandre_collector.pid && "
+            f"while kill -0 $PID 2>/dev/null; do sleep 0.05; done || true'"
         )
 
-        # Commands for collecting container-level CPU and memory usage on host machine: samples per second
+        # Commands for collecting container-level CPU and memory usage on host machine: samples per second.
+        # The collector reads the containers' cgroup v2 files directly instead of querying the Docker daemon.
+        docker_stats_containers = " ".join(
+            f"--container socialnetwork-{service.replace('_', '-')}" for service in TARGET_SERVICES
+        )
         self.docker_stats_start = (
-            f"bash -lc 'DIR={self.external_run_dir}; FILE={self.docker_stats_csv_filename}; INT=1; "
-            f"mkdir -p \"$DIR\"; echo \"ts,Container,CPU%,MemUsage\" > \"$DIR/$FILE\"; "
-            f"( while :; do docker stats --no-stream --format \"{{{{.Name}}}},{{{{.CPUPerc}}}},{{{{.MemUsage}}}}\" "
-            f"| awk -v ts=\"$(date +%s)\" -F, '\\''{{print ts\",\"$0}}'\\'' >> \"$DIR/$FILE\"; "
-            f"sleep \"$INT\"; done ) & echo $! > \"$DIR/docker_stats.pid\"'")
+            f"bash -lc 'DIR={self.external_run_dir}; PROJECT={self.testbed_project_directory}; "
+            f"mkdir -p \"$DIR\"; "
+            f"nohup python3 $PROJECT/docker_stats_collector.py --output \"$DIR/{self.docker_stats_csv_filename}\" "
+            f"--interval {self.docker_stats_interval} {docker_stats_containers} > $PROJECT/docker_stats_collector.out 2>&1 & "
+            f"echo $! > \"$DIR/docker_stats.pid\"'")
         self.docker_stats_stop = (
             f"bash -lc 'DIR={self.external_run_dir}; "
             f"[ -f \"$DIR/docker_stats.pid\" ] && kill -TERM \"$(cat \"$DIR/docker_stats.pid\")\" && rm -f \"$DIR/docker_stats.pid\" || true'")
+
+        # Per-core frequency residency and transitions: cpufreq statistics at start and stop, optionally a polled trace
+        cpufreq_trace = (
+            f"--interval {self.cpufreq_trace_interval} --trace-output {self.external_run_dir}/{self.cpufreq_trace_filename} "
+            if self.cpufreq_trace_interval > 0 else ""
+        )
+        self.cpufreq_start = (
+            f"bash -lc 'PROJECT={self.testbed_project_directory}; "
+            f"nohup python3 $PROJECT/cpufreq_sampler.py --output {self.external_run_dir}/{self.cpufreq_json_filename} "
+            f"{cpufreq_trace}> $PROJECT/cpufreq_sampler.out 2>&1 & "
+            f"echo $! > {self.external_run_dir}/cpufreq_sampler.pid'"
+        )
+        self.cpufreq_stop = (
+            f"bash -lc 'PID_FILE={self.external_run_dir}/cpufreq_sampler.pid; "
+            f"[ -f $PID_FILE ] && PID=$(cat $PID_FILE) && kill -TERM $PID && rm -f $PID_FILE && "
+            f"while kill -0 $PID 2>/dev/null; do sleep 0.05; done || true'"
+        )
         output.console_log_OK('Run configuration is successful.')
 
+    def workload_generator(self) -> WorkloadGenerator:
+        return WorkloadGenerator(
+            distributed=LOCUST_DISTRIBUTED, workers=LOCUST_WORKERS, arrival_schedule=ARRIVAL_SCHEDULE,
+            http_client=LOCUST_HTTP_CLIENT,
+            frontend_connections=LOCUST_FRONTEND_CONNECTIONS, media_connections=LOCUST_MEDIA_CONNECTIONS,
+            user_pool=self.user_pool_file,
+        )
+
+    def wait_phase(self, label: str, fixed_time: float, min_time: float, max_time: float) -> float:
+        """Sleep `fixed_time`, or with ADAPTIVE_WARMUP until the testbed is steady within the bounds. Returns the seconds spent."""
+        if not ADAPTIVE_WARMUP:
+            time.sleep(fixed_time)
+            return fixed_time
+        ssh_monitor = ExternalMachineAPI()
+        detector = SteadyStateDetector(
+            self.steady_state_window, self.steady_state_power_tolerance, self.steady_state_temperature_tolerance
+        )
+        # As root: RAPL energy counters are not readable otherwise
+        monitor_command = f"sudo python3 {self.testbed_project_directory}/power_monitor.py --duration {max_time + 10}"
+        elapsed = wait_for_steady_state(ssh_monitor, monitor_command, detector, min_time, max_time, label, fixed_time)
+        del ssh_monitor
+        return elapsed
+
     def start_measurement(self, context: RunnerContext) -> None:
         """Perform any activity required for starting measurements."""
-        # Separate SSH client for energibridge to avoid blocking
-        ssh_energibridge = ExternalMachineAPI()
-        ssh_scaphandre = ExternalMachineAPI()
-        ssh_docker_stats = ExternalMachineAPI()
-        workloadGenerator = WorkloadGenerator()
+        workloadGenerator = self.workload_generator()
         self.run_time = time.time()
 
-        # SSH execute measurement commands
-        ssh_energibridge.execute_remote_command(f"{self.energibridge_command} & pid=$!; echo $pid")
-        energibridge_pid = ssh_energibridge.stdout.readline().strip()
-        output.console_log_OK(f"EnergiBridge started with PID {energibridge_pid}")
-        ssh_scaphandre.execute_remote_command(self.scaphandre_start)
-        output.console_log_OK("Scaphandre collector started for container-level energy measurement.")
-        ssh_docker_stats.execute_remote_command(self.docker_stats_start)
-        output.console_log_OK("Docker stats collection started.")
+        # The collectors start one after the other; this phase is the skew between the first and the last
+        with PhaseTracer.span("collectors_start"):
+            if TESTBED_AGENT:
+                # All collectors run inside the resident agent, driven over one channel for the whole run
+                agent = TestbedAgent.connect(ExternalMachineAPI())
+                agent.start(**self.agent_settings())
+                output.console_log_OK("Measurement agent collecting.")
+            else:
+                # Separate SSH client for energibridge to avoid blocking
+                ssh_energibridge = ExternalMachineAPI()
+                ssh_scaphandre = ExternalMachineAPI()
+                ssh_docker_stats = ExternalMachineAPI()
+
+                # SSH execute measurement commands
+                ssh_energibridge.execute_remote_command(f"{self.energibridge_command} & pid=$!; echo $pid")
+                energibridge_pid = ssh_energibridge.stdout.readline().strip()
+                output.console_log_OK(f"EnergiBridge started with PID {energibridge_pid}")
+                ssh_scaphandre.execute_remote_command(self.scaphandre_start)
+                output.console_log_OK("Scaphandre collector started for container-level energy measurement.")
+                ssh_docker_stats.execute_remote_command(self.docker_stats_start)
+                output.console_log_OK("Docker stats collection started.")
+                ssh_cpufreq = ExternalMachineAPI()
+                ssh_cpufreq.execute_remote_command(self.cpufreq_start)
+                output.console_log_OK("CPU frequency sampler started.")
 
         # Fire workload with Locust
         load_type = LoadType[context.execute_run['load_type'].upper()]
         load_level = LoadLevel[context.execute_run['load_level'].upper()]
         output.console_log(f"Firing workload: {load_type.name} at {load_level.name} level...")
         # Locust performance metrics
-        self.workload_result = workloadGenerator.fire_load(load_type, load_level)
+        if TESTBED_AGENT:
+            agent.mark("load_start")
+        with PhaseTracer.span("load"):
+            self.workload_result = workloadGenerator.fire_load(load_type, load_level, output_dir=context.run_dir)
+        self.workload_summary = workloadGenerator.run_summary
+        if MEASUREMENT_WINDOW:
+            self.measurement_window = MeasurementWindow.from_run_summary(
+                self.workload_summary, self.clock_offset or 0.0,
+                self.window_exclude_ramp, self.window_trim_start, self.window_trim_end,
+            )
 
         output.console_log_OK('Run has successfully started.')
 
-        # Kill energibridge after workload is done
-        ssh_energibridge.execute_remote_command(f"kill {energibridge_pid}")
-        output.console_log_OK("EnergiBridge stopped.")
-
-        # Stop Scaphandre
-        ssh_scaphandre.execute_remote_command(self.scaphandre_stop)
-        output.console_log_OK("Scaphandre collector stopped.")
-
-        # Stop docker stats collection
-        ssh_docker_stats.execute_remote_command(self.docker_stats_stop)
-        output.console_log_OK("Docker stats collection stopped.")
+        with PhaseTracer.span("collectors_stop"):
+            if TESTBED_AGENT:
+                agent.mark("load_end")
+                self.agent_summary = agent.stop(self.testbed_window())
+                agent.close()
+                output.console_log_OK("Measurement agent stopped.")
+            else:
+                # Kill energibridge after workload is done
+                ssh_energibridge.execute_remote_command(f"kill {energibridge_pid}")
+                output.console_log_OK("EnergiBridge stopped.")
+
+                # Stop Scaphandre
+                ssh_scaphandre.execute_remote_command(self.scaphandre_stop)
+
+                # Stop docker stats collection
+                ssh_docker_stats.execute_remote_command(self.docker_stats_stop)
+                output.console_log_OK("Docker stats collection stopped.")
+
+                # Stop the frequency sampler; it writes its end snapshot on the way out
+                ssh_cpufreq.execute_remote_command(self.cpufreq_stop)
+                ssh_cpufreq.stdout.channel.recv_exit_status()
+                output.console_log_OK("CPU frequency sampler stopped.")
+                # Stopped concurrently with the others; its file is complete once it exited
+                ssh_scaphandre.stdout.channel.recv_exit_status()
+                output.console_log_OK("Scaphandre collector stopped.")
         
         self.run_time = time.time() - self.run_time
         output.console_log_OK(f'Run has completed in {self.run_time:.2f} seconds.')
 
+    def agent_settings(self) -> Dict[str, Any]:
+        return {
+            "interval": self.energibridge_metric_capturing_interval / 1000,
+            "docker_interval": self.docker_stats_interval,
+            "scaphandre_interval": self.scaphandre_interval,
+            "cpufreq_interval": self.cpufreq_trace_interval,
+            "containers": [f"socialnetwork-{service.replace('_', '-')}" for service in TARGET_SERVICES],
+            "raw_dir": self.external_run_dir if AGENT_RAW_TRACES else None,
+        }
+
     def interact(self, context: RunnerContext) -> None:
         """Perform any interaction with the running target system here, or block here until the target finishes."""
         pass
@@ -463,34 +567,195 @@ class RunnerConfig:
         """Parse and process any measurement data here.
         You can also store the raw measurement data under `context.run_dir`
         Returns a dictionary with keys `self.run_table_model.data_columns` and their values populated"""
-
+        run_data = self.measurements(context)
+        # The run is traced up to here: its phases go into the run table, its spans next to its artifacts
+        PhaseTracer.write(context.run_dir)
+        return {**run_data, **PhaseTracer.summary()}
+
+    def measurements(self, context: RunnerContext) -> Dict[str, Any]:
+        """Run table columns of the run's measurements, as far as they are available before the next run."""
+        with PhaseTracer.span("parse"):
+            run_data = {
+                "run_time": self.run_time,
+                "governor_switched": self.governor_switched,
+                "settle_time": self.settle_seconds,
+                "warmup_time": self.warmup_seconds,
+                "cooldown_time": self.cooldown_seconds,
+                "clock_offset": self.clock_offset,
+                "window_duration": self.measurement_window.duration if self.measurement_window else None,
+                **LocustStatsOutputParser.parse_output(
+                    self.workload_result, self.workload_summary, context.run_dir / RequestTimeSeries.FILE_NAME,
+                    self.measurement_window.orchestrator() if self.measurement_window else None,
+                )
+            }
+            if TESTBED_AGENT:
+                # The agent summarised the samples while they arrived; raw traces (if any) follow in the background
+                run_data.update({
+                    **EnergibridgeOutputParser.from_summary(self.agent_summary["system"]),
+                    **DockerStatsOutputParser.from_summary(self.agent_summary["containers"]),
+                    **ScaphandreOutputParser.from_summary(self.agent_summary["scaphandre"]),
+                    **CpuFreqOutputParser.from_summary(self.agent_summary.get("cpufreq")),
+                })
+        if TESTBED_AGENT:
+            if AGENT_RAW_TRACES:
+                with PhaseTracer.span("transfer"):
+                    self.park_artifacts(context, parse=False)
+            return EfficiencyMetrics.complete(run_data)
+
+        if OVERLAP_TRANSFER:
+            with PhaseTracer.span("transfer"):
+                self.park_artifacts(context, parse=True)
+            return run_data
         ssh = ExternalMachineAPI()
+
         # Copy output files from remote to local
-        remote_energibridge_csv = f"{self.external_run_dir}/{self.energibridge_csv_filename}"
-        remote_docker_stats_csv = f"{self.external_run_dir}/{self.docker_stats_csv_filename}"
-        remote_scaphandre_json = f"{self.external_run_dir}/{self.scaphandre_json_filename}"
-        local_energibridge_csv = context.run_dir / self.energibridge_csv_filename
-        local_docker_stats_csv = context.run_dir / self.docker_stats_csv_filename
-        local_scaphandre_json = context.run_dir / self.scaphandre_json_filename
-        
-        ssh.copy_file_from_remote(remote_energibridge_csv, str(local_energibridge_csv))
-        ssh.copy_file_from_remote(remote_docker_stats_csv, str(local_docker_stats_csv))
-        ssh.copy_file_from_remote(remote_scaphandre_json, str(local_scaphandre_json))
-        
-        # Parse the output to populate run data
-        energibridge_data = EnergibridgeOutputParser.parse_output(local_energibridge_csv)
-        docker_stats_data = DockerStatsOutputParser.parse_output(local_docker_stats_csv)
-        scaphandre_data = ScaphandreOutputParser.parse_output(local_scaphandre_json)
-        locust_stats_data = LocustStatsOutputParser.parse_output(self.workload_result)
+        with PhaseTracer.span("transfer"):
+            self.fetch_artifacts(ssh, self.external_run_dir, context.run_dir)
+        job = self.parse_job(context.execute_run['__run_id'], context.run_dir, self.rapl_wrap_values, self.testbed_window())
+        if PARALLEL_PARSING:
+            PostProcessor.enqueue(self.experiment_path, job)
+            return run_data
+        with PhaseTracer.span("parse"):
+            PhaseTracer.add_bytes(self.artifact_bytes(context.run_dir))
+            return EfficiencyMetrics.complete({**run_data, **parse_run(job)})
+
+    def artifact_bytes(self, run_dir: Path) -> int:
+        return sum((run_dir / file_name).stat().st_size for file_name in self.run_artifacts if (run_dir / file_name).exists())
+
+    def park_artifacts(self, context: RunnerContext, parse: bool) -> None:
+        """Move the run's artifacts aside on the testbed; the next run's warmup (or after_experiment) fetches them."""
+        ssh = ExternalMachineAPI()
+        pending_dir = f"{self.external_run_dir}/pending/{context.execute_run['__run_id']}"
+        ssh.execute_remote_command(
+            f"mkdir -p {pending_dir} && cd {self.external_run_dir} && mv {' '.join(self.run_artifacts)} {pending_dir}/"
+        )
+        ssh.stdout.channel.recv_exit_status()
+        self.add_pending_run(context.execute_run['__run_id'], context.run_dir, pending_dir, parse)
+        del ssh
+
+    def fetch_artifacts(self, ssh: ExternalMachineAPI, remote_dir: str, run_dir: Path) -> None:
+        if BUNDLE_TRANSFER or DEFERRED_TRANSFER:
+            ssh.fetch_bundle(remote_dir, self.run_artifacts, run_dir)
+            return
+        for file_name in self.run_artifacts:
+            ssh.copy_file_from_remote(f"{remote_dir}/{file_name}", str(run_dir / file_name))
+
+    def testbed_window(self) -> Optional[tuple]:
+        return self.measurement_window.testbed() if self.measurement_window else None
 
+    def parse_job(self, run_id: str, run_dir: Path, rapl_wrap_values: dict, window: tuple = None) -> Dict[str, Any]:
+        """What `parse_run` needs to turn the measurement files in `run_dir` into run table columns, over `window` if given."""
         return {
-            "run_time": self.run_time, 
-            **energibridge_data, 
-            **docker_stats_data, 
-            **scaphandre_data,
-            **locust_stats_data
+            "run_id": run_id, "run_dir": str(run_dir), "rapl_wrap_values": rapl_wrap_values, "window": window,
+            "energibridge": self.energibridge_csv_filename, "docker_stats": self.docker_stats_csv_filename,
+            "scaphandre": self.scaphandre_json_filename, "cpufreq": self.cpufreq_json_filename,
+            "chunksize": self.energibridge_parse_chunksize,
         }
 
+    def add_pending_run(self, run_id: str, run_dir: Path, remote_dir: str, parse: bool) -> None:
+        """Record a run whose artifacts are still on the testbed. Runs execute in their own processes, so the ledger is a file."""
+        ledger = self.experiment_path / self.pending_transfers_filename
+        pending = json.loads(ledger.read_text()) if ledger.exists() else []
+        pending.append({
+            "run_id": run_id, "run_dir": str(run_dir), "remote_dir": remote_dir,
+            "rapl_wrap_values": self.rapl_wrap_values, "window": self.testbed_window(), "parse": parse,
+        })
+        ledger.write_text(json.dumps(pending))
+
+    def complete_pending_runs(self) -> None:
+        """Fetch the artifacts of every pending run, and parse them into its row of the run table if still needed."""
+        ledger = self.experiment_path / self.pending_transfers_filename
+        if not ledger.exists():
+            return
+        ssh = ExternalMachineAPI()
+        csv_output = CSVOutputManager(self.experiment_path)
+        pending = json.loads(ledger.read_text())
+        while pending:
+            run = pending[0]
+            run_dir = Path(run["run_dir"])
+            with PhaseTracer.span("transfer", of_run=run["run_id"]):
+                self.fetch_artifacts(ssh, run["remote_dir"], run_dir)
+            job = self.parse_job(run["run_id"], run_dir, run["rapl_wrap_values"], run["window"])
+            if run["parse"] and PARALLEL_PARSING:
+                PostProcessor.enqueue(self.experiment_path, job)
+            elif run["parse"]:
+                with PhaseTracer.span("parse", of_run=run["run_id"]):
+                    PhaseTracer.add_bytes(self.artifact_bytes(run_dir))
+                    row = next(row for row in csv_output.read_run_table() if row['__run_id'] == run["run_id"])
+                    csv_output.update_row_data(EfficiencyMetrics.complete({**row, **parse_run(job)}))
+                output.console_log_OK(f"Filled in the measurements of {run['run_id']}")
+            ssh.execute_remote_command(f"rm -rf {run['remote_dir']}")
+            # Keep the ledger in step, so a failure leaves only the unfinished runs pending
+            pending.pop(0)
+            ledger.write_text(json.dumps(pending))
+        ledger.unlink()
+        del ssh
+
+    def store_finished_runs(self) -> None:
+        """Append the runs whose measurements are all in the run table (no transfer or parse pending) to the run store."""
+        pending = set()
+        for ledger in (self.experiment_path / self.pending_transfers_filename, self.experiment_path / PostProcessor.LEDGER_FILE_NAME):
+            if ledger.exists():
+                pending.update(run["run_id"] for run in json.loads(ledger.read_text()))
+        rows = CSVOutputManager(self.experiment_path).read_run_table()
+        stored = self.run_store.sync(rows, pending, self.run_series)
+        if stored:
+            output.console_log_OK(f"Stored {stored} finished runs in {self.run_store.path}")
+
+    def write_phase_report(self) -> None:
+        """Write the phase breakdown of the traced runs, with the projected time of the runs left (see PhaseReport)."""
+        report = PhaseReport.of_experiment(self.experiment_path)
+        if report is None:
+            return
+        remaining = [row for row in CSVOutputManager(self.experiment_path).read_run_table() if not is_done(row)]
+        # The projection's guesses replaced by what the traced runs took besides their load and settling
+        other = report.cycle - report.phase_time("load") - report.phase_time("settle")
+        projected, _ = project_wall_clock(remaining, lambda run, switched: (
+            self.settle_time(switched) + LoadLevel[run['load_level'].upper()].duration + other
+        ))
+        path = self.experiment_path / PhaseTracer.REPORT_FILE_NAME
+        path.write_text(report.render(len(remaining), projected, upper_bound=ADAPTIVE_REPETITIONS))
+        output.console_log(
+            f"Runs take {report.cycle:.0f} s each, {len(remaining)} runs left: projected "
+            f"{'at most ' if ADAPTIVE_REPETITIONS else ''}{projected / 3600:.1f} h more (breakdown in {path})"
+        )
+
+    def run_series(self, row: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Per-second series (second, metric, value) of every measurement file the run of run table `row` has on this
+        machine, in epoch seconds of the orchestrator clock.
+        """
+        run_dir = self.experiment_path / row['__run_id']
+        try:
+            clock_offset = float(row.get('clock_offset'))
+        except (TypeError, ValueError):
+            clock_offset = math.nan
+        if math.isnan(clock_offset):
+            clock_offset = 0.0  # Not estimated (MEASUREMENT_WINDOW off): the clocks are taken to agree
+        # (file, parser, whether its timestamps are on the testbed clock)
+        sources = [
+            (self.energibridge_csv_filename, EnergibridgeOutputParser.per_second, True),
+            (self.docker_stats_csv_filename, DockerStatsOutputParser.per_second, True),
+            (self.scaphandre_json_filename, ScaphandreOutputParser.per_second, True),
+            (RequestTimeSeries.FILE_NAME, LocustStatsOutputParser.per_second, False),
+        ]
+        series = []
+        for file_name, per_second, testbed_clock in sources:
+            if not (run_dir / file_name).exists():
+                continue  # e.g. the agent summarised it on the testbed
+            try:
+                frame = per_second(run_dir / file_name)
+                if testbed_clock:
+                    # Onto the orchestrator clock of the Locust series, so a second pivots both sides of the run
+                    frame['second'] = (frame['second'].astype(float) - clock_offset).round().astype('int64')
+                series.append(frame)
+            except (OSError, ValueError, KeyError) as e:
+                output.console_log_WARNING(f"No per-second series from {run_dir / file_name}: {e}")
+        if not series:
+            return None
+        series = pd.concat(series, ignore_index=True)
+        return pd.concat([series, EfficiencyMetrics.per_second(series)], ignore_index=True)
+
     def after_experiment(self) -> None:
         """Perform any activity required after stopping the experiment here
         Invoked only once during the lifetime of the program."""
@@ -500,6 +765,22 @@ class RunnerConfig:
         output.console_log("Cleaning up resources...")
         output.console_log_OK("Resources cleaned up.")
 
+        # The last run's artifacts have no next warmup to overlap with
+        if DEFERRED_TRANSFER:
+            self.complete_pending_runs()
+        if self.post_processor is not None:
+            output.console_log("Waiting for the remaining measurements to be parsed...")
+            self.post_processor.drain()
+        if self.run_store is not None:
+            self.store_finished_runs()
+            self.run_store.compact()
+        self.write_phase_report()
+        if TESTBED_AGENT:
+            agent = TestbedAgent.connect(ssh)
+            agent.shutdown()
+            agent.close()
+            output.console_log_OK("Measurement agent shut down.")
+
         # Remove measurements files from remote machine
         output.console_log("Removing measurement files from remote machine...")
         ssh.execute_remote_command(f"rm -rf {self.external_run_dir}")
@@ -0,0 +1,82 @@
+import math
+import time
+from collections import deque
+
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+
+
+class SteadyStateDetector:
+    """
+    Decides when the testbed has settled, from a stream of (package power, package temperature) samples.
+    The machine counts as steady once the last `window` samples all lie within `power_tolerance`
+    (relative to their mean) for power and within `temperature_tolerance` (degrees C) for temperature.
+    A signal that the testbed cannot report (NaN) is ignored, but at least one of them has to be available.
+    """
+    def __init__(self, window: int, power_tolerance: float, temperature_tolerance: float):
+        self.power = deque(maxlen=window)
+        self.temperature = deque(maxlen=window)
+        self.power_tolerance = power_tolerance
+        self.temperature_tolerance = temperature_tolerance
+
+    @staticmethod
+    def _spread(values) -> tuple:
+        """(max - min, mean) of the non-NaN values, or None if there are none."""
+        finite = [value for value in values if not math.isnan(value)]
+        if not finite:
+            return None
+        return max(finite) - min(finite), sum(finite) / len(finite)
+
+    def add(self, power: float, temperature: float):
+        self.power.append(power)
+        self.temperature.append(temperature)
+
+    @property
+    def steady(self) -> bool:
+        if len(self.power) < self.power.maxlen:
+            return False
+        power = self._spread(self.power)
+        temperature = self._spread(self.temperature)
+        if power is None and temperature is None:
+            return False
+        if power is not None and power[0] > self.power_tolerance * power[1]:
+            return False
+        if temperature is not None and temperature[0] > self.temperature_tolerance:
+            return False
+        return True
+
+
+def wait_for_steady_state(ssh, monitor_command: str, detector: SteadyStateDetector,
+                          min_time: float, max_time: float, label: str, fallback_time: float) -> float:
+    """
+    Stream the testbed power monitor over `ssh` until `detector` reports a steady state,
+    but no shorter than `min_time` and no longer than `max_time` seconds.
+    Returns the seconds spent. If the monitor stream fails (e.g. the monitor cannot read RAPL and exits),
+    waits out `fallback_time` instead, the wait without steady state detection.
+    """
+    start = time.monotonic()
+    ssh.execute_remote_command(monitor_command)
+    try:
+        for line in ssh.iter_lines(timeout=10):
+            elapsed = time.monotonic() - start
+            try:
+                _, power, temperature = line.split(",")
+                detector.add(float(power), float(temperature))
+            except ValueError:
+                continue  # Header or a partial line
+            if elapsed >= min_time and detector.steady:
+                output.console_log_OK(f"{label}: steady state reached after {elapsed:.0f} s "
+                                      f"(power {power} W, temperature {temperature} C)")
+                return elapsed
+            if elapsed >= max_time:
+                output.console_log_WARNING(f"{label}: no steady state within {max_time} s, continuing anyway")
+                return elapsed
+    finally:
+        # Closing the channel makes the monitor exit on its next write
+        ssh.stdout.channel.close()
+
+    channel = ssh.stdout.channel
+    status = f" (exit status {channel.recv_exit_status()})" if channel.exit_status_ready() else ""
+    output.console_log_WARNING(f"{label}: power monitor stream ended{status}, "
+                               f"falling back to a fixed {fallback_time} s wait")
+    time.sleep(max(0.0, fallback_time - (time.monotonic() - start)))
+    return time.monotonic() - start
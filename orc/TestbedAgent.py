@@ -0,0 +1,84 @@
+import json
+import socket
+import time
+
+import paramiko
+
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+
+from ExternalMachineAPI import ExternalMachineAPI
+
+
+class TestbedAgent:
+    """
+    Client of the resident measurement agent on the testbed (testbed/measurement_agent.py).
+    Commands and replies are JSON lines over one SSH direct-tcpip channel to the agent's local-only port,
+    kept open for the whole run.
+    """
+    PORT = 7777
+    START_TIMEOUT = 10  # seconds to wait for a freshly launched agent to listen
+    REPLY_TIMEOUT = 60  # seconds to wait for a reply (stop joins the collectors and summarizes the run)
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.channel.settimeout(self.REPLY_TIMEOUT)
+        self.reader = channel.makefile("rb")
+
+    @classmethod
+    def connect(cls, ssh: ExternalMachineAPI, port: int = PORT) -> "TestbedAgent":
+        return cls(ssh.open_local_channel(port))
+
+    @classmethod
+    def launch(cls, ssh: ExternalMachineAPI, testbed_directory: str, port: int = PORT) -> "TestbedAgent":
+        """Connect to the agent, starting it first if it is not running yet."""
+        try:
+            return cls.connect(ssh, port)
+        except paramiko.ChannelException:
+            pass
+        # As root: RAPL energy counters are not readable otherwise. -E keeps $HOME, which raw_dir is relative to
+        ssh.execute_remote_command(
+            f"bash -lc 'DIR={testbed_directory}; cd $DIR && "
+            f"sudo -E nohup python3 measurement_agent.py --port {port} > $DIR/measurement_agent.out 2>&1 & "
+            f"echo $! > $DIR/measurement_agent.pid'"
+        )
+        ssh.stdout.channel.recv_exit_status()
+        deadline = time.monotonic() + cls.START_TIMEOUT
+        while True:
+            try:
+                agent = cls.connect(ssh, port)
+                output.console_log_OK(f"Measurement agent started on the testbed (port {port})")
+                return agent
+            except paramiko.ChannelException:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Measurement agent did not start, see {testbed_directory}/measurement_agent.out")
+                time.sleep(0.5)
+
+    def request(self, command: str, **arguments) -> dict:
+        self.channel.sendall(json.dumps({"cmd": command, **arguments}).encode() + b"\n")
+        try:
+            line = self.reader.readline()
+        except socket.timeout:
+            raise RuntimeError(f"Measurement agent did not answer {command!r} within {self.REPLY_TIMEOUT} s")
+        if not line:
+            raise RuntimeError(f"Measurement agent closed the connection on {command!r}")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise RuntimeError(f"Measurement agent rejected {command!r}: {response.get('error')}")
+        return response
+
+    def start(self, **settings):
+        self.request("start", **settings)
+
+    def mark(self, label: str):
+        self.request("mark", label=label)
+
+    def stop(self, window: tuple = None) -> dict:
+        """Stop the run's collectors and return their summary, over `window` (epoch seconds, testbed clock) if given."""
+        return self.request("stop", window=window)["summary"]
+
+    def shutdown(self):
+        self.request("shutdown")
+
+    def close(self):
+        self.reader.close()
+        self.channel.close()
@@ -0,0 +1,66 @@
+import time
+
+from ProgressManager.Output.OutputProcedure import OutputProcedure as output
+
+
+def estimate_clock_offset(ssh, samples: int = 8) -> tuple:
+    """
+    Offset (s) of the testbed clock from the orchestrator clock (testbed time = orchestrator time + offset),
+    and the round-trip time of the sample it was taken from, so the offset is accurate to +-rtt/2.
+    Queries the testbed clock `samples` times over one channel, NTP style, and keeps the fastest round trip.
+    """
+    ssh.execute_remote_command("while read _; do date +%s.%N; done")
+    best_offset, best_rtt = 0.0, float("inf")
+    try:
+        for _ in range(samples):
+            sent = time.time()
+            ssh.stdin.write("\n")
+            ssh.stdin.flush()
+            line = ssh.stdout.readline()
+            received = time.time()
+            try:
+                remote = float(line)
+            except ValueError:
+                continue
+            if received - sent < best_rtt:
+                best_offset, best_rtt = remote - (sent + received) / 2, received - sent
+    finally:
+        ssh.stdin.close()
+        ssh.stdout.channel.close()
+    if best_rtt == float("inf"):
+        output.console_log_WARNING("Could not read the testbed clock, assuming it matches the orchestrator")
+        return 0.0, None
+    return best_offset, best_rtt
+
+
+class MeasurementWindow:
+    """
+    Interval of a run that every data source is summarised over, in epoch seconds of the orchestrator clock.
+    Built from the load's start/end marks (and the end of its ramp-up) recorded by WorkloadGenerator;
+    `testbed()` gives the same interval on the testbed clock, for slicing the samples taken there.
+    """
+    def __init__(self, start: float, end: float, clock_offset: float = 0.0):
+        if end <= start:
+            raise ValueError(f"Empty measurement window [{start}, {end}]")
+        self.start = start
+        self.end = end
+        self.clock_offset = clock_offset
+
+    @classmethod
+    def from_run_summary(cls, run_summary: dict, clock_offset: float = 0.0, exclude_ramp: bool = True,
+                         trim_start: float = 0.0, trim_end: float = 0.0) -> "MeasurementWindow":
+        """The load window, optionally without the ramp-up, shortened by `trim_start`/`trim_end` seconds."""
+        start = run_summary["window_start"]
+        if exclude_ramp and run_summary.get("ramp_end") is not None:
+            start = run_summary["ramp_end"]
+        return cls(start + trim_start, run_summary["window_end"] - trim_end, clock_offset)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def orchestrator(self) -> tuple:
+        return self.start, self.end
+
+    def testbed(self) -> tuple:
+        return self.start + self.clock_offset, self.end + self.clock_offset
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+
+class UserPool:
+    """
+    Fixed pool of DeathStarBench accounts, created once per experiment instead of once per simulated user.
+    Usernames and passwords are derived from the account index, so provisioning is idempotent: accounts that
+    already exist from an earlier experiment are reused as they are.
+
+    The pool file (JSON) holds every account with its current login token. Simulated users draw from it
+    in `on_start`, so no sign-up or login requests fall into the measurement window.
+    """
+    USERNAME_PREFIX = "greenlab"
+    TOKEN_COOKIE = "login_token"
+    TOKEN_MAX_AGE = 1800        # seconds; tokens older than this are renewed before a run
+    CONCURRENCY = 32            # parallel requests while provisioning
+    REQUEST_TIMEOUT = 30        # seconds
+
+    def __init__(self, path: Path, accounts: list = None, issued_at: float = None):
+        self.path = Path(path)
+        self.accounts = accounts or []
+        self.issued_at = issued_at
+        self._next = random.randrange(len(self.accounts)) if self.accounts else 0
+
+    @classmethod
+    def load(cls, path: Path) -> "UserPool":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(path, data["accounts"], data["issued_at"])
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"issued_at": self.issued_at, "accounts": self.accounts}, f)
+        tmp_path.replace(self.path)  # Readers never see a half-written pool
+
+    def next_account(self) -> dict:
+        """Round-robin over the accounts, starting at a random offset so processes do not all begin with the same one."""
+        account = self.accounts[self._next]
+        self._next = (self._next + 1) % len(self.accounts)
+        return account
+
+    @classmethod
+    def account(cls, index: int) -> dict:
+        username = f"{cls.USERNAME_PREFIX}_{index:05d}"
+        return {
+            "username": username,
+            "password": hashlib.sha256(username.encode()).hexdigest()[:24],
+            "token": None,
+        }
+
+    # ------------------------------------------------------------------ provisioning (orchestrator side)
+    @classmethod
+    def provision(cls, path: Path, host: str, size: int, follows_per_user: int = 0, posts_per_user: int = 0,
+                  seed: int = 0) -> "UserPool":
+        """
+        Register `size` accounts on the application at `host`, log them in, and optionally let each account follow
+        `follows_per_user` random others and write `posts_per_user` posts, so home timelines have real content.
+        Writes the pool file and returns the pool.
+        """
+        pool = cls(path, [cls.account(i) for i in range(size)])
+        start = time.monotonic()
+        created = sum(pool._map(lambda session, account: pool._register(session, host, account), pool.accounts))
+        logging.info("User pool: %s accounts registered, %s already existed", created, size - created)
+        pool.refresh_tokens(host)
+
+        if follows_per_user:
+            rng = random.Random(seed)
+            edges = [
+                (account, pool.accounts[followee])
+                for i, account in enumerate(pool.accounts)
+                # Sample among the other accounts: indices from i on shift up by one to skip the account itself
+                for followee in (j + (j >= i) for j in rng.sample(range(size - 1), min(follows_per_user, size - 1)))
+            ]
+            pool._map(lambda session, edge: pool._follow(session, host, *edge), edges)
+            logging.info("User pool: %s follow edges created", len(edges))
+        # Posts go last: they are fanned out to the timelines of the followers that exist at compose time
+        if posts_per_user:
+            posts = [account for account in pool.accounts for _ in range(posts_per_user)]
+            pool._map(lambda session, account: pool._compose(session, host, account), posts)
+            logging.info("User pool: %s seed posts written", len(posts))
+        logging.info("User pool provisioned in %.1fs", time.monotonic() - start)
+        return pool
+
+    def refresh_tokens(self, host: str, max_age: float = 0):
+        """Log every account in again if the tokens are older than `max_age` seconds, and save the pool file."""
+        if self.issued_at is not None and time.time() - self.issued_at < max_age:
+            return
+        issued_at = time.time()
+        tokens = self._map(lambda session, account: self._login(session, host, account), self.accounts)
+        missing = tokens.count(None)
+        if missing:
+            raise RuntimeError(f"Login failed for {missing}/{len(self.accounts)} pool accounts")
+        for account, token in zip(self.accounts, tokens):
+            account["token"] = token
+        self.issued_at = issued_at
+        self.save()
+        logging.info("User pool: %s login tokens refreshed", len(tokens))
+
+    def _map(self, fn, items) -> list:
+        local = threading.local()
+        sessions = []
+
+        def call(item):
+            # One keep-alive session per worker thread
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+                sessions.append(local.session)
+            return fn(local.session, item)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.CONCURRENCY) as executor:
+                return list(executor.map(call, items))
+        finally:
+            for session in sessions:
+                session.close()
+
+    def _register(self, session: requests.Session, host: str, account: dict) -> bool:
+        r = session.post(f"{host}/api/user/register", data={
+            "first_name": "Green", "last_name": "Lab",
+            "username": account["username"], "password": account["password"], "signup": "Sign Up",
+        }, timeout=self.REQUEST_TIMEOUT)
+        if r.ok:
+            return True
+        if "exist" in r.text:
+            return False
+        r.raise_for_status()
+
+    def _login(self, session: requests.Session, host: str, account: dict):
+        r = session.post(f"{host}/api/user/login", data={
+            "username": account["username"], "password": account["password"], "login": "Login",
+        }, allow_redirects=False, timeout=self.REQUEST_TIMEOUT)
+        return r.cookies.get(self.TOKEN_COOKIE)
+
+    def _follow(self, session: requests.Session, host: str, account: dict, followee: dict):
+        session.post(f"{host}/api/user/follow", data={
+            "user_name": account["username"], "followee_name": followee["username"],
+        }, cookies={self.TOKEN_COOKIE: account["token"]}, timeout=self.REQUEST_TIMEOUT).raise_for_status()
+
+    def _compose(self, session: requests.Session, host: str, account: dict):
+        text = f"Seed post by {account['username']} #{random.getrandbits(32):08x}"
+        r = session.post(f"{host}/api/post/compose", data={"post_type": "0", "text": text},
+                         cookies={self.TOKEN_COOKIE: account["token"]}, allow_redirects=False,
+                         timeout=self.REQUEST_TIMEOUT)
+        if r.status_code != 302:
+            r.raise_for_status()
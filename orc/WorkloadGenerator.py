@@ -1,46 +1,156 @@
-import io
 import logging
+import math
 import os
 import random
+import socket
+import subprocess
+import sys
+import time
 import uuid
 from enum import Enum
 from pathlib import Path
 from urllib.parse import quote_plus, urlparse
 
 import gevent
+import gevent.queue
+import psutil
 from dotenv import load_dotenv
-from locust import HttpUser, tag, task
+from geventhttpclient import HTTPClient
+from geventhttpclient.client import HTTPClientPool
+from geventhttpclient.url import URL
+from locust import FastHttpUser, HttpUser, events, tag
 from locust.env import Environment
-from locust.stats import stats_history
+from requests.cookies import create_cookie
+
+from RequestTimeSeries import RequestTimeSeries
+from UserPool import UserPool
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 load_dotenv()
 
+MEDIA_SERVICE_PORT = int(os.getenv("MEDIA_SERVICE_PORT", "8081"))
+# Image, or directory of images, that media users upload
+MEDIA_CORPUS = Path(os.getenv("DSB_MEDIA_CORPUS") or Path(__file__).resolve().parent.parent / "media" / "rabbit.jpg")
+# Scales the duration of every load level, e.g. 0.1 to benchmark the orchestrator against the stand-in testbed
+LOAD_DURATION_SCALE = float(os.getenv("LOAD_DURATION_SCALE") or 1)
+
 class LoadType(Enum):
     MEDIA = "media"
     HOME_TIMELINE = "home_timeline"
     COMPOSE_POST = "compose_post"
 
 class LoadLevel(Enum):
-    # users, spawn_rate, duration(s)
+    # Closed loop: users, spawn_rate, duration(s)
     # ramp time: 10s
     LOW    = (20,  2,  120)
     MEDIUM = (200, 20, 120)
     HIGH   = (500, 50, 120)
     DEBUG  = (3,   3,  30)  # For debugging only
+    # Open loop: max users, spawn_rate, duration(s), target operations/s
+    # Operations arrive on a schedule regardless of how fast the server answers;
+    # the user pool is sized automatically (up to max users) to deliver the target rate.
+    OPEN_LOW    = (100,  100,  120, 50)
+    OPEN_MEDIUM = (500,  500,  120, 250)
+    OPEN_HIGH   = (1500, 1500, 120, 750)
+    # Short, low-rate open-loop replay that warms the services (caches, JIT, connection pools) before a run
+    WARMUP      = (20,   20,   30,  10)
     @property
     def users(self): return self.value[0]
     @property
     def spawn_rate(self): return self.value[1]
     @property
-    def duration(self):   return self.value[2]
+    def duration(self):   return self.value[2] * LOAD_DURATION_SCALE
+    @property
+    def target_rps(self): return self.value[3] if len(self.value) > 3 else None
+    @property
+    def is_open_loop(self): return self.target_rps is not None
+
+class HttpClient(Enum):
+    REQUESTS = "requests"  # locust.HttpUser, one requests.Session per user
+    FAST     = "fasthttp"  # locust.FastHttpUser (geventhttpclient), keep-alive connections shared per process
+
+class ArrivalSchedule(Enum):
+    POISSON = "poisson"  # Exponential inter-arrival times
+    FIXED   = "fixed"    # Constant inter-arrival time
+
+class ArrivalPacer:
+    """
+    Open-loop arrival process shared by all simulated users of this process.
+    A greenlet releases one token per scheduled arrival; a user takes a token before each operation.
+    Tokens keep being released while users are busy, so a slow server builds a backlog instead of lowering the offered load.
+    """
+    def __init__(self):
+        self.rate = None
+        self.schedule = ArrivalSchedule.POISSON
+        self._tokens = None
+        self._greenlet = None
 
-class BaseDSBUser(HttpUser):
+    @property
+    def active(self) -> bool:
+        return self.rate is not None
+
+    def configure(self, rate: float = None, schedule: ArrivalSchedule = ArrivalSchedule.POISSON):
+        """Set the arrival rate (operations/s) for this process; None switches back to closed-loop."""
+        self.stop()
+        self.rate = rate
+        self.schedule = schedule
+
+    def _release(self):
+        next_arrival = time.monotonic()
+        while True:
+            if self.schedule == ArrivalSchedule.FIXED:
+                next_arrival += 1 / self.rate
+            else:
+                next_arrival += random.expovariate(self.rate)
+            delay = next_arrival - time.monotonic()
+            # Arrivals that are already due are released immediately, but still yield to the users
+            gevent.sleep(max(delay, 0))
+            self._tokens.put(next_arrival)
+
+    def acquire(self) -> float:
+        """Block until the next arrival is due. Returns how late (s) the operation starts relative to its schedule."""
+        if self._greenlet is None:
+            self._tokens = gevent.queue.Queue()
+            self._greenlet = gevent.spawn(self._release)
+        scheduled = self._tokens.get()
+        return time.monotonic() - scheduled
+
+    def stop(self):
+        if self._greenlet is not None:
+            self._greenlet.kill(block=True)
+        self._greenlet = None
+        self._tokens = None
+
+class DSBUserMixin:
+    """Sign-up, login and open-loop pacing shared by the requests- and geventhttpclient-based users."""
+    # (name, method) of the request that starts one operation of this user class, used to count achieved operations/s
+    operation = None
+
+    def wait_time(self):
+        # Open loop: hold the user until the arrival schedule releases the next operation
+        if ARRIVALS.active:
+            ARRIVALS.acquire()
+        return 0
+
+    # Pre-provisioned accounts to log in with; None: every simulated user signs up and logs in itself
+    user_pool = None
 
     def on_start(self):
-        self.client.headers.update({"Accept": "application/json"})
+        if self.user_pool is not None:
+            # Reuse a provisioned account and its token: no requests before the first operation
+            account = self.user_pool.next_account()
+            self.username = account["username"]
+            self.password = account["password"]
+            self.cookie_jar.set_cookie(create_cookie(UserPool.TOKEN_COOKIE, account["token"]))
+        else:
+            self._sign_up()
+
+        # Open loop: the first operation also waits for its scheduled arrival
+        if ARRIVALS.active:
+            ARRIVALS.acquire()
 
+    def _sign_up(self):
         uname_suffix = uuid.uuid4().hex[:10]
         self.username = f"chomp_{uname_suffix}"
         self.password = uuid.uuid4().hex
@@ -69,8 +179,60 @@ class BaseDSBUser(HttpUser):
         )
 
 
-class HomeTimelineUser(BaseDSBUser):
-    @task
+class BaseDSBUser(DSBUserMixin, HttpUser):
+    abstract = True  # Not a runnable user class on its own (matters when workers load this file as a locustfile)
+
+    @property
+    def cookie_jar(self):
+        return self.client.cookies
+
+    def on_start(self):
+        self.client.headers.update({"Accept": "application/json"})
+        super().on_start()
+
+
+class SharedConnectionPool(HTTPClientPool):
+    """
+    Keep-alive connections shared by all geventhttpclient-based users of this process,
+    with a separate connection limit for the frontend and for the media service.
+    Users only hold a connection while a request is in flight, so the limits can be set below the user count.
+    """
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.frontend_connections = 1
+        self.media_connections = 1
+
+    def configure(self, frontend_connections: int, media_connections: int):
+        """Set the connection limit per host; open connections are dropped."""
+        self.close()
+        self.frontend_connections = frontend_connections
+        self.media_connections = media_connections
+
+    def get_client(self, url):
+        if not isinstance(url, URL):
+            url = URL(url)
+        client_key = url.host, url.port
+        client = self.clients.get(client_key)
+        if client is None:
+            connections = self.media_connections if url.port == MEDIA_SERVICE_PORT else self.frontend_connections
+            client = HTTPClient.from_url(url, concurrency=connections, **self.client_args)
+            self.clients[client_key] = client
+        return client
+
+
+class FastBaseDSBUser(DSBUserMixin, FastHttpUser):
+    abstract = True
+    default_headers = {"Accept": "application/json"}
+    client_pool = None  # Set to the shared pool below, once it exists
+
+    @property
+    def cookie_jar(self):
+        return self.client.cookiejar
+
+
+class HomeTimelineTasks:
+    operation = ("GET /home-timeline/read", "GET")
+
     @tag("home")
     def get_home_timeline(self):
         self.client.get(
@@ -79,14 +241,17 @@ class HomeTimelineUser(BaseDSBUser):
             name="GET /home-timeline/read",
         )
 
+    tasks = [get_home_timeline]
+
+
+class ComposePostTasks:
+    operation = ("POST /compose_post (form)", "POST")
 
-class ComposePostUser(BaseDSBUser):
-    @task
     @tag("compose")
     def compose_post(self):
         text = _random_post_text()
 
-        r = self.client.post(
+        with self.client.post(
             "/api/post/compose",
             data={
                 "post_type": "0",
@@ -95,37 +260,88 @@ class ComposePostUser(BaseDSBUser):
             name="POST /compose_post (form)",
             allow_redirects=False,
             catch_response=True,
-        )
-
-        # Treat 302 as success
-        if r.status_code == 302:
-            r.success()
-
+        ) as r:
+            # Treat 302 as success
+            if r.status_code == 302:
+                r.success()
+
+    tasks = [compose_post]
+
+
+class MediaPayloads:
+    """
+    Upload bodies for the media service, built once per process.
+    Every image of the corpus (a file, or a directory of images) is read once and pre-encoded as a complete
+    multipart/form-data body, in a few variants with distinct boundaries. Each upload then sends one of those
+    immutable bodies as-is instead of re-reading, copying and re-encoding the image.
+    """
+    VARIANTS = 4  # Distinct multipart boundaries per image
+    CONTENT_TYPES = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".gif": "image/gif"}
+
+    def __init__(self, corpus: Path):
+        self.corpus = Path(corpus)
+        self._payloads = None
+        self._next = 0
+
+    @staticmethod
+    def encode(field: str, filename: str, data: bytes, content_type: str, boundary: str) -> bytes:
+        return b"".join([
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode(),
+            data,
+            f"\r\n--{boundary}--\r\n".encode(),
+        ])
+
+    def _load(self) -> list:
+        paths = sorted(self.corpus.iterdir()) if self.corpus.is_dir() else [self.corpus]
+        payloads = []
+        for path in paths:
+            content_type = self.CONTENT_TYPES.get(path.suffix.lower())
+            if content_type is None:
+                continue
+            data = path.read_bytes()
+            for _ in range(self.VARIANTS):
+                boundary = uuid.uuid4().hex
+                body = self.encode("media", path.name, data, content_type, boundary)
+                headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+                payloads.append((body, headers, path.suffix.lstrip(".").lower()))
+        if not payloads:
+            raise FileNotFoundError(f"No images ({', '.join(self.CONTENT_TYPES)}) in media corpus {self.corpus}")
+        # Interleave images and boundaries, starting at a random point so processes do not upload in lockstep
+        random.shuffle(payloads)
+        logging.info("Media corpus: %s images from %s (%.1f KiB on average)", len(payloads) // self.VARIANTS,
+                     self.corpus, sum(len(p[0]) for p in payloads) / len(payloads) / 1024)
+        return payloads
+
+    def next(self) -> tuple:
+        """Return (multipart body, request headers, media extension) for the next upload."""
+        if self._payloads is None:
+            self._payloads = self._load()
+        payload = self._payloads[self._next]
+        self._next = (self._next + 1) % len(self._payloads)
+        return payload
+
+
+class MediaTasks:
+    operation = ("POST /upload-media", "POST")
 
-class MediaUser(BaseDSBUser):
     def on_start(self):
         super().on_start()
 
-        script_dir = Path(__file__).resolve().parent
-        self.jpg_path = script_dir.parent / "media" / "rabbit.jpg"
-        self.rabbit_bytes = self.jpg_path.read_bytes()
-        self.media_ext = (self.jpg_path.suffix or ".jpg").lstrip(".").lower()
-
         # media service lives on port 8081
         p = urlparse(self.host)
-        media_port = int(os.getenv("MEDIA_SERVICE_PORT", "8081"))
-        self.media_base = f"{(p.scheme or 'http')}://{p.hostname}:{media_port}"
+        self.media_base = f"{(p.scheme or 'http')}://{p.hostname}:{MEDIA_SERVICE_PORT}"
 
-    @task
     @tag("media")
     def upload_media(self):
-        # 1) Upload the image with field name 'media'
-        files = {"media": ("rabbit.jpg", io.BytesIO(self.rabbit_bytes), "image/jpeg")}
-        r = self.client.post(f"{self.media_base}/upload-media", files=files, name="POST /upload-media")
+        # 1) Upload an image of the corpus with field name 'media', as a pre-encoded multipart body
+        body, headers, media_ext = MEDIA_PAYLOADS.next()
+        r = self.client.post(f"{self.media_base}/upload-media", data=body, headers=headers, name="POST /upload-media")
         r.raise_for_status()
         data = r.json()
         media_id = str(data["media_id"])
-        media_type = data.get("media_type", self.media_ext)
+        media_type = data.get("media_type", media_ext)
 
         # 2) Compose on the main app
         text = _random_post_text()
@@ -143,16 +359,60 @@ class MediaUser(BaseDSBUser):
             "media_ids": f'["{media_id}"]',
             "media_types": f'["{media_type}"]'
         }
-        r_c = self.client.post(
-            "/api/post/compose", 
-            data=body, 
+        with self.client.post(
+            "/api/post/compose",
+            data=body,
             name="POST /compose_with_media",
             allow_redirects=False,
             catch_response=True,
-        )
-        # Treat 302 as success
-        if r_c.status_code == 302:
-            r_c.success()
+        ) as r_c:
+            # Treat 302 as success
+            if r_c.status_code == 302:
+                r_c.success()
+
+    tasks = [upload_media]
+
+
+# requests-based users (locust.HttpUser)
+class HomeTimelineUser(HomeTimelineTasks, BaseDSBUser):
+    pass
+
+class ComposePostUser(ComposePostTasks, BaseDSBUser):
+    pass
+
+class MediaUser(MediaTasks, BaseDSBUser):
+    pass
+
+# geventhttpclient-based users (locust.FastHttpUser), sharing this process's connection pool
+class FastHomeTimelineUser(HomeTimelineTasks, FastBaseDSBUser):
+    pass
+
+class FastComposePostUser(ComposePostTasks, FastBaseDSBUser):
+    pass
+
+class FastMediaUser(MediaTasks, FastBaseDSBUser):
+    pass
+
+
+MEDIA_PAYLOADS = MediaPayloads(MEDIA_CORPUS)
+
+# Arrival process and connection pool of this process. Locust workers receive their settings through the environment.
+ARRIVALS = ArrivalPacer()
+if os.getenv("DSB_ARRIVAL_RATE"):
+    ARRIVALS.configure(float(os.getenv("DSB_ARRIVAL_RATE")), ArrivalSchedule(os.getenv("DSB_ARRIVAL_SCHEDULE", "poisson")))
+CONNECTIONS = SharedConnectionPool(
+    connection_timeout=FastHttpUser.connection_timeout,
+    network_timeout=FastHttpUser.network_timeout,
+    insecure=FastHttpUser.insecure,
+)
+if os.getenv("DSB_FRONTEND_CONNECTIONS"):
+    CONNECTIONS.configure(int(os.getenv("DSB_FRONTEND_CONNECTIONS")), int(os.getenv("DSB_MEDIA_CONNECTIONS")))
+FastBaseDSBUser.client_pool = CONNECTIONS
+if os.getenv("DSB_USER_POOL"):
+    DSBUserMixin.user_pool = UserPool.load(os.getenv("DSB_USER_POOL"))
+if os.getenv("DSB_TIMESERIES"):
+    # Locust worker: record this process's requests and ship them with every stats report
+    RequestTimeSeries().attach_worker(events)
 
 
 def _random_post_text():
@@ -164,20 +424,101 @@ def _random_post_text():
     return " ".join(random.choices(words, k=n)) + f" #{uuid.uuid4().hex[:6]}"
 
 
+class ClientCpuMonitor:
+    """
+    Samples the CPU usage of the load-generating processes (this process and any Locust workers) once per second,
+    so runs can show whether the client rather than the system under test was the bottleneck.
+    100% equals one fully busy core.
+    """
+    INTERVAL = 1.0  # seconds
+
+    def __init__(self, pids: list):
+        self.processes = [psutil.Process(pid) for pid in pids]
+        self.totals = []
+        self.busiest = []
+        self._greenlet = None
+
+    def _sample(self):
+        for process in self.processes:
+            process.cpu_percent(None)  # Prime the counters
+        while True:
+            gevent.sleep(self.INTERVAL)
+            usages = []
+            for process in self.processes:
+                try:
+                    usages.append(process.cpu_percent(None))
+                except psutil.Error:
+                    continue
+            if usages:
+                self.totals.append(sum(usages))
+                self.busiest.append(max(usages))
+
+    def start(self):
+        self._greenlet = gevent.spawn(self._sample)
+
+    def stop(self) -> dict:
+        if self._greenlet is not None:
+            self._greenlet.kill(block=True)
+        if not self.totals:
+            return {}
+        return {
+            "client_cpu_usage_mean": sum(self.totals) / len(self.totals),
+            "client_cpu_usage_max": max(self.totals),
+            "client_cpu_busiest_process_max": max(self.busiest),
+            "client_processes": len(self.processes),
+        }
+
+
 class WorkloadGenerator:
     APPLICATION_IP = os.getenv("APPLICATION_IP")
     APPLICATION_PORT = int(os.getenv("APPLICATION_PORT"))
-
-    def __init__(self):
-        pass
-
-    def fire_load(self, load_type: LoadType, load_level: LoadLevel):
+    MASTER_BIND_HOST = "127.0.0.1"
+    WORKER_CONNECT_TIMEOUT = 30  # seconds
+    # Open-loop user pool sizing (Little's law: users = rate * latency, with headroom)
+    INITIAL_LATENCY_ESTIMATE = 0.1  # seconds per operation
+    POOL_HEADROOM = 2.0
+    POOL_CONTROL_INTERVAL = 3.0     # seconds; not shorter than the Locust worker report interval
+    RATE_TOLERANCE = 0.95           # grow the pool while achieved < tolerance * target
+
+    def __init__(self, distributed: bool = False, workers: int = None,
+                 arrival_schedule: ArrivalSchedule = ArrivalSchedule.POISSON,
+                 http_client: HttpClient = HttpClient.REQUESTS,
+                 frontend_connections: int = None, media_connections: int = None, user_pool: Path = None):
+        """
+        distributed:          run a Locust master plus `workers` worker processes on this machine instead of
+                              a single in-process runner, so load generation can use every core.
+        workers:              number of worker processes, defaults to the core count.
+        arrival_schedule:     inter-arrival distribution of open-loop load levels.
+        http_client:          HTTP client the simulated users are built on.
+        frontend_connections: HttpClient.FAST only: keep-alive connections per process to the frontend,
+        media_connections:    and to the media service. Default to the number of users per process,
+                              so requests never queue for a connection on the client.
+        user_pool:            pool file written by UserPool.provision(); users then log in with its accounts
+                              instead of signing up, keeping sign-up/login traffic out of the measurement.
+        """
+        self.distributed = distributed
+        self.workers = workers or os.cpu_count()
+        self.arrival_schedule = arrival_schedule
+        self.http_client = http_client
+        self.frontend_connections = frontend_connections
+        self.media_connections = media_connections
+        self.user_pool = user_pool
+        self.pool_size = None
+        # Client-side metrics of the last run (e.g. client CPU usage), alongside the returned stats
+        self.run_summary = {}
+
+    def fire_load(self, load_type: LoadType, load_level: LoadLevel, output_dir: Path = None):
+        """
+        Run the load and return the Locust stats totals.
+        With `output_dir`, the per-second, per-endpoint series is written there as RequestTimeSeries.FILE_NAME.
+        """
+        fast = self.http_client == HttpClient.FAST
         if load_type == LoadType.MEDIA:
-            return self._run_locust(MediaUser, load_level)
+            return self._run_locust(FastMediaUser if fast else MediaUser, load_level, output_dir)
         elif load_type == LoadType.HOME_TIMELINE:
-            return self._run_locust(HomeTimelineUser, load_level)
+            return self._run_locust(FastHomeTimelineUser if fast else HomeTimelineUser, load_level, output_dir)
         elif load_type == LoadType.COMPOSE_POST:
-            return self._run_locust(ComposePostUser, load_level)
+            return self._run_locust(FastComposePostUser if fast else ComposePostUser, load_level, output_dir)
         else:
             raise ValueError(f"Unsupported load type: {load_type}")
 
@@ -185,17 +526,157 @@ class WorkloadGenerator:
     def _host(self) -> str:
         return f"http://{self.APPLICATION_IP}:{self.APPLICATION_PORT}"
 
-    def _run_locust(self, user_class, level: LoadLevel):
+    @staticmethod
+    def _free_port() -> int:
+        with socket.socket() as s:
+            s.bind((WorkloadGenerator.MASTER_BIND_HOST, 0))
+            return s.getsockname()[1]
+
+    def _start_workers(self, env: Environment, worker_env: dict = None) -> list:
+        """
+        Start a master runner on `env` and spawn worker processes that load this file as their locustfile.
+        `worker_env` adds environment variables for the workers (e.g. their share of an open-loop arrival rate).
+        """
+        port = self._free_port()
+        env.create_master_runner(master_bind_host=self.MASTER_BIND_HOST, master_bind_port=port)
+        workers = [
+            subprocess.Popen([
+                sys.executable, "-m", "locust", "-f", str(Path(__file__).resolve()),
+                "--worker", "--master-host", self.MASTER_BIND_HOST, "--master-port", str(port),
+                "--loglevel", "WARNING",
+            ], env={**os.environ, **(worker_env or {})})
+            for _ in range(self.workers)
+        ]
+
+        deadline = gevent.Timeout(self.WORKER_CONNECT_TIMEOUT)
+        deadline.start()
+        try:
+            while env.runner.worker_count < len(workers):
+                if any(worker.poll() is not None for worker in workers):
+                    raise RuntimeError("A Locust worker process exited before connecting to the master")
+                gevent.sleep(0.1)
+        except gevent.Timeout:
+            self._stop_workers(workers, kill=True)
+            raise RuntimeError(f"Only {env.runner.worker_count}/{len(workers)} Locust workers connected")
+        except RuntimeError:
+            self._stop_workers(workers, kill=True)
+            raise
+        finally:
+            deadline.cancel()
+        logging.info("%s Locust workers connected to master on port %s", len(workers), port)
+        return workers
+
+    @staticmethod
+    def _stop_workers(workers: list, kill: bool = False):
+        for worker in workers:
+            if kill:
+                worker.kill()
+            try:
+                worker.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                worker.kill()
+                worker.wait()
+
+    def _initial_pool_size(self, level: LoadLevel) -> int:
+        users = math.ceil(level.target_rps * self.INITIAL_LATENCY_ESTIMATE * self.POOL_HEADROOM)
+        return max(1, min(level.users, users))
+
+    def _size_user_pool(self, env: Environment, user_class, level: LoadLevel):
+        """
+        Open loop: grow the user pool while the achieved operation rate stays below target,
+        so a slow server is met with more concurrency instead of a lower offered load.
+        """
+        entry = env.stats.get(*user_class.operation)
+        last_count, last_time = entry.num_requests, time.monotonic()
+        while True:
+            gevent.sleep(self.POOL_CONTROL_INTERVAL)
+            now, count = time.monotonic(), entry.num_requests
+            achieved = (count - last_count) / (now - last_time)
+            last_count, last_time = count, now
+            if achieved >= self.RATE_TOLERANCE * level.target_rps or self.pool_size >= level.users:
+                continue
+            growth = min(2.0, max(1.25, level.target_rps / max(achieved, 1e-9)))
+            self.pool_size = min(level.users, math.ceil(self.pool_size * growth))
+            logging.info("Achieved %.1f/%s ops/s, growing user pool to %s", achieved, level.target_rps, self.pool_size)
+            env.runner.start(user_count=self.pool_size, spawn_rate=level.spawn_rate)
+
+    def _run_locust(self, user_class, level: LoadLevel, output_dir: Path = None):
         host = self._host()
-        logging.info("Starting %s users against %s (spawn_rate=%s, duration=%ss)",
-                     level.users, host, level.spawn_rate, level.duration)
+        self.pool_size = self._initial_pool_size(level) if level.is_open_loop else level.users
+        logging.info("Starting %s %s users against %s (spawn_rate=%s, duration=%ss, workers=%s, target=%s ops/s)",
+                     self.pool_size, self.http_client.value, host, level.spawn_rate, level.duration,
+                     self.workers if self.distributed else "local", level.target_rps or "closed loop")
 
         env = Environment(user_classes=[user_class], host=host)
-        env.create_local_runner()
-        env.runner.start(user_count=level.users, spawn_rate=level.spawn_rate)
-        gevent.spawn(stats_history, env.runner)
+        processes = self.workers if self.distributed else 1
+        worker_env = {"DSB_TIMESERIES": "1"}
+        timeseries = RequestTimeSeries()
+        if level.is_open_loop:
+            # Every process paces its own share of the arrivals
+            worker_env.update({
+                "DSB_ARRIVAL_RATE": str(level.target_rps / processes),
+                "DSB_ARRIVAL_SCHEDULE": self.arrival_schedule.value,
+            })
+            if not self.distributed:
+                ARRIVALS.configure(level.target_rps, self.arrival_schedule)
+        if self.http_client == HttpClient.FAST:
+            # Users are spread evenly over the processes; size for the most users the level may reach
+            users_per_process = math.ceil(level.users / processes)
+            frontend_connections = self.frontend_connections or users_per_process
+            media_connections = self.media_connections or users_per_process
+            worker_env.update({
+                "DSB_FRONTEND_CONNECTIONS": str(frontend_connections),
+                "DSB_MEDIA_CONNECTIONS": str(media_connections),
+            })
+            if not self.distributed:
+                CONNECTIONS.configure(frontend_connections, media_connections)
+        if self.user_pool is not None:
+            worker_env["DSB_USER_POOL"] = str(self.user_pool)
+            if not self.distributed:
+                DSBUserMixin.user_pool = UserPool.load(self.user_pool)
+        if self.distributed:
+            timeseries.attach_master(env.events)
+            workers = self._start_workers(env, worker_env)
+        else:
+            timeseries.attach(env.events)
+            env.create_local_runner()
+            workers = []
+        cpu_monitor = ClientCpuMonitor([os.getpid()] + [worker.pid for worker in workers])
+        cpu_monitor.start()
+
+        # Monotonic marks of the load window and the end of its ramp-up, anchored to one wall-clock reading
+        ramp = {}
+        env.events.spawning_complete.add_listener(lambda user_count: ramp.setdefault("end", time.monotonic()))
+        window_start = time.time()
+        start = time.monotonic()
+        env.runner.start(user_count=self.pool_size, spawn_rate=level.spawn_rate)
+        controller = gevent.spawn(self._size_user_pool, env, user_class, level) if level.is_open_loop else None
         gevent.sleep(level.duration)
-        env.runner.quit()
+        elapsed = time.monotonic() - start
+        window_end = window_start + elapsed
+        if controller is not None:
+            controller.kill(block=True)
+        env.runner.quit()  # Waits for the workers' final reports
+        ARRIVALS.configure(None)
+        CONNECTIONS.close()
+        DSBUserMixin.user_pool = None
+        self.run_summary = cpu_monitor.stop()
+        self._stop_workers(workers)
+
+        operations = env.stats.get(*user_class.operation).num_requests
+        self.run_summary.update({
+            "target_rps": level.target_rps,
+            "achieved_rps": operations / elapsed,
+            "load_users": self.pool_size,
+            "window_start": window_start,
+            "window_end": window_end,
+            "ramp_end": window_start + ramp["end"] - start if "end" in ramp else None,
+        })
+        if output_dir is not None:
+            timeseries.save(Path(output_dir) / RequestTimeSeries.FILE_NAME, window_start, window_end)
+        if level.is_open_loop:
+            logging.info("Open loop: achieved %.2f of %s target ops/s with %s users",
+                         self.run_summary["achieved_rps"], level.target_rps, self.pool_size)
 
         # Summarize
         s = env.stats.total
@@ -207,6 +688,13 @@ class WorkloadGenerator:
             s.get_response_time_percentile(0.95),
             s.get_response_time_percentile(0.99),
         )
+        # No client CPU sample in a load shorter than the monitor's interval
+        if "client_cpu_usage_mean" in self.run_summary:
+            logging.info(
+                "Client CPU: mean=%.1f%%, max=%.1f%%, busiest process max=%.1f%% (100%% = one core, %s processes)",
+                self.run_summary["client_cpu_usage_mean"], self.run_summary["client_cpu_usage_max"],
+                self.run_summary["client_cpu_busiest_process_max"], self.run_summary["client_processes"],
+            )
         return s
 
 
@@ -0,0 +1,156 @@
+"""
+Regression benchmark for the EnergiBridge output parser on long, high-frequency traces.
+
+Generates a synthetic EnergiBridge trace whose RAPL counters wrap several times, checks the parser
+recovers the true energy, and times the vectorized unwrap against the original per-sample loop.
+With --csv the trace is also written to disk to compare the chunked, column-pruned loader
+against the original read-everything-then-coerce path (time and peak traced memory).
+
+Usage: python orc/benchmarks/bench_energibridge_parser.py [--hours 4] [--interval-ms 10] [--csv --chunksize 10000 50000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+for import_dir in (ROOT_DIR / 'orc', ROOT_DIR / 'experiment-runner' / 'experiment-runner'):
+    if str(import_dir) not in sys.path:
+        sys.path.insert(0, str(import_dir))
+from OutputParsers import EnergibridgeOutputParser, CPU_COUNT
+
+PACKAGE_WRAP = 262143.328850    # J
+DRAM_WRAP = 65712.999613        # J
+
+
+def make_trace(hours: float, interval_ms: int, seed: int = 0):
+    """Build a trace with noisy package/DRAM power. Returns the DataFrame and the true energy per domain."""
+    rng = np.random.default_rng(seed)
+    n = int(hours * 3600 * 1000 / interval_ms)
+    dt = interval_ms / 1000
+    package_power = rng.uniform(60, 180, n)     # W
+    dram_power = rng.uniform(8, 25, n)          # W
+    package_energy = np.cumsum(package_power * dt)
+    dram_energy = np.cumsum(dram_power * dt)
+
+    data = {
+        'Delta': np.full(n, interval_ms),
+        'Time': 1_700_000_000_000 + np.arange(n) * interval_ms,
+        'TOTAL_MEMORY': np.full(n, 67_108_864_000.0),
+        'TOTAL_SWAP': np.full(n, 8_589_934_592.0),
+        'USED_MEMORY': rng.uniform(8e9, 9e9, n),
+        'USED_SWAP': np.zeros(n),
+    }
+    for i in range(CPU_COUNT):
+        data[f'CPU_FREQUENCY_{i}'] = rng.uniform(800, 3600, n).round()
+    for i in range(CPU_COUNT):
+        data[f'CPU_USAGE_{i}'] = rng.uniform(0, 100, n).round(2)
+    data['DRAM_ENERGY (J)'] = np.mod(dram_energy, DRAM_WRAP)
+    data['PACKAGE_ENERGY (J)'] = np.mod(package_energy, PACKAGE_WRAP)
+
+    truth = {
+        'DRAM_ENERGY (J)': dram_energy[-1] - dram_energy[0],
+        'PACKAGE_ENERGY (J)': package_energy[-1] - package_energy[0],
+    }
+    return pd.DataFrame(data), truth
+
+
+def legacy_unwrap(column_data: np.ndarray, wrap_value: float) -> float:
+    """The original per-sample loop, kept verbatim as the baseline (including its compounding offsets)."""
+    column_data = column_data.copy()
+    overflow_counter = 0
+    for i in range(1, len(column_data)):
+        if column_data[i] < column_data[i - 1]:
+            overflow_counter += 1
+            column_data[i:] += overflow_counter * wrap_value
+    return column_data[-1] - column_data[0]
+
+
+def legacy_parse(file_path, wrap_values: dict) -> dict:
+    """The original loading path: parse every column as text, coerce every cell, then reduce."""
+    df = pd.read_csv(file_path).apply(pd.to_numeric, errors='coerce')
+    averages = df[EnergibridgeOutputParser.target_columns].mean().to_dict()
+    columns = EnergibridgeOutputParser.delta_target_columns
+    unwrapped, _ = EnergibridgeOutputParser.unwrap_energy_counters(
+        df[columns].ffill().bfill().to_numpy(dtype=np.float64), np.array([wrap_values[c] for c in columns])
+    )
+    return dict(averages.items() | dict(zip(columns, unwrapped[-1] - unwrapped[0])).items())
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def profiled(fn, *args, **kwargs):
+    """Run `fn` and return its result, wall time and peak traced memory in MiB."""
+    tracemalloc.start()
+    try:
+        result, elapsed = timed(fn, *args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / 1024**2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hours', type=float, default=4.0, help='Trace length in hours')
+    parser.add_argument('--interval-ms', type=int, default=10, help='Sampling interval of the synthetic trace')
+    parser.add_argument('--skip-legacy', action='store_true', help='Do not time the original per-sample loop')
+    parser.add_argument('--csv', action='store_true', help='Also write the trace to CSV and benchmark the loaders')
+    parser.add_argument('--chunksize', type=int, nargs='+', default=[EnergibridgeOutputParser.DEFAULT_CHUNKSIZE],
+                        help='Chunk sizes (rows) to benchmark the streaming loader with')
+    args = parser.parse_args()
+
+    df, truth = make_trace(args.hours, args.interval_ms)
+    columns = EnergibridgeOutputParser.delta_target_columns
+    wrap_values = {'DRAM_ENERGY (J)': DRAM_WRAP, 'PACKAGE_ENERGY (J)': PACKAGE_WRAP}
+    print(f"Trace: {len(df):,} samples ({args.hours} h @ {args.interval_ms} ms)")
+
+    counters = df[columns].to_numpy(dtype=np.float64)
+    (unwrapped, overflows), elapsed = timed(
+        EnergibridgeOutputParser.unwrap_energy_counters, counters, np.array([wrap_values[c] for c in columns])
+    )
+    print(f"vectorized unwrap: {elapsed * 1000:10.1f} ms, {len(overflows)} wraps detected")
+    failed = False
+    for j, column in enumerate(columns):
+        delta = unwrapped[-1, j] - unwrapped[0, j]
+        error = abs(delta - truth[column]) / truth[column]
+        print(f"  {column:20s} parsed={delta:14.2f} J  true={truth[column]:14.2f} J  rel.error={error:.2e}")
+        failed |= error > 1e-9
+
+    if not args.skip_legacy:
+        for column in columns:
+            delta, elapsed = timed(legacy_unwrap, df[column].to_numpy(dtype=np.float64), wrap_values[column])
+            error = abs(delta - truth[column]) / truth[column]
+            print(f"legacy loop {column:20s}: {elapsed * 1000:10.1f} ms, rel.error={error:.2e}")
+
+    if args.csv:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / 'energibridge.csv'
+            df.to_csv(csv_path, index=False)
+            del df
+            print(f"CSV size: {csv_path.stat().st_size / 1024**2:.1f} MiB")
+
+            baseline, elapsed, peak = profiled(legacy_parse, csv_path, wrap_values)
+            print(f"legacy loader              : {elapsed:7.2f} s, peak {peak:8.1f} MiB")
+            for chunksize in args.chunksize:
+                result, elapsed, peak = profiled(EnergibridgeOutputParser.parse_output, csv_path, wrap_values, chunksize)
+                print(f"chunked loader ({chunksize:>9,} rows): {elapsed:7.2f} s, peak {peak:8.1f} MiB")
+                for column in columns:
+                    failed |= abs(result[column] - truth[column]) / truth[column] > 1e-6
+                for column in EnergibridgeOutputParser.target_columns:
+                    failed |= not np.isclose(result[column], baseline[column], rtol=1e-6)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Load-generator efficiency benchmark: requests-based HttpUser vs geventhttpclient-based FastHttpUser.
+
+Runs every LoadType with both HTTP clients against the configured DSB instance (APPLICATION_IP,
+APPLICATION_PORT and MEDIA_SERVICE_PORT from .env) and reports the achieved request rate per fully
+busy client core. Pick a closed-loop level that saturates the client (e.g. high) for the maximum
+RPS per core; with --distributed the CPU of the Locust workers is included.
+
+Usage: python orc/benchmarks/bench_http_clients.py [--level high] [--load-type media ...] [--distributed --workers 4]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+ORC_DIR = Path(__file__).resolve().parents[1]
+if str(ORC_DIR) not in sys.path:
+    sys.path.insert(0, str(ORC_DIR))
+from WorkloadGenerator import WorkloadGenerator, LoadType, LoadLevel, HttpClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--level', default='high', choices=[level.name.lower() for level in LoadLevel],
+                        help='Load level to run each combination at')
+    parser.add_argument('--load-type', nargs='+', default=[load_type.value for load_type in LoadType],
+                        choices=[load_type.value for load_type in LoadType], help='Load types to benchmark')
+    parser.add_argument('--distributed', action='store_true', help='Use a Locust master with worker processes')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: core count)')
+    parser.add_argument('--connections', type=int, default=None,
+                        help='fasthttp keep-alive connections per process and host (default: one per user)')
+    args = parser.parse_args()
+
+    level = LoadLevel[args.level.upper()]
+    results = []
+    for load_type in map(LoadType, args.load_type):
+        for http_client in HttpClient:
+            generator = WorkloadGenerator(
+                distributed=args.distributed, workers=args.workers, http_client=http_client,
+                frontend_connections=args.connections, media_connections=args.connections,
+            )
+            stats = generator.fire_load(load_type, level)
+            summary = generator.run_summary
+            cores = summary.get('client_cpu_usage_mean', float('nan')) / 100
+            results.append((load_type, http_client, stats.total_rps, stats.fail_ratio, cores, stats.total_rps / cores))
+
+    print(f"\n{'load type':15s} {'client':9s} {'RPS':>9s} {'failures':>9s} {'client cores':>13s} {'RPS/core':>9s}")
+    for load_type, http_client, rps, fail_ratio, cores, rps_per_core in results:
+        print(f"{load_type.value:15s} {http_client.value:9s} {rps:9.1f} {fail_ratio:9.2%} {cores:13.2f} {rps_per_core:9.1f}")
+    for load_type in map(LoadType, args.load_type):
+        per_core = {row[1]: row[5] for row in results if row[0] == load_type}
+        print(f"{load_type.value}: fasthttp delivers {per_core[HttpClient.FAST] / per_core[HttpClient.REQUESTS]:.2f}x "
+              f"the requests per client core")
+
+
+if __name__ == '__main__':
+    main()
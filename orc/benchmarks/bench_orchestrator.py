@@ -0,0 +1,151 @@
+"""
+End-to-end orchestrator benchmark against the stand-in testbed (standin/standin_testbed.py), on this machine.
+
+Starts the stand-in on free ports (Scaphandre on its fixed 18080), points RunnerConfig at it through the local
+backend (GL3_BACKEND=local) and drives every hook of the experiment lifecycle in order, like Experiment Runner,
+for the first --runs runs of the run table at the given load levels. Loads are compressed by --load-scale and the
+settle/warmup/cooldown waits cut to --wait seconds. Reports the time spent in each hook, and per run the
+orchestration overhead: its wall-clock time minus the load and the deliberate waits.
+
+Feature toggles (TESTBED_AGENT, BUNDLE_TRANSFER, OVERLAP_TRANSFER, PARALLEL_PARSING, MEASUREMENT_WINDOW, ...) are
+read from the environment as usual, so comparing two invocations compares the toggles.
+
+Usage: [PARALLEL_PARSING=true ...] python orc/benchmarks/bench_orchestrator.py [--runs 6] [--levels low medium]
+       [--load-scale 0.1] [--wait 1] [--service-time media_service=lognormal:40:0.8] [--keep]
+"""
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+for import_dir in (ROOT_DIR / 'orc', ROOT_DIR / 'experiment-runner' / 'experiment-runner'):
+    if str(import_dir) not in sys.path:
+        sys.path.insert(0, str(import_dir))
+
+STANDIN = ROOT_DIR / 'standin' / 'standin_testbed.py'
+STANDIN_START_TIMEOUT = 10  # seconds
+RUN_HOOKS = ['before_run', 'start_run', 'start_measurement', 'interact', 'stop_measurement', 'stop_run', 'populate_run_data']
+WAIT_ATTRIBUTES = [
+    'warmup_time', 'post_warmup_cooldown_time', 'governor_switch_settle_time', 'load_switch_settle_time',
+    'warmup_min_time', 'warmup_max_time', 'cooldown_min_time', 'cooldown_max_time',
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_standin(home: Path, port: int, media_port: int, service_times: list) -> subprocess.Popen:
+    command = [sys.executable, str(STANDIN), '--home', str(home), '--port', str(port), '--media-port', str(media_port)]
+    for spec in service_times:
+        command += ['--service-time', spec]
+    standin = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    deadline = time.monotonic() + STANDIN_START_TIMEOUT
+    for line in standin.stdout:
+        print(line, end='')
+        if line.startswith('[StandIn] Ready'):
+            return standin
+        if time.monotonic() > deadline:
+            break
+    standin.kill()
+    raise RuntimeError(f"Stand-in testbed did not start (exit code {standin.poll()})")
+
+
+def timed(function, *args) -> tuple:
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=6, help='Runs of the run table to execute')
+    parser.add_argument('--levels', nargs='+', default=['low'], help='Load levels the runs are taken from')
+    parser.add_argument('--load-scale', type=float, default=0.1, help='Factor on every load level duration')
+    parser.add_argument('--wait', type=float, default=1, help='Seconds of every settle/warmup/cooldown wait')
+    parser.add_argument('--service-time', action='append', default=[],
+                        help='Stand-in service time, <service>=<distribution> (see standin_testbed.py)')
+    parser.add_argument('--keep', action='store_true', help='Keep the stand-in home and results afterwards')
+    args = parser.parse_args()
+
+    home = Path(tempfile.mkdtemp(prefix='gl3-standin-'))
+    port, media_port = free_port(), free_port()
+    standin = start_standin(home, port, media_port, args.service_time)
+    # RunnerConfig and its modules read these at import time
+    os.environ.update({
+        'GL3_BACKEND': 'local', 'GL3_LOCAL_HOME': str(home), 'STANDIN_CGROUPS': str(home / 'cgroups'),
+        'STANDIN_CPUFREQ': str(home / 'cpu'), 'STANDIN_POWERCAP': str(home / 'powercap'),
+        'APPLICATION_IP': '127.0.0.1', 'APPLICATION_PORT': str(port), 'MEDIA_SERVICE_PORT': str(media_port),
+        'LOAD_DURATION_SCALE': str(args.load_scale),
+    })
+    from ConfigValidator.Config.Models.RunnerContext import RunnerContext
+    from ProgressManager.Output.CSVOutputManager import CSVOutputManager
+    from ProgressManager.RunTable.Models.RunProgress import RunProgress
+    from RunnerConfig import RunnerConfig
+
+    try:
+        config = RunnerConfig()
+        for attribute in WAIT_ATTRIBUTES:
+            setattr(config, attribute, args.wait)
+        config.warmup_memory_mb = 64  # Nothing on the stand-in needs its caches warmed
+        config.experiment_path = home / 'orc-experiments' / config.name
+        config.experiment_path.mkdir(parents=True)
+
+        rows = [row for row in config.create_run_table_model().generate_experiment_run_table()
+                if row['load_level'] in args.levels][:args.runs]
+        csv_output = CSVOutputManager(config.experiment_path)
+        csv_output.write_run_table(rows)
+
+        hook_times = {hook: [] for hook in ['before_experiment'] + RUN_HOOKS + ['after_experiment']}
+        _, seconds = timed(config.before_experiment)
+        hook_times['before_experiment'].append(seconds)
+        runs = []
+        for run_nr, row in enumerate(rows, start=1):
+            run_dir = config.experiment_path / row['__run_id']
+            run_dir.mkdir()
+            context = RunnerContext(row, run_nr, run_dir)
+            run_start = time.perf_counter()
+            for hook in RUN_HOOKS:
+                run_data, seconds = timed(getattr(config, hook), *(() if hook == 'before_run' else (context,)))
+                hook_times[hook].append(seconds)
+            csv_output.update_row_data({**row, **(run_data or {}), '__done': RunProgress.DONE})
+            wall = time.perf_counter() - run_start
+            load = config.workload_summary['window_end'] - config.workload_summary['window_start']
+            waits = sum(seconds or 0 for seconds in (config.settle_seconds, config.warmup_seconds, config.cooldown_seconds))
+            runs.append((row['__run_id'], wall, load, waits, wall - load - waits))
+        _, seconds = timed(config.after_experiment)
+        hook_times['after_experiment'].append(seconds)
+        results = csv_output.read_run_table()
+    finally:
+        standin.terminate()
+        print(standin.communicate(timeout=10)[0], end='')
+
+    print(f"\n{'hook':20s} {'calls':>5s} {'mean (s)':>9s} {'max (s)':>9s}")
+    for hook, times in hook_times.items():
+        print(f"{hook:20s} {len(times):5d} {sum(times) / len(times):9.3f} {max(times):9.3f}")
+    print(f"\n{'run':28s} {'wall (s)':>9s} {'load (s)':>9s} {'waits (s)':>10s} {'overhead (s)':>13s}")
+    for run_id, wall, load, waits, overhead in runs:
+        print(f"{run_id:28s} {wall:9.2f} {load:9.2f} {waits:10.2f} {overhead:13.2f}")
+    overhead = sum(run[4] for run in runs) / len(runs)
+    print(f"\nOrchestration overhead: {overhead:.2f} s per run ({overhead / (sum(run[1] for run in runs) / len(runs)):.0%} "
+          f"of its wall-clock time), after_experiment {hook_times['after_experiment'][0]:.2f} s")
+    columns = [column for column in config.run_table_model.data_columns if column not in ('clock_offset', 'window_duration')]
+    filled = sum(1 for row in results for column in columns if str(row.get(column, '')).strip() not in ('', 'nan', 'None'))
+    print(f"Run table: {filled} of {len(columns) * len(results)} measurement cells filled")
+
+    if args.keep:
+        print(f"Stand-in home and results kept in {home}")
+    else:
+        shutil.rmtree(home, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Fake EnergiBridge for the stand-in testbed (installed as `energibridge` by standin_testbed.py).
+
+Takes the options RunnerConfig passes to the real tool, runs the command, and writes the same CSV layout every
+--interval milliseconds: Delta, Time (epoch ms), CPU_FREQUENCY_<i>, CPU_USAGE_<i> of every core, cumulative
+DRAM_ENERGY (J) and PACKAGE_ENERGY (J), and the memory totals. Core usage and memory are this machine's real
+readings; frequencies follow the governor last set with the fake set-governor.sh, and the energy counters integrate
+a simple power model of both, so the numbers respond to load and governor like the real ones.
+
+Usage: energibridge [--interval 1000] [--output energibridge.csv] [--command-output output.txt] [--summary] COMMAND...
+"""
+
+import argparse
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+MIN_FREQUENCY = 800.0    # MHz
+MAX_FREQUENCY = 3500.0   # MHz
+UNCORE_POWER = 12.0      # W, package idle
+CORE_POWER = 6.0         # W per fully busy core at the maximum frequency
+DRAM_IDLE_POWER = 1.5    # W
+DRAM_POWER = 4.0         # W with all memory in use
+
+# Graceful stop flag
+RUNNING = True
+
+
+def handle_sigint(sig, frame):
+    global RUNNING
+    RUNNING = False
+
+
+def read_core_times() -> list:
+    """(busy, total) jiffies of every core, from the first 8 fields of /proc/stat (guest time is already in user)."""
+    cores = []
+    with open("/proc/stat", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("cpu") and line[3].isdigit():
+                fields = [int(value) for value in line.split()[1:9]]
+                idle = fields[3] + fields[4]
+                cores.append((sum(fields) - idle, sum(fields)))
+    return cores
+
+
+def read_memory() -> dict:
+    values = {}
+    with open("/proc/meminfo", encoding="utf-8") as f:
+        for line in f:
+            name, value = line.split(":", 1)
+            values[name] = int(value.split()[0]) * 1024
+    return {
+        "TOTAL_MEMORY": values["MemTotal"],
+        "TOTAL_SWAP": values.get("SwapTotal", 0),
+        "USED_MEMORY": values["MemTotal"] - values.get("MemAvailable", values.get("MemFree", 0)),
+        "USED_SWAP": values.get("SwapTotal", 0) - values.get("SwapFree", 0),
+    }
+
+
+def frequency(governor: str, usage: float) -> float:
+    if governor == "performance":
+        return MAX_FREQUENCY
+    if governor == "powersave":
+        return MIN_FREQUENCY
+    if governor == "userspace":
+        return (MIN_FREQUENCY + MAX_FREQUENCY) / 2
+    # ondemand, conservative, schedutil: scale with the core's load
+    return MIN_FREQUENCY + (MAX_FREQUENCY - MIN_FREQUENCY) * usage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interval", type=int, default=200, help="Sampling period in milliseconds")
+    parser.add_argument("--output", type=Path, default=Path("energibridge.csv"), help="CSV file to write")
+    parser.add_argument("--command-output", type=Path, default=None, help="File for the command's output")
+    parser.add_argument("--summary", action="store_true", help="Print the energy used when done")
+    parser.add_argument("--state", type=Path, default=Path.home() / ".standin", help="Stand-in state directory")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="Command to run while measuring")
+    args = parser.parse_args()
+
+    signal.signal(signal.SIGINT, handle_sigint)
+    signal.signal(signal.SIGTERM, handle_sigint)
+
+    command_output = open(args.command_output, "w") if args.command_output else subprocess.DEVNULL
+    command = subprocess.Popen(args.command, stdout=command_output, stderr=subprocess.STDOUT) if args.command else None
+    governor_file = args.state / "governor"
+
+    previous = read_core_times()
+    cores = len(previous)
+    header = (["Delta", "Time"] + [f"CPU_FREQUENCY_{i}" for i in range(cores)] + [f"CPU_USAGE_{i}" for i in range(cores)]
+              + ["DRAM_ENERGY (J)", "PACKAGE_ENERGY (J)", "TOTAL_MEMORY", "TOTAL_SWAP", "USED_MEMORY", "USED_SWAP"])
+    package_energy = dram_energy = 0.0
+    start = last = time.monotonic()
+    deadline = start
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(",".join(header) + "\n")
+        while RUNNING and (command is None or command.poll() is None):
+            deadline += args.interval / 1000
+            time.sleep(max(0.0, deadline - time.monotonic()))
+            now = time.monotonic()
+            current = read_core_times()
+            usage = [
+                (busy - last_busy) / (total - last_total) if total > last_total else 0.0
+                for (busy, total), (last_busy, last_total) in zip(current, previous)
+            ]
+            governor = governor_file.read_text().strip() if governor_file.exists() else "schedutil"
+            frequencies = [frequency(governor, core_usage) for core_usage in usage]
+            memory = read_memory()
+            elapsed = now - last
+            package_energy += elapsed * (UNCORE_POWER + sum(
+                CORE_POWER * core_usage * (core_frequency / MAX_FREQUENCY) ** 2
+                for core_usage, core_frequency in zip(usage, frequencies)
+            ))
+            dram_energy += elapsed * (DRAM_IDLE_POWER + DRAM_POWER * memory["USED_MEMORY"] / memory["TOTAL_MEMORY"])
+            row = ([round(elapsed * 1000), round(time.time() * 1000)] + [round(value) for value in frequencies]
+                   + [round(value * 100, 2) for value in usage] + [round(dram_energy, 6), round(package_energy, 6)]
+                   + [memory[column] for column in header[-4:]])
+            f.write(",".join(map(str, row)) + "\n")
+            f.flush()
+            previous, last = current, now
+
+    if command is not None and command.poll() is None:
+        command.terminate()
+        command.wait()
+    if args.summary:
+        try:
+            print(f"Energy consumption in joules: {package_energy + dram_energy:.4f} for {time.monotonic() - start:.4f} "
+                  f"sec of execution.", flush=True)
+        except BrokenPipeError:
+            pass  # Nobody listens any more (the SSH channel that started us is gone)
+    sys.exit(command.returncode if command is not None and command.returncode and command.returncode > 0 else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Stand-in testbed: everything the orchestrator talks to, on one machine, so the whole RunnerConfig lifecycle can run
+(and be benchmarked, see orc/benchmarks/bench_orchestrator.py) without the real testbed.
+
+One asyncio process serves
+  - the DeathStarBench social network endpoints WorkloadGenerator and UserPool call: the frontend on --port and the
+    media service on --media-port. Every request holds one of the --concurrency slots of its service for a service
+    time drawn from that service's distribution, so latency grows with the load as on a real service;
+  - a Scaphandre Prometheus exporter on --scaphandre-port, whose per-service power follows the services' busy time;
+  - one fake cgroup v2 directory per container (cpu.stat, memory.*) under <home>/cgroups, refreshed in place, for
+    the container collectors (STANDIN_CGROUPS);
+  - --cores fake cpu<N>/cpufreq directories under <home>/cpu (scaling_cur_freq and the stats/ residency and
+    transition counters), whose frequencies follow the governor and the services' load, for the cpufreq sampler
+    (STANDIN_CPUFREQ);
+  - RAPL package and DRAM zones under <home>/powercap, whose energy_uj counters integrate EnergiBridge's power model
+    of the fake cores, for the measurement agent and the power monitor (STANDIN_POWERCAP).
+
+It also prepares <home> as the testbed account of the local backend (GL3_BACKEND=local, GL3_LOCAL_HOME=<home>):
+GreenLab/testbed links to this repository's testbed scripts, and bin/ holds a fake `energibridge` (energibridge.py),
+a `set-governor.sh` that only records the governor, and a `sudo` that runs its command unprivileged (ignoring its
+options); .profile puts
+bin/ on the PATH of login shells.
+
+Service times are `<service>=<distribution>` in milliseconds: const:MS, exp:MEAN, lognormal:MEDIAN:SIGMA or
+uniform:LOW:HIGH, e.g. --service-time media_service=lognormal:40:0.8
+
+Usage: python3 standin/standin_testbed.py --home /tmp/gl3 [--port 8080] [--media-port 8081] [--service-time ...]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import signal
+import time
+from collections import deque
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from energibridge import CORE_POWER as RAPL_CORE_POWER, DRAM_IDLE_POWER, DRAM_POWER, MAX_FREQUENCY, MIN_FREQUENCY, \
+    UNCORE_POWER, frequency
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+TESTBED_DIR = REPO_DIR / "testbed"
+ENERGIBRIDGE = Path(__file__).resolve().parent / "energibridge.py"
+SERVICES = ["user_service", "home_timeline_service", "compose_post_service", "media_service"]
+DEFAULT_SERVICE_TIMES = {
+    "user_service": "const:2",
+    "home_timeline_service": "exp:5",
+    "compose_post_service": "lognormal:10:0.5",
+    "media_service": "lognormal:25:0.6",
+}
+BASE_MEMORY = 64 * 1024 ** 2  # bytes per container
+FAKE_MEMORY = 16 * 1024 ** 3  # bytes of DRAM the fake DRAM zone's power is relative to
+ITEM_MEMORY = 2048            # bytes per stored user, post or media object
+IDLE_POWER = 0.3              # W per service process
+CORE_POWER = 4.0              # W per fully busy core
+UPDATE_INTERVAL = 0.25        # seconds between cgroup/power updates
+POWER_WINDOW = 4              # updates the power readings are averaged over
+RAPL_WRAP = 262143328850      # uJ, max_energy_range_uj of the fake RAPL zones
+FREQUENCY_STEP = 100          # MHz between the fake cores' frequency levels
+COUNTER_WIDTH = 20            # digits; fixed-width counters can be rewritten in place without truncating
+
+REASONS = {200: "OK", 302: "Found", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 500: "Internal Server Error"}
+
+
+def service_time_sampler(spec: str, rng: random.Random):
+    """Sampler of service times in seconds for a `<distribution>:<parameters in ms>` spec."""
+    kind, *params = spec.split(":")
+    params = [float(param) for param in params]
+    if kind == "const":
+        return lambda: params[0] / 1000
+    if kind == "exp":
+        return lambda: rng.expovariate(1000 / params[0])
+    if kind == "lognormal":
+        return lambda: rng.lognormvariate(math.log(params[0]), params[1]) / 1000
+    if kind == "uniform":
+        return lambda: rng.uniform(params[0], params[1]) / 1000
+    raise ValueError(f"Unknown service time distribution {spec!r}")
+
+
+class Service:
+    """One fake microservice: a bounded number of requests in service at a time, and its busy time so far."""
+    def __init__(self, name: str, sampler, concurrency: int, pid: int):
+        self.name = name
+        self.sampler = sampler
+        self.slots = asyncio.Semaphore(concurrency)
+        self.pid = pid
+        self.busy_usec = 0
+        self.items = 0
+        self.power_samples = deque(maxlen=POWER_WINDOW)  # (monotonic time, busy usec)
+
+    async def serve(self):
+        async with self.slots:
+            service_time = self.sampler()
+            await asyncio.sleep(service_time)
+            self.busy_usec += int(service_time * 1e6)
+
+    @property
+    def memory(self) -> int:
+        return BASE_MEMORY + self.items * ITEM_MEMORY
+
+    @property
+    def power_uw(self) -> float:
+        if len(self.power_samples) < 2:
+            return IDLE_POWER * 1e6
+        (t0, busy0), (t1, busy1) = self.power_samples[0], self.power_samples[-1]
+        cores = (busy1 - busy0) / 1e6 / (t1 - t0)
+        return (IDLE_POWER + CORE_POWER * cores) * 1e6
+
+
+class FakeCgroup:
+    """cgroup v2 files of one container, kept open and rewritten in place so readers holding them open see updates."""
+    def __init__(self, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / "memory.max").write_text("max\n")
+        (directory / "memory.stat").write_text("anon 0\ninactive_file 0\n")
+        self.cpu_stat = os.open(directory / "cpu.stat", os.O_RDWR | os.O_CREAT | os.O_TRUNC)
+        self.memory_current = os.open(directory / "memory.current", os.O_RDWR | os.O_CREAT | os.O_TRUNC)
+
+    def update(self, busy_usec: int, memory: int):
+        os.pwrite(self.cpu_stat, f"usage_usec {busy_usec:0{COUNTER_WIDTH}d}\n".encode(), 0)
+        os.pwrite(self.memory_current, f"{memory:0{COUNTER_WIDTH}d}\n".encode(), 0)
+
+
+class FakeCpufreq:
+    """
+    cpufreq directories of `cores` fake cores. Every update moves each core to the governor's frequency for its load
+    (rounded to a level) and counts the time spent there, in the kernel's 10 ms units, and the transitions.
+    """
+    def __init__(self, directory: Path, cores: int, rng: random.Random):
+        self.rng = rng
+        self.levels = [int(mhz) for mhz in range(int(MIN_FREQUENCY), int(MAX_FREQUENCY) + 1, FREQUENCY_STEP)]
+        self.cores = []
+        for core in range(cores):
+            cpufreq = directory / f"cpu{core}" / "cpufreq"
+            (cpufreq / "stats").mkdir(parents=True, exist_ok=True)
+            (cpufreq / "cpuinfo_min_freq").write_text(f"{self.levels[0] * 1000}\n")
+            (cpufreq / "cpuinfo_max_freq").write_text(f"{self.levels[-1] * 1000}\n")
+            self.cores.append({
+                "directory": cpufreq,
+                "cur_freq": os.open(cpufreq / "scaling_cur_freq", os.O_RDWR | os.O_CREAT | os.O_TRUNC),
+                "frequency": self.levels[0], "ticks": dict.fromkeys(self.levels, 0.0), "transitions": 0,
+            })
+        self.last_update = None
+
+    def update(self, governor: str, busy_cores: float):
+        now = time.monotonic()
+        elapsed = 0.0 if self.last_update is None else now - self.last_update
+        self.last_update = now
+        for core in self.cores:
+            core["ticks"][core["frequency"]] += elapsed * 100
+            # The load spreads unevenly over the cores, so they do not all step together
+            usage = min(1.0, max(0.0, busy_cores / len(self.cores) * self.rng.uniform(0.5, 1.5)))
+            target = frequency(governor, usage)
+            level = min(self.levels, key=lambda mhz: abs(mhz - target))
+            if level != core["frequency"]:
+                core["frequency"] = level
+                core["transitions"] += 1
+            os.pwrite(core["cur_freq"], f"{level * 1000:0{COUNTER_WIDTH}d}\n".encode(), 0)
+            stats = core["directory"] / "stats"
+            for name, content in (
+                ("time_in_state", "".join(f"{mhz * 1000} {int(ticks)}\n" for mhz, ticks in core["ticks"].items())),
+                ("total_trans", f"{core['transitions']}\n"),
+            ):
+                partial = stats / f".{name}"
+                partial.write_text(content)
+                os.replace(partial, stats / name)
+
+
+class FakePowercap:
+    """intel-rapl package and DRAM zones whose energy_uj counters integrate the power of the fake cores."""
+    ZONES = {"package": ("intel-rapl:0", "package-0"), "dram": ("intel-rapl:0:0", "dram")}
+
+    def __init__(self, directory: Path):
+        self.counters = {}
+        for domain, (zone, name) in self.ZONES.items():
+            (directory / zone).mkdir(parents=True, exist_ok=True)
+            (directory / zone / "name").write_text(f"{name}\n")
+            (directory / zone / "max_energy_range_uj").write_text(f"{RAPL_WRAP}\n")
+            self.counters[domain] = os.open(directory / zone / "energy_uj", os.O_RDWR | os.O_CREAT | os.O_TRUNC)
+        self.energy_uj = dict.fromkeys(self.ZONES, 0.0)
+        self.last_update = None
+
+    def update(self, cores: list, busy_cores: float, memory_share: float):
+        """Integrate the power since the last update; `cores` are the fake cores' frequencies (MHz)."""
+        now = time.monotonic()
+        elapsed = 0.0 if self.last_update is None else now - self.last_update
+        self.last_update = now
+        usage = min(1.0, busy_cores / len(cores)) if cores else 0.0
+        package = UNCORE_POWER + sum(RAPL_CORE_POWER * usage * (mhz / MAX_FREQUENCY) ** 2 for mhz in cores)
+        dram = DRAM_IDLE_POWER + DRAM_POWER * min(1.0, memory_share)
+        for domain, power in (("package", package), ("dram", dram)):
+            self.energy_uj[domain] = (self.energy_uj[domain] + power * elapsed * 1e6) % RAPL_WRAP
+            os.pwrite(self.counters[domain], f"{int(self.energy_uj[domain]):0{COUNTER_WIDTH}d}\n".encode(), 0)
+
+
+class StandInTestbed:
+    def __init__(self, home: Path, service_times: dict, concurrency: int, seed: int = None, cores: int = 4):
+        rng = random.Random(seed)
+        self.home = home
+        self.services = {
+            name: Service(name, service_time_sampler(service_times[name], rng), concurrency, 10_000 + i)
+            for i, name in enumerate(SERVICES)
+        }
+        self.cgroups = {
+            name: FakeCgroup(home / "cgroups" / f"socialnetwork-{name.replace('_', '-')}-1") for name in SERVICES
+        }
+        self.cpufreq = FakeCpufreq(home / "cpu", cores, rng)
+        self.powercap = FakePowercap(home / "powercap")
+        self.users = {}
+        self.media_ids = 0
+
+    def prepare_home(self):
+        """Lay out the testbed account: the testbed scripts, a run directory and the fake system tools on the PATH."""
+        testbed = self.home / "GreenLab" / "testbed"
+        (testbed / "experiments").mkdir(parents=True, exist_ok=True)
+        for script in TESTBED_DIR.iterdir():
+            link = testbed / script.name
+            if script.is_file() and not link.exists():
+                link.symlink_to(script)
+        state = self.home / ".standin"
+        state.mkdir(exist_ok=True)
+        bin_dir = self.home / "bin"
+        bin_dir.mkdir(exist_ok=True)
+        shims = {
+            "energibridge": f'#!/bin/sh\nexec python3 "{ENERGIBRIDGE}" --state "{state}" "$@"\n',
+            "set-governor.sh": f'#!/bin/sh\necho "$1" > "{state}/governor"\necho "Governor set to $1"\n',
+            "sudo": '#!/bin/sh\nwhile [ "${1#-}" != "$1" ]; do shift; done\nexec "$@"\n',
+        }
+        for name, content in shims.items():
+            (bin_dir / name).write_text(content)
+            (bin_dir / name).chmod(0o755)
+        # Login shells (`bash -lc`, as RunnerConfig uses) get the fake tools and this interpreter's environment too
+        (self.home / ".profile").write_text(f'export PATH="{bin_dir}:{os.environ.get("PATH", "")}"\n')
+
+    # ---------------------------------------------------------------- endpoints
+    async def register(self, form: dict, cookies: dict):
+        await self.services["user_service"].serve()
+        username = form.get("username", "")
+        if username in self.users:
+            return 500, {}, b"User already existed"
+        self.users[username] = form.get("password", "")
+        self.services["user_service"].items += 1
+        return 200, {}, b"Success!"
+
+    async def login(self, form: dict, cookies: dict):
+        await self.services["user_service"].serve()
+        username = form.get("username", "")
+        if username not in self.users or self.users[username] != form.get("password"):
+            return 401, {}, b"Incorrect username or password"
+        token = f"standin-{username}-{random.getrandbits(32):08x}"
+        return 302, {"Set-Cookie": f"login_token={token}; Path=/", "Location": "/main.html"}, b""
+
+    async def follow(self, form: dict, cookies: dict):
+        if "login_token" not in cookies:
+            return 401, {}, b"Login required"
+        await self.services["user_service"].serve()
+        return 200, {}, b"Success!"
+
+    async def home_timeline(self, form: dict, cookies: dict):
+        await self.services["home_timeline_service"].serve()
+        return 200, {"Content-Type": "application/json"}, b"[]"
+
+    async def compose(self, form: dict, cookies: dict):
+        if "login_token" not in cookies:
+            return 401, {}, b"Login required"
+        await self.services["compose_post_service"].serve()
+        self.services["compose_post_service"].items += 1
+        return 302, {"Location": "/main.html"}, b""
+
+    async def upload_media(self, form: dict, cookies: dict):
+        await self.services["media_service"].serve()
+        self.media_ids += 1
+        self.services["media_service"].items += 1
+        body = json.dumps({"media_id": str(self.media_ids), "media_type": "jpg"}).encode()
+        return 200, {"Content-Type": "application/json"}, body
+
+    async def main_page(self, form: dict, cookies: dict):
+        return 200, {"Content-Type": "text/html"}, b"<html></html>"
+
+    async def metrics(self, form: dict, cookies: dict):
+        lines = ["# HELP scaph_process_power_consumption_microwatts Power consumption of the process in microwatts.",
+                 "# TYPE scaph_process_power_consumption_microwatts gauge"]
+        host = 0.0
+        for service in self.services.values():
+            binary = "".join(part.capitalize() for part in service.name.split("_"))
+            lines.append(
+                f'scaph_process_power_consumption_microwatts{{exe="{binary}",pid="{service.pid}",'
+                f'cmdline="/social-network-microservices/build/{binary}"}} {service.power_uw:.0f}'
+            )
+            host += service.power_uw
+        lines.append(f"scaph_host_power_microwatts {host:.0f}")
+        return 200, {"Content-Type": "text/plain; version=0.0.4"}, ("\n".join(lines) + "\n").encode()
+
+    def routes(self) -> dict:
+        """Routes of each server, keyed by its role."""
+        return {
+            "frontend": {
+                ("POST", "/api/user/register"): self.register,
+                ("POST", "/api/user/login"): self.login,
+                ("POST", "/api/user/follow"): self.follow,
+                ("GET", "/api/home-timeline/read"): self.home_timeline,
+                ("POST", "/api/post/compose"): self.compose,
+                ("GET", "/main.html"): self.main_page,
+            },
+            "media": {("POST", "/upload-media"): self.upload_media},
+            "scaphandre": {("GET", "/metrics"): self.metrics},
+        }
+
+    async def update_counters(self):
+        governor_file = self.home / ".standin" / "governor"
+        while True:
+            now = time.monotonic()
+            busy_cores = 0.0
+            for name, service in self.services.items():
+                service.power_samples.append((now, service.busy_usec))
+                self.cgroups[name].update(service.busy_usec, service.memory)
+                if len(service.power_samples) >= 2:
+                    (t0, busy0), (t1, busy1) = service.power_samples[-2], service.power_samples[-1]
+                    busy_cores += (busy1 - busy0) / 1e6 / (t1 - t0)
+            governor = governor_file.read_text().strip() if governor_file.exists() else "schedutil"
+            self.cpufreq.update(governor, busy_cores)
+            memory = sum(service.memory for service in self.services.values())
+            self.powercap.update([core["frequency"] for core in self.cpufreq.cores], busy_cores, memory / FAKE_MEMORY)
+            await asyncio.sleep(UPDATE_INTERVAL)
+
+
+def _form(headers: dict, body: bytes) -> dict:
+    if not headers.get("content-type", "").startswith("application/x-www-form-urlencoded"):
+        return {}
+    return {key: values[0] for key, values in parse_qs(body.decode("utf-8", errors="replace")).items()}
+
+
+def _cookies(headers: dict) -> dict:
+    cookies = {}
+    for pair in headers.get("cookie", "").split(";"):
+        name, _, value = pair.strip().partition("=")
+        if name:
+            cookies[name] = value
+    return cookies
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, routes: dict):
+    """Minimal HTTP/1.1 with keep-alive: Content-Length bodies only, which is all the load generator sends."""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length") or 0))
+
+            handler = routes.get((method, target.split("?", 1)[0]))
+            if handler is None:
+                status, extra, payload = 404, {}, b"Not found"
+            else:
+                status, extra, payload = await handler(_form(headers, body), _cookies(headers))
+            head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Length: {len(payload)}"]
+            head += [f"{name}: {value}" for name, value in extra.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError, asyncio.CancelledError):
+        pass  # Client went away, or we are shutting down
+    finally:
+        writer.close()
+
+
+async def serve(args):
+    service_times = {**DEFAULT_SERVICE_TIMES, **dict(spec.split("=", 1) for spec in args.service_time)}
+    testbed = StandInTestbed(args.home.resolve(), service_times, args.concurrency, args.seed, args.cores)
+    testbed.prepare_home()
+    routes = testbed.routes()
+    servers = [
+        await asyncio.start_server(lambda r, w, routes=routes[role]: handle_connection(r, w, routes), args.bind, port)
+        for role, port in (("frontend", args.port), ("media", args.media_port), ("scaphandre", args.scaphandre_port))
+    ]
+    updater = asyncio.create_task(testbed.update_counters())
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    print(f"[StandIn] Serving frontend :{args.port}, media :{args.media_port}, Scaphandre :{args.scaphandre_port}; "
+          f"testbed home {testbed.home}", flush=True)
+    print(f"[StandIn] Ready: GL3_BACKEND=local GL3_LOCAL_HOME={testbed.home} "
+          f"STANDIN_CGROUPS={testbed.home / 'cgroups'} STANDIN_CPUFREQ={testbed.home / 'cpu'} "
+          f"STANDIN_POWERCAP={testbed.home / 'powercap'} APPLICATION_IP={args.bind} APPLICATION_PORT={args.port} "
+          f"MEDIA_SERVICE_PORT={args.media_port}", flush=True)
+    await stop.wait()
+
+    updater.cancel()
+    for server in servers:
+        server.close()
+        await server.wait_closed()
+    print(f"[StandIn] Stopped; busy time {', '.join(f'{n} {s.busy_usec / 1e6:.1f}s' for n, s in testbed.services.items())}",
+          flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--home", type=Path, required=True, help="Directory to use as the testbed account's home")
+    parser.add_argument("--bind", default="127.0.0.1", help="Address the services listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Frontend (nginx-thrift) port")
+    parser.add_argument("--media-port", type=int, default=8081, help="Media service port")
+    parser.add_argument("--scaphandre-port", type=int, default=18080, help="Scaphandre exporter port")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in service at once, per service")
+    parser.add_argument("--service-time", action="append", default=[],
+                        help="Service time distribution of a service, <service>=<distribution> (repeatable)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the service time draws")
+    parser.add_argument("--cores", type=int, default=4, help="Fake cpufreq cores under <home>/cpu")
+    args = parser.parse_args()
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Compare the CPU overhead of the two container stats samplers on the testbed:
+  1. the original bash loop running `docker stats --no-stream` through awk every second
+  2. docker_stats_collector.py reading cgroup v2 files directly
+
+For each sampler, reports the CPU time of the sampler's own process tree, the CPU time it caused in
+dockerd/containerd, and the achieved sampling period (from the `ts` column it wrote).
+
+Usage: python3 benchmark_stats_overhead.py [--duration 60] [--container socialnetwork-media-service ...]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+DAEMONS = ("dockerd", "containerd")
+
+
+def daemon_cpu_seconds() -> float:
+    """Total user+system CPU time of the Docker daemons, from /proc/<pid>/stat."""
+    total = 0
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/comm", encoding="utf-8") as f:
+                if f.read().strip() not in DAEMONS:
+                    continue
+            with open(f"/proc/{pid}/stat", encoding="utf-8") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            total += int(fields[11]) + int(fields[12])  # utime, stime
+        except OSError:
+            continue
+    return total / CLK_TCK
+
+
+def children_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def sampling_periods(csv_path: Path) -> list:
+    timestamps = []
+    with open(csv_path, encoding="utf-8") as f:
+        next(f, None)
+        for line in f:
+            ts = float(line.split(",", 1)[0])
+            if not timestamps or ts != timestamps[-1]:
+                timestamps.append(ts)
+    return [b - a for a, b in zip(timestamps, timestamps[1:])]
+
+
+def measure(name: str, command: list, csv_path: Path):
+    daemon_before = daemon_cpu_seconds()
+    children_before = children_cpu_seconds()
+    start = time.monotonic()
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    elapsed = time.monotonic() - start
+    own = children_cpu_seconds() - children_before
+    daemon = daemon_cpu_seconds() - daemon_before
+
+    periods = sampling_periods(csv_path)
+    mean_period = sum(periods) / len(periods) if periods else float("nan")
+    max_period = max(periods) if periods else float("nan")
+    print(
+        f"{name:20s} wall={elapsed:6.1f}s  own CPU={own:7.3f}s ({own / elapsed * 100:6.2f}%)  "
+        f"daemon CPU={daemon:7.3f}s ({daemon / elapsed * 100:6.2f}%)  "
+        f"period mean={mean_period:.3f}s max={max_period:.3f}s over {len(periods) + 1} samples"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=int, default=60, help="Seconds to run each sampler")
+    parser.add_argument("--container", action="append", default=[],
+                        help="Containers the cgroup collector should sample (substring, repeatable)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shell_csv = Path(tmp) / "shell_loop.csv"
+        # The sampler from RunnerConfig, bounded to the benchmark duration so every child gets reaped
+        shell_loop = (
+            f'echo "ts,Container,CPU%,MemUsage" > "{shell_csv}"; end=$((SECONDS+{args.duration})); '
+            f'while [ $SECONDS -lt $end ]; do docker stats --no-stream --format "{{{{.Name}}}},{{{{.CPUPerc}}}},{{{{.MemUsage}}}}" '
+            f'| awk -v ts="$(date +%s)" -F, \'{{print ts","$0}}\' >> "{shell_csv}"; sleep 1; done'
+        )
+        measure("docker stats loop", ["bash", "-c", shell_loop], shell_csv)
+
+        cgroup_csv = Path(tmp) / "cgroup.csv"
+        collector = [sys.executable, str(SCRIPT_DIR / "docker_stats_collector.py"),
+                     "--output", str(cgroup_csv), "--duration", str(args.duration)]
+        for container in args.container:
+            collector += ["--container", container]
+        measure("cgroup collector", collector, cgroup_csv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Per-core CPU frequency residency and transition sampler.
+Reads the cpufreq statistics of every core (`stats/time_in_state` and `stats/total_trans`, kept by the kernel)
+when it starts and when it is stopped, and writes both snapshots as one JSON document:
+
+    {"snapshots": [{"ts": ..., "cpus": {"0": {"time_in_state": {"800000": 1234, ...}, "total_trans": 56,
+                                             "min_khz": 800000, "max_khz": 3500000}, ...}}, {...}],
+     "trace": null}
+
+`time_in_state` is in the kernel's units of 10 ms. Drivers without cpufreq statistics (e.g. intel_pstate in active
+mode) report null for both; with --interval the sampler then also polls `scaling_cur_freq` of every core, counting
+the time spent at each frequency and the changes between samples into "trace" (and, with --trace-output, writing
+every sample as CSV: ts,<core>...). Between the two snapshots it costs nothing; polling reads the open sysfs files
+with pread().
+
+Stop safely with `kill <pid>` from SSH or any process manager; the end snapshot is written on the way out.
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import resource
+import signal
+import time
+from pathlib import Path
+
+HOME = Path.home()
+OUTPUT_DIR = HOME / "GreenLab" / "testbed" / "experiments"
+OUTPUT_FILE = OUTPUT_DIR / "cpufreq_stats.json"
+
+# Stand-in testbed (standin/standin_testbed.py): a directory of fake cpu<N>/cpufreq directories
+CPU_ROOT = os.environ.get("STANDIN_CPUFREQ") or "/sys/devices/system/cpu"
+
+# Graceful stop flag
+RUNNING = True
+
+
+def handle_sigint(sig, frame):
+    global RUNNING
+    print("\n[CpufreqSampler] Stop signal received. Exiting gracefully...")
+    RUNNING = False
+
+
+def _read_int(path: str):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def list_cpus() -> list:
+    return sorted(int(path.rsplit("cpu", 1)[1]) for path in glob.glob(f"{CPU_ROOT}/cpu[0-9]*")
+                  if os.path.isdir(f"{path}/cpufreq"))
+
+
+def read_snapshot(cpus: list) -> dict:
+    """The cpufreq statistics of `cpus` right now (null where the driver keeps none)."""
+    snapshot = {"ts": time.time(), "cpus": {}}
+    for cpu in cpus:
+        directory = f"{CPU_ROOT}/cpu{cpu}/cpufreq"
+        try:
+            with open(f"{directory}/stats/time_in_state", encoding="utf-8") as f:
+                time_in_state = {frequency: int(ticks) for frequency, ticks in (line.split() for line in f if line.strip())}
+        except (OSError, ValueError):
+            time_in_state = None
+        snapshot["cpus"][str(cpu)] = {
+            "time_in_state": time_in_state,
+            "total_trans": _read_int(f"{directory}/stats/total_trans"),
+            "min_khz": _read_int(f"{directory}/cpuinfo_min_freq"),
+            "max_khz": _read_int(f"{directory}/cpuinfo_max_freq"),
+        }
+    return snapshot
+
+
+class FrequencyTrace:
+    """
+    Polls `scaling_cur_freq` of every core through file descriptors kept open, and accumulates the seconds spent
+    at each frequency and the number of frequency changes seen, per core. Memory use does not grow with the run.
+    """
+    def __init__(self, cpus: list, interval: float, raw_file: Path = None):
+        self.cpus = cpus
+        self.interval = interval
+        self.fds = {cpu: os.open(f"{CPU_ROOT}/cpu{cpu}/cpufreq/scaling_cur_freq", os.O_RDONLY) for cpu in cpus}
+        self.residency = {str(cpu): {} for cpu in cpus}  # core -> {kHz: seconds}
+        self.transitions = {str(cpu): 0 for cpu in cpus}
+        self.last = {}
+        self.last_time = None
+        self.samples = 0
+        self.raw = open(raw_file, "w", encoding="utf-8") if raw_file else None
+        if self.raw:
+            self.raw.write("ts," + ",".join(str(cpu) for cpu in cpus) + "\n")
+
+    def sample(self):
+        now = time.monotonic()
+        frequencies = {}
+        for cpu, fd in self.fds.items():
+            try:
+                frequencies[str(cpu)] = str(int(os.pread(fd, 32, 0)))
+            except (OSError, ValueError):
+                continue
+        # Each core spent the time since the previous sample at the frequency read then
+        if self.last_time is not None:
+            elapsed = now - self.last_time
+            for cpu, frequency in self.last.items():
+                self.residency[cpu][frequency] = self.residency[cpu].get(frequency, 0.0) + elapsed
+        for cpu, frequency in frequencies.items():
+            if cpu in self.last and self.last[cpu] != frequency:
+                self.transitions[cpu] += 1
+        self.last, self.last_time = frequencies, now
+        self.samples += 1
+        if self.raw:
+            self.raw.write(f"{time.time():.3f}," + ",".join(frequencies.get(str(cpu), "") for cpu in self.cpus) + "\n")
+
+    def summary(self) -> dict:
+        return {"interval": self.interval, "samples": self.samples, "residency": self.residency,
+                "transitions": self.transitions}
+
+    def close(self):
+        for fd in self.fds.values():
+            os.close(fd)
+        if self.raw:
+            self.raw.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample per-core cpufreq residency and transitions.")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE, help="JSON file written when stopped")
+    parser.add_argument("--interval", type=float, default=0.0,
+                        help="Also poll scaling_cur_freq every this many seconds (0: statistics snapshots only)")
+    parser.add_argument("--trace-output", type=Path, default=None, help="CSV file for every polled sample")
+    args = parser.parse_args()
+
+    signal.signal(signal.SIGINT, handle_sigint)
+    signal.signal(signal.SIGTERM, handle_sigint)
+
+    cpus = list_cpus()
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    start = read_snapshot(cpus)
+    trace = FrequencyTrace(cpus, args.interval, args.trace_output) if args.interval > 0 and cpus else None
+    print(f"[CpufreqSampler] {len(cpus)} cores, "
+          f"{'polling every ' + str(args.interval) + 's' if trace else 'statistics snapshots only'}. "
+          f"Writing to {args.output}")
+
+    deadline = time.monotonic()
+    while RUNNING:
+        if trace is None:
+            signal.pause()
+            continue
+        trace.sample()
+        # Absolute deadlines; ticks that cannot be served are skipped
+        deadline += args.interval
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        elif -delay >= args.interval:
+            deadline += math.floor(-delay / args.interval) * args.interval
+    if trace is not None:
+        trace.sample()  # Close the last interval
+        trace.close()
+
+    document = {"snapshots": [start, read_snapshot(cpus)], "trace": trace.summary() if trace else None}
+    partial = args.output.with_suffix(".partial")
+    partial.write_text(json.dumps(document))
+    os.replace(partial, args.output)
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    print(f"[CpufreqSampler] Stopped after {document['snapshots'][1]['ts'] - start['ts']:.1f}s, "
+          f"{trace.samples if trace else 0} polls. Own CPU time: {usage.ru_utime + usage.ru_stime:.3f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Low-overhead container CPU/memory collector for DeathStarBench Social Network.
+Reads the cgroup v2 `cpu.stat` and `memory.current` files of the target containers directly,
+on a fixed, drift-corrected schedule, and writes the same CSV `docker stats --no-stream` produced:
+
+    ts,Container,CPU%,MemUsage
+
+The Docker daemon is only asked once, at start-up, to resolve container names to cgroups,
+so sampling does not add load to the machine under measurement.
+
+Stop safely with `kill <pid>` from SSH or any process manager.
+"""
+
+import argparse
+import math
+import os
+import resource
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+HOME = Path.home()
+OUTPUT_DIR = HOME / "GreenLab" / "testbed" / "experiments"
+OUTPUT_FILE = OUTPUT_DIR / "docker_stats.csv"
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+# Stand-in testbed (standin/standin_testbed.py): a directory of fake cgroup v2 directories, one per container
+STANDIN_CGROUPS = os.environ.get("STANDIN_CGROUPS")
+INTERVAL = 1.0  # seconds
+HEADER = "ts,Container,CPU%,MemUsage\n"
+
+# Graceful stop flag
+RUNNING = True
+
+
+def handle_sigint(sig, frame):
+    global RUNNING
+    print("\n[DockerStatsCollector] Stop signal received. Exiting gracefully...")
+    RUNNING = False
+
+
+def _read_host_memory_bytes() -> int:
+    with open("/proc/meminfo", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("MemTotal:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+class ContainerCgroup:
+    """
+    Keeps the cgroup v2 files of one container open and re-reads them with pread(),
+    so each sample costs a few syscalls and no process spawns.
+    """
+    def __init__(self, name: str, cgroup_dir: Path, host_memory: int):
+        self.name = name
+        self.cgroup_dir = cgroup_dir
+        self._cpu_stat = os.open(cgroup_dir / "cpu.stat", os.O_RDONLY)
+        self._memory_current = os.open(cgroup_dir / "memory.current", os.O_RDONLY)
+        self._memory_stat = os.open(cgroup_dir / "memory.stat", os.O_RDONLY)
+        with open(cgroup_dir / "memory.max", encoding="utf-8") as f:
+            limit = f.read().strip()
+        self.memory_limit = host_memory if limit == "max" else int(limit)
+        self.last_usage_usec = None
+        self.last_sample_time = None
+
+    @staticmethod
+    def _stat_value(fd: int, key: bytes) -> int:
+        for line in os.pread(fd, 8192, 0).splitlines():
+            if line.startswith(key + b" "):
+                return int(line.split()[1])
+        return 0
+
+    def cpu_usage_usec(self) -> int:
+        return self._stat_value(self._cpu_stat, b"usage_usec")
+
+    def memory_usage_bytes(self) -> int:
+        # Same definition as the docker CLI on cgroup v2: usage without reclaimable page cache
+        current = int(os.pread(self._memory_current, 64, 0))
+        return current - self._stat_value(self._memory_stat, b"inactive_file")
+
+    def sample(self, now: float):
+        """Return (cpu_percent, memory_bytes) since the previous sample; cpu_percent is None on the first call."""
+        usage = self.cpu_usage_usec()
+        memory = self.memory_usage_bytes()
+        cpu_percent = None
+        if self.last_usage_usec is not None and now > self.last_sample_time:
+            # 100% == one fully busy core, as reported by `docker stats`
+            cpu_percent = (usage - self.last_usage_usec) / ((now - self.last_sample_time) * 1e6) * 100
+        self.last_usage_usec = usage
+        self.last_sample_time = now
+        return cpu_percent, memory
+
+    def close(self):
+        for fd in (self._cpu_stat, self._memory_current, self._memory_stat):
+            os.close(fd)
+
+
+def _cgroup_dir_of_pid(pid: int) -> Path:
+    # cgroup v2 has a single hierarchy line: "0::/system.slice/docker-<id>.scope"
+    with open(f"/proc/{pid}/cgroup", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("0::"):
+                return CGROUP_ROOT / line[3:].strip().lstrip("/")
+    raise FileNotFoundError(f"No cgroup v2 entry for PID {pid}")
+
+
+def discover_containers(patterns: list) -> list:
+    """
+    Resolve running containers whose name contains any of `patterns` (all if empty) to their cgroup directories.
+    Returns a list of ContainerCgroup objects.
+    """
+    if STANDIN_CGROUPS:
+        host_memory = _read_host_memory_bytes()
+        return [
+            ContainerCgroup(cgroup_dir.name, cgroup_dir, host_memory)
+            for cgroup_dir in sorted(Path(STANDIN_CGROUPS).iterdir())
+            if not patterns or any(pattern in cgroup_dir.name for pattern in patterns)
+        ]
+    listing = subprocess.run(
+        ["docker", "ps", "--format", "{{.ID}} {{.Names}}"], capture_output=True, text=True, check=True
+    ).stdout.split("\n")
+    ids = {}
+    for entry in listing:
+        if not entry.strip():
+            continue
+        container_id, name = entry.split(maxsplit=1)
+        if not patterns or any(pattern in name for pattern in patterns):
+            ids[container_id] = name
+    if not ids:
+        return []
+
+    pids = subprocess.run(
+        ["docker", "inspect", "--format", "{{.State.Pid}}", *ids], capture_output=True, text=True, check=True
+    ).stdout.split()
+
+    host_memory = _read_host_memory_bytes()
+    containers = []
+    for name, pid in zip(ids.values(), pids):
+        try:
+            containers.append(ContainerCgroup(name, _cgroup_dir_of_pid(int(pid)), host_memory))
+        except (OSError, ValueError) as e:
+            print(f"[DockerStatsCollector] Skipping {name}: {type(e).__name__}: {e}")
+    return containers
+
+
+def format_row(ts: float, container: ContainerCgroup, cpu_percent: float, memory: int) -> str:
+    return (
+        f"{ts:.3f},{container.name},{cpu_percent:.2f}%,"
+        f"{memory / 1024**2:.2f}MiB / {container.memory_limit / 1024**3:.2f}GiB\n"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample container CPU and memory usage from cgroup v2.")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE, help="CSV file to write (truncated at start)")
+    parser.add_argument("--interval", type=float, default=INTERVAL, help="Sampling period in seconds")
+    parser.add_argument("--container", action="append", default=[],
+                        help="Only sample containers whose name contains this string (repeatable)")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    args = parser.parse_args()
+
+    signal.signal(signal.SIGINT, handle_sigint)
+    signal.signal(signal.SIGTERM, handle_sigint)
+
+    containers = discover_containers(args.container)
+    if not containers:
+        print("[DockerStatsCollector] No matching containers found.")
+        sys.exit(1)
+    print(f"[DockerStatsCollector] Sampling {len(containers)} containers every {args.interval}s. Writing to {args.output}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    start = time.monotonic()
+    deadline = start
+    samples = 0
+    skipped_ticks = 0
+    max_lateness = 0.0
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        # Prime the CPU counters so the first written row already covers a full interval
+        for container in containers:
+            container.sample(time.monotonic())
+
+        while RUNNING:
+            # Absolute deadlines: sampling cost and sleep overshoot never accumulate into drift
+            deadline += args.interval
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            elif -delay >= args.interval:
+                # Fell behind by whole periods (e.g. machine stalled): skip them instead of bursting
+                missed = math.floor(-delay / args.interval)
+                deadline += missed * args.interval
+                skipped_ticks += missed
+            if not RUNNING:
+                break
+
+            now = time.monotonic()
+            ts = time.time()
+            max_lateness = max(max_lateness, now - deadline)
+            rows = []
+            for container in containers:
+                try:
+                    cpu_percent, memory = container.sample(now)
+                except (OSError, ValueError):
+                    continue  # Container stopped; its cgroup is gone
+                rows.append(format_row(ts, container, cpu_percent, memory))
+            f.write("".join(rows))
+            f.flush()
+            samples += 1
+
+            if args.duration is not None and now - start >= args.duration:
+                break
+
+    for container in containers:
+        container.close()
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_seconds = usage.ru_utime + usage.ru_stime
+    elapsed = time.monotonic() - start
+    print(
+        f"[DockerStatsCollector] Stopped after {samples} samples in {elapsed:.1f}s. "
+        f"Own CPU time: {cpu_seconds:.3f}s ({cpu_seconds / max(elapsed, 1e-9) * 100:.3f}% of one core, "
+        f"{cpu_seconds / max(samples, 1) * 1000:.2f} ms/sample). "
+        f"Max lateness: {max_lateness * 1000:.1f} ms, skipped ticks: {skipped_ticks}."
+    )
+
+
+if __name__ == "__main__":
+    main()
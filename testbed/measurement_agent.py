@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Resident measurement agent for the testbed: runs every collector of a run inside this one process
+and keeps the samples in memory, so the summary is ready the moment a run stops.
+
+Replaces the per-run EnergiBridge, docker_stats_collector.py and scaphandre_collector.py processes:
+  system      RAPL package/DRAM energy, per-core usage and frequency, memory and swap (EnergiBridge's columns)
+  containers  CPU and memory of the target containers from their cgroup v2 files (as docker_stats_collector.py)
+  scaphandre  per-service power scraped from the Scaphandre exporter, integrated to energy (as scaphandre_collector.py)
+  cpufreq     per-core frequency residency and transitions at start and stop (as cpufreq_sampler.py)
+
+The agent listens on 127.0.0.1 only; the orchestrator reaches it through an SSH direct-tcpip channel.
+Protocol: one JSON object per line in each direction.
+  {"cmd": "start", "interval": 1.0, "docker_interval": 1.0, "scaphandre_interval": 2.0,
+   "cpufreq_interval": 0.0, "containers": ["socialnetwork-media-service", ...],
+   "raw_dir": "~/GreenLab/testbed/experiments"}
+  {"cmd": "mark", "label": "load_start"}
+  {"cmd": "stop", "window": [start, end]}   -> {"ok": true, "summary": {...}}
+Without "window" (epoch seconds on the testbed clock) the summary covers every sample of the run
+(the cpufreq summary always covers the whole run).
+  {"cmd": "ping"}      -> {"ok": true, "running": false}
+  {"cmd": "shutdown"}
+With "raw_dir" the raw traces are also written there, in the formats of the standalone collectors,
+for fetching in the background or on request.
+
+RAPL energy_uj is readable by root only (Linux 5.10 and later), so the agent runs with sudo; "start" fails when no
+RAPL domain can be read rather than measuring runs without energy.
+
+Usage: sudo -E nohup python3 measurement_agent.py [--port 7777] &
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import signal
+import socketserver
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from cpufreq_sampler import FrequencyTrace, list_cpus, read_snapshot
+from docker_stats_collector import HEADER as DOCKER_STATS_HEADER, discover_containers, format_row
+from scaphandre_collector import SCAPHANDRE_URL, TARGET_SERVICES, ScaphandreScraper
+
+PORT = 7777
+# Stand-in testbed (standin/standin_testbed.py): a directory of fake intel-rapl zones
+POWERCAP_ROOT = Path(os.environ.get("STANDIN_POWERCAP") or "/sys/class/powercap")
+# RAPL zone name -> EnergiBridge energy column
+RAPL_DOMAIN_COLUMNS = {"package-0": "PACKAGE_ENERGY (J)", "dram": "DRAM_ENERGY (J)"}
+MEMORY_COLUMNS = {
+    "TOTAL_MEMORY": ("MemTotal",), "USED_MEMORY": ("MemTotal", "MemAvailable"),
+    "TOTAL_SWAP": ("SwapTotal",), "USED_SWAP": ("SwapTotal", "SwapFree"),
+}
+ENERGIBRIDGE_FILE = "energibridge.csv"
+DOCKER_STATS_FILE = "docker_stats.csv"
+SCAPHANDRE_FILE = "scaphandre_energy.jsonl"
+CPUFREQ_FILE = "cpufreq_stats.json"
+CPUFREQ_TRACE_FILE = "cpufreq_trace.csv"
+
+
+def percentile(values: list, q: float) -> float:
+    """Linearly interpolated percentile (numpy's default), q in [0, 100]."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def json_safe(value):
+    """NaN and infinity are not JSON: send them as null."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    return value
+
+
+def in_window(ts: float, window) -> bool:
+    return window is None or window[0] <= ts <= window[1]
+
+
+class Samples:
+    """Timestamped samples of one metric (a few hundred per run), summarised over any window."""
+    def __init__(self):
+        self.times = []
+        self.values = []
+
+    def add(self, ts: float, value: float):
+        if value is None or math.isnan(value):
+            return
+        self.times.append(ts)
+        self.values.append(value)
+
+    def summary(self, window=None) -> dict:
+        values = [value for ts, value in zip(self.times, self.values) if in_window(ts, window)]
+        return {
+            "mean": sum(values) / len(values) if values else math.nan,
+            "p95": percentile(values, 95),
+            "max": max(values) if values else math.nan,
+            "samples": len(values),
+        }
+
+
+class Collector(threading.Thread):
+    """Samples on absolute monotonic deadlines until stopped; ticks that cannot be served are skipped."""
+    def __init__(self, interval: float, stop: threading.Event):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stop = stop
+        self.error = None
+
+    def run(self):
+        try:
+            self.prime()
+            deadline = time.monotonic()
+            while not self.stop.is_set():
+                deadline += self.interval
+                delay = deadline - time.monotonic()
+                if delay > 0 and self.stop.wait(delay):
+                    break
+                elif -delay >= self.interval:
+                    deadline += math.floor(-delay / self.interval) * self.interval
+                self.sample()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            print(f"[MeasurementAgent] {type(self).__name__} failed: {self.error}", flush=True)
+        finally:
+            self.close()
+
+    def prime(self):
+        pass
+
+    def sample(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SystemCollector(Collector):
+    """EnergiBridge's columns from /proc and sysfs: per-core usage (%) and frequency (MHz), memory (bytes), RAPL energy (J)."""
+    def __init__(self, interval: float, stop: threading.Event, raw_file: Path = None):
+        super().__init__(interval, stop)
+        self.cpus = sorted(int(path.rsplit("cpu", 1)[1]) for path in glob.glob("/sys/devices/system/cpu/cpu[0-9]*"))
+        self.frequency_files = {cpu: f"/sys/devices/system/cpu/cpu{cpu}/cpufreq/scaling_cur_freq" for cpu in self.cpus}
+        self.energy = {}  # column -> [energy_uj path, wrap (uJ), last reading, accumulated uJ]
+        self.unreadable = []
+        for zone in sorted(POWERCAP_ROOT.glob("intel-rapl:*")):
+            try:
+                column = RAPL_DOMAIN_COLUMNS.get((zone / "name").read_text().strip())
+                if column is not None and column not in self.energy:
+                    wrap = int((zone / "max_energy_range_uj").read_text())
+                    self.energy[column] = [zone / "energy_uj", wrap, int((zone / "energy_uj").read_text()), 0]
+            except PermissionError:
+                self.unreadable.append(zone.name)
+            except (OSError, ValueError):
+                continue
+        self.stats = {}
+        self.energy_samples = []  # (ts, {column: cumulative J})
+        self.last_times = None
+        self.raw = open(raw_file, "w", encoding="utf-8") if raw_file else None
+        self.columns = (list(MEMORY_COLUMNS) + [f"CPU_USAGE_{cpu}" for cpu in self.cpus]
+                        + [f"CPU_FREQUENCY_{cpu}" for cpu in self.cpus] + list(self.energy))
+        if self.raw:
+            self.raw.write("Time," + ",".join(self.columns) + "\n")
+
+    @staticmethod
+    def _cpu_times() -> dict:
+        times = {}
+        with open("/proc/stat", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("cpu") and line[3].isdigit():
+                    name, *values = line.split()
+                    values = [int(v) for v in values[:8]]  # guest time is already part of user time
+                    idle = values[3] + (values[4] if len(values) > 4 else 0)
+                    times[int(name[3:])] = (sum(values) - idle, sum(values))
+        return times
+
+    @staticmethod
+    def _meminfo() -> dict:
+        info = {}
+        with open("/proc/meminfo", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                info[key] = int(value.split()[0]) * 1024
+        return info
+
+    def prime(self):
+        self.last_times = self._cpu_times()
+
+    def sample(self):
+        ts = time.time()
+        row = {}
+        info = self._meminfo()
+        for column, keys in MEMORY_COLUMNS.items():
+            row[column] = info.get(keys[0], 0) - (info.get(keys[1], 0) if len(keys) > 1 else 0)
+        times = self._cpu_times()
+        for cpu in self.cpus:
+            busy, total = times.get(cpu, (0, 0))
+            last_busy, last_total = self.last_times.get(cpu, (0, 0))
+            row[f"CPU_USAGE_{cpu}"] = (busy - last_busy) / (total - last_total) * 100 if total > last_total else math.nan
+            try:
+                with open(self.frequency_files[cpu]) as f:
+                    row[f"CPU_FREQUENCY_{cpu}"] = int(f.read()) / 1000
+            except (OSError, ValueError):
+                row[f"CPU_FREQUENCY_{cpu}"] = math.nan
+        self.last_times = times
+        for column, counter in self.energy.items():
+            path, wrap, last, total = counter
+            value = int(path.read_text())
+            counter[3] = total + (value - last if value >= last else value + wrap - last)
+            counter[2] = value
+            row[column] = counter[3] / 1e6
+
+        for column, value in row.items():
+            if column not in self.energy:
+                self.stats.setdefault(column, Samples()).add(ts, value)
+        self.energy_samples.append((ts, {column: row[column] for column in self.energy}))
+        if self.raw:
+            self.raw.write(f"{ts * 1000:.0f}," + ",".join(f"{row.get(c, math.nan)}" for c in self.columns) + "\n")
+
+    def close(self):
+        if self.raw:
+            self.raw.close()
+
+    def summary(self, window=None) -> dict:
+        if window is None:
+            # From the counter readings at start to the last sample
+            energy = {column: counter[3] / 1e6 for column, counter in self.energy.items()}
+        else:
+            inside = [readings for ts, readings in self.energy_samples if in_window(ts, window)]
+            energy = {column: inside[-1][column] - inside[0][column] if inside else math.nan for column in self.energy}
+        return {
+            "samples": sum(in_window(ts, window) for ts, _ in self.energy_samples),
+            "means": {column: stats.summary(window)["mean"] for column, stats in self.stats.items()},
+            "energy": energy,
+            "error": self.error,
+        }
+
+
+class ContainerCollector(Collector):
+    """CPU (%) and memory (bytes) per service, from the cgroup files of the matching containers."""
+    def __init__(self, interval: float, stop: threading.Event, patterns: list, raw_file: Path = None):
+        super().__init__(interval, stop)
+        try:
+            self.containers = discover_containers(patterns)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"[MeasurementAgent] No containers sampled: {type(e).__name__}: {e}", flush=True)
+            self.containers = []
+        self.stats = {}
+        self.raw = open(raw_file, "w", encoding="utf-8") if raw_file else None
+        if self.raw:
+            self.raw.write(DOCKER_STATS_HEADER)
+
+    @staticmethod
+    def service_of(container_name: str) -> str:
+        # Replicas of a service ("...-1", "...-2") are aggregated together
+        base, _, suffix = container_name.rpartition("-")
+        return base if suffix.isdigit() else container_name
+
+    def prime(self):
+        for container in self.containers:
+            container.sample(time.monotonic())
+
+    def sample(self):
+        now = time.monotonic()
+        ts = time.time()
+        rows = []
+        for container in self.containers:
+            try:
+                cpu_percent, memory = container.sample(now)
+            except (OSError, ValueError):
+                continue  # Container stopped; its cgroup is gone
+            # Same precision as the CSV the standalone collector writes
+            cpu, mem = self.stats.setdefault(self.service_of(container.name), (Samples(), Samples()))
+            cpu.add(ts, round(cpu_percent, 2))
+            mem.add(ts, round(memory / 1024 ** 2, 2) * 1024 ** 2)
+            if self.raw:
+                rows.append(format_row(ts, container, cpu_percent, memory))
+        if self.raw:
+            self.raw.write("".join(rows))
+
+    def close(self):
+        for container in self.containers:
+            container.close()
+        if self.raw:
+            self.raw.close()
+
+    def summary(self, window=None) -> dict:
+        return {
+            "services": {
+                service: {"cpu": cpu.summary(window), "mem": mem.summary(window)}
+                for service, (cpu, mem) in self.stats.items()
+            },
+            "error": self.error,
+        }
+
+
+class ScaphandreCollector(Collector):
+    """Per-service power (W) from the Scaphandre exporter, integrated to energy (J) with the trapezoid rule."""
+    def __init__(self, interval: float, stop: threading.Event, url: str, raw_file: Path = None):
+        super().__init__(interval, stop)
+        self.scraper = ScaphandreScraper(url)
+        self.power_samples = []  # (ts, {service: W})
+        self.raw = open(raw_file, "w", encoding="utf-8") if raw_file else None
+
+    def sample(self):
+        data, latency = self.scraper.scrape()
+        if data is None:
+            return
+        now = time.time()
+        self.power_samples.append((now, {service: data.get(f"{service}_power_uW", 0.0) / 1e6 for service in TARGET_SERVICES}))
+        if self.raw:
+            data["timestamp"] = datetime.fromtimestamp(now, timezone.utc).isoformat()
+            data["scrape_latency_ms"] = round(latency * 1000, 3)
+            self.raw.write(json.dumps(data) + "\n")
+
+    def close(self):
+        self.scraper.close()
+        if self.raw:
+            self.raw.close()
+
+    def summary(self, window=None) -> dict:
+        inside = [sample for sample in self.power_samples if in_window(sample[0], window)]
+        energy = {service: 0.0 for service in TARGET_SERVICES}
+        # Trapezoid rule over the samples in the window
+        for (last_time, last_power), (now, power) in zip(inside, inside[1:]):
+            for service in TARGET_SERVICES:
+                energy[service] += (last_power[service] + power[service]) / 2 * (now - last_time)
+        return {"samples": len(inside), "energy_joules": energy, "error": self.error}
+
+
+class CpufreqCollector(Collector):
+    """
+    Per-core frequency residency and transitions: the kernel's cpufreq statistics at start and at stop, plus a
+    `scaling_cur_freq` trace polled every `interval` seconds if that is above 0. Its summary is the document
+    cpufreq_sampler.py writes.
+    """
+    def __init__(self, interval: float, stop: threading.Event, raw_dir: Path = None):
+        # Without a trace the thread only waits for the stop, waking once a second
+        super().__init__(interval if interval > 0 else 1.0, stop)
+        self.cpus = list_cpus()
+        self.trace_interval = interval
+        self.raw_dir = raw_dir
+        self.trace = None
+        self.snapshots = []
+
+    def prime(self):
+        self.snapshots = [read_snapshot(self.cpus)]
+        if self.trace_interval > 0 and self.cpus:
+            self.trace = FrequencyTrace(self.cpus, self.trace_interval, self.raw_dir and self.raw_dir / CPUFREQ_TRACE_FILE)
+            self.trace.sample()
+
+    def sample(self):
+        if self.trace is not None:
+            self.trace.sample()
+
+    def close(self):
+        if self.trace is not None:
+            self.trace.sample()  # Close the last interval
+            self.trace.close()
+        self.snapshots.append(read_snapshot(self.cpus))
+        if self.raw_dir:
+            (self.raw_dir / CPUFREQ_FILE).write_text(json.dumps(self.summary()))
+
+    def summary(self, window=None) -> dict:
+        return {"snapshots": self.snapshots, "trace": self.trace.summary() if self.trace else None, "error": self.error}
+
+
+class MeasurementAgent:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stop_event = None
+        self.collectors = {}
+        self.marks = []
+        self.window = None
+
+    def handle(self, request: dict) -> dict:
+        command = request.get("cmd")
+        with self.lock:
+            if command == "ping":
+                return {"ok": True, "running": self.stop_event is not None}
+            if command == "start":
+                return self.start(request)
+            if command == "mark":
+                self.marks.append([request.get("label"), time.time()])
+                return {"ok": True}
+            if command == "stop":
+                return self.stop(request.get("window"))
+            if command == "shutdown":
+                if self.stop_event is not None:
+                    self.stop()
+                return {"ok": True}
+        return {"ok": False, "error": f"Unknown command {command!r}"}
+
+    def start(self, request: dict) -> dict:
+        if self.stop_event is not None:
+            self.stop()  # A previous run was never stopped (e.g. the orchestrator crashed)
+        raw_dir = Path(os.path.expanduser(request["raw_dir"])) if request.get("raw_dir") else None
+        if raw_dir:
+            raw_dir.mkdir(parents=True, exist_ok=True)
+        stop_event = threading.Event()
+        system = SystemCollector(request.get("interval", 1.0), stop_event, raw_dir and raw_dir / ENERGIBRIDGE_FILE)
+        if not system.energy:
+            if system.raw:
+                system.raw.close()
+            reason = (f"permission denied on {', '.join(system.unreadable)} (run the agent as root)"
+                      if system.unreadable else "no intel-rapl zones")
+            return {"ok": False, "error": f"No RAPL energy domain readable under {POWERCAP_ROOT}: {reason}"}
+        self.stop_event = stop_event
+        self.collectors = {
+            "system": system,
+            "containers": ContainerCollector(
+                request.get("docker_interval", 1.0), self.stop_event, request.get("containers", []),
+                raw_dir and raw_dir / DOCKER_STATS_FILE),
+            "scaphandre": ScaphandreCollector(
+                request.get("scaphandre_interval", 2.0), self.stop_event, request.get("scaphandre_url", SCAPHANDRE_URL),
+                raw_dir and raw_dir / SCAPHANDRE_FILE),
+            "cpufreq": CpufreqCollector(request.get("cpufreq_interval", 0.0), self.stop_event, raw_dir),
+        }
+        self.marks = []
+        self.window = [time.time(), None]
+        for collector in self.collectors.values():
+            collector.start()
+        print(f"[MeasurementAgent] Run started ({len(self.collectors['containers'].containers)} containers)", flush=True)
+        return {"ok": True, "start": self.window[0]}
+
+    def stop(self, window=None) -> dict:
+        if self.stop_event is None:
+            return {"ok": False, "error": "No run in progress"}
+        self.stop_event.set()
+        for collector in self.collectors.values():
+            collector.join()
+        self.window[1] = time.time()
+        summary = {name: collector.summary(window) for name, collector in self.collectors.items()}
+        summary["marks"] = self.marks
+        summary["window"] = self.window
+        self.stop_event = None
+        print(f"[MeasurementAgent] Run stopped after {self.window[1] - self.window[0]:.1f}s", flush=True)
+        return {"ok": True, "summary": summary}
+
+
+class AgentHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request, response = None, {"ok": False, "error": "Malformed request"}
+            else:
+                if isinstance(request, dict):
+                    response = self.server.agent.handle(request)
+                else:
+                    response = {"ok": False, "error": "Request must be a JSON object"}
+            self.wfile.write(json.dumps(json_safe(response)).encode() + b"\n")
+            self.wfile.flush()
+            if isinstance(request, dict) and request.get("cmd") == "shutdown":
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class AgentServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident measurement agent (JSON lines over TCP on 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=PORT, help="Port to listen on")
+    args = parser.parse_args()
+
+    server = AgentServer(("127.0.0.1", args.port), AgentHandler)
+    server.agent = MeasurementAgent()
+    # `kill <pid>` stops the agent like a shutdown command
+    signal.signal(signal.SIGTERM, lambda sig, frame: threading.Thread(target=server.shutdown, daemon=True).start())
+    print(f"[MeasurementAgent] Listening on 127.0.0.1:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        with server.agent.lock:
+            if server.agent.stop_event is not None:
+                server.agent.stop()
+        server.server_close()
+    print("[MeasurementAgent] Stopped", flush=True)
+
+
+if __name__ == "__main__":
+    main()
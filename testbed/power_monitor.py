@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Streams CPU package power and package temperature of the testbed to stdout, one line per INTERVAL:
+
+    ts,package_power_W,package_temp_C
+
+Power comes from the RAPL package energy counters (all sockets summed, counter wraps handled),
+temperature from the x86_pkg_temp thermal zone (falling back to the hottest thermal zone).
+A temperature that cannot be read is printed as `nan`. The energy counters are readable by root only
+(since Linux 5.10); without a readable package domain the monitor exits with status 1. Used by the
+orchestrator to detect when the machine has reached a steady state during warmup and cooldown.
+
+Usage: sudo python3 power_monitor.py [--duration SECONDS]
+
+Stops after --duration seconds, on `kill <pid>`, or when the reader goes away (closed pipe).
+"""
+
+import argparse
+import math
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+POWERCAP_ROOT = Path(os.environ.get("STANDIN_POWERCAP") or "/sys/class/powercap")
+THERMAL_ROOT = Path("/sys/class/thermal")
+INTERVAL = 1.0  # seconds
+
+# Graceful stop flag
+RUNNING = True
+
+
+def handle_sigint(sig, frame):
+    global RUNNING
+    RUNNING = False
+
+
+class PackageEnergy:
+    """Cumulative RAPL package energy in joules, summed over sockets."""
+    def __init__(self):
+        self.domains = []
+        self.unreadable = []
+        for domain in sorted(POWERCAP_ROOT.glob("intel-rapl:[0-9]*")):
+            try:
+                if (domain / "name").read_text().startswith("package"):
+                    max_range = int((domain / "max_energy_range_uj").read_text())
+                    self.domains.append([domain / "energy_uj", max_range, int((domain / "energy_uj").read_text())])
+            except PermissionError:
+                self.unreadable.append(domain.name)
+            except (OSError, ValueError):
+                continue
+        self.total_uj = 0
+
+    def read(self) -> float:
+        if not self.domains:
+            return math.nan
+        for domain in self.domains:
+            path, max_range, last = domain
+            value = int(path.read_text())
+            # The counter wraps at max_energy_range_uj
+            self.total_uj += value - last if value >= last else value + max_range - last
+            domain[2] = value
+        return self.total_uj / 1e6
+
+
+def find_temperature_files() -> list:
+    """Package temperature sensor if present, all thermal zones otherwise."""
+    zones = []
+    for zone in sorted(THERMAL_ROOT.glob("thermal_zone*")):
+        try:
+            zone_type = (zone / "type").read_text().strip()
+        except OSError:
+            continue
+        if zone_type == "x86_pkg_temp":
+            return [zone / "temp"]
+        zones.append(zone / "temp")
+    return zones
+
+
+def read_temperature(files: list) -> float:
+    readings = []
+    for path in files:
+        try:
+            readings.append(int(path.read_text()) / 1000)
+        except (OSError, ValueError):
+            continue
+    return max(readings) if readings else math.nan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream package power and temperature as CSV lines.")
+    parser.add_argument("--interval", type=float, default=INTERVAL, help="Sampling period in seconds")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    args = parser.parse_args()
+
+    signal.signal(signal.SIGINT, handle_sigint)
+    signal.signal(signal.SIGTERM, handle_sigint)
+
+    energy = PackageEnergy()
+    if not energy.domains:
+        reason = (f"permission denied on {', '.join(energy.unreadable)} (run as root)"
+                  if energy.unreadable else "no intel-rapl package zones")
+        print(f"[PowerMonitor] No RAPL package domain readable under {POWERCAP_ROOT}: {reason}",
+              file=sys.stderr, flush=True)
+        sys.exit(1)
+    temperature_files = find_temperature_files()
+    start = time.monotonic()
+    deadline = start
+    last_energy, last_time = energy.read(), start
+
+    try:
+        print("ts,package_power_W,package_temp_C", flush=True)
+        while RUNNING:
+            # Absolute deadlines, as in the other collectors
+            deadline += args.interval
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            now = time.monotonic()
+            current_energy = energy.read()
+            power = (current_energy - last_energy) / (now - last_time)
+            last_energy, last_time = current_energy, now
+            print(f"{time.time():.3f},{power:.3f},{read_temperature(temperature_files):.1f}", flush=True)
+            if args.duration is not None and now - start >= args.duration:
+                break
+    except BrokenPipeError:
+        # The orchestrator closed the stream: silence the final flush at interpreter exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+if __name__ == "__main__":
+    main()
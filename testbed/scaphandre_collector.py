@@ -1,31 +1,40 @@
 #!/usr/bin/env python3
 """
 Continuous Scaphandre power collector for DeathStarBench Social Network.
-Fetches localhost:18080/metrics every 2 seconds, extracts power consumption
-(microwatts) for media_service, home_timeline_service, and compose_post_service,
-and appends readings with timestamps to a JSONL log file.
+Fetches localhost:18080/metrics every INTERVAL seconds (2 by default) over a persistent HTTP connection,
+extracts power consumption (microwatts) for media_service, home_timeline_service, and compose_post_service,
+and appends readings with timestamps and scrape latency to a JSONL log file.
+
+Scrapes follow absolute monotonic deadlines, so the period does not stretch by the fetch and parse time,
+and sub-second intervals are safe: ticks that cannot be served are skipped, never bunched up.
 
 Stop safely with `kill <pid>` from SSH or any process manager.
 """
 
+import argparse
 import requests
 import re
 import json
+import math
 import time
 import signal
-import sys
 from datetime import datetime, timezone
-import os
 from pathlib import Path
 
 HOME = Path.home()
 OUTPUT_DIR = HOME / "GreenLab" / "testbed" / "experiments"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_FILE = OUTPUT_DIR / "scaphandre_energy.jsonl"
 
 SCAPHANDRE_URL = "http://localhost:18080/metrics"
 TARGET_SERVICES = ["media_service", "home_timeline_service", "compose_post_service"]
 INTERVAL = 2.0  # seconds
+FETCH_TIMEOUT = 5.0  # seconds
+BATCH_SIZE = 16  # records buffered before a write
+FLUSH_INTERVAL = 5.0  # seconds; upper bound on how long a record stays buffered
+
+METRIC_PREFIX = b"scaph_process_power_consumption_microwatts{"
+PID_PATTERN = re.compile(rb'\bpid="(\d+)"')
+CMDLINE_PATTERN = re.compile(rb'\bcmdline="([^"]*)"')
 
 # Graceful stop flag
 RUNNING = True
@@ -37,73 +46,155 @@ def handle_sigint(sig, frame):
     RUNNING = False
 
 
-signal.signal(signal.SIGINT, handle_sigint)
-signal.signal(signal.SIGTERM, handle_sigint)
-
-
 def _to_camel_case(snake_name: str) -> str:
     """Convert 'media_service' -> 'MediaService'"""
     return "".join(part.capitalize() for part in snake_name.split("_"))
 
-def extract_power_metrics(metrics_text: str) -> dict:
-    """
-    Extract power (microwatts) for target services.
-    Sums across multiple PIDs for same service name.
-    """
-    power_pattern = re.compile(
-        r'scaph_process_power_consumption_microwatts{[^}]*cmdline="(?P<cmd>[^"]+)"[^}]*pid="(?P<pid>\d+)"[^}]*}\s+(?P<value>[\d\.eE\+\-]+)'
-    )
 
-    power_data = {}
-    for match in power_pattern.finditer(metrics_text):
-        cmd = match.group("cmd")
-        val = float(match.group("value"))
+# Output key and the cmdline markers (snake_case or CamelCase form) of each service, computed once
+SERVICE_MARKERS = [
+    (f"{service}_power_uW", (service.encode(), _to_camel_case(service).encode()))
+    for service in TARGET_SERVICES
+]
 
-        # Match either snake_case or CamelCase form
-        for service in TARGET_SERVICES:
-            service_camel = _to_camel_case(service)
-            if service in cmd or service_camel in cmd:
-                key = f"{service}_power_uW"
-                power_data[key] = power_data.get(key, 0.0) + val
 
-    # Ensure all services appear, even if missing
-    for service in TARGET_SERVICES:
-        power_data.setdefault(f"{service}_power_uW", 0.0)
-
-    return power_data
+class PowerMetricsParser:
+    """
+    Incremental parser for the Prometheus exposition format served by Scaphandre.
+    Only `scaph_process_power_consumption_microwatts` samples are inspected, line by line as they are received,
+    and the service a process belongs to is resolved once per PID (re-checked if the PID gets a new cmdline).
+    """
+    def __init__(self):
+        self._service_by_pid = {}  # pid -> (label set it was resolved from, output key or None)
+
+    def _service_of(self, labels: bytes):
+        pid_match = PID_PATTERN.search(labels)
+        if pid_match is None:
+            return None
+        pid = pid_match.group(1)
+        cached = self._service_by_pid.get(pid)
+        if cached is not None and cached[0] == labels:
+            return cached[1]
+
+        # New PID, or the PID was reused by another process: match its cmdline against the services
+        cmdline_match = CMDLINE_PATTERN.search(labels)
+        cmdline = cmdline_match.group(1) if cmdline_match else b""
+        key = None
+        for service_key, markers in SERVICE_MARKERS:
+            if any(marker in cmdline for marker in markers):
+                key = service_key
+                break
+        self._service_by_pid[pid] = (labels, key)
+        return key
+
+    def parse(self, lines) -> dict:
+        """
+        Extract power (microwatts) for target services from an iterable of exposition lines (bytes).
+        Sums across multiple PIDs for same service name.
+        """
+        # Ensure all services appear, even if missing
+        power_data = {key: 0.0 for key, _ in SERVICE_MARKERS}
+        for line in lines:
+            if not line.startswith(METRIC_PREFIX):
+                continue
+            labels, _, value = line[len(METRIC_PREFIX):].rpartition(b"}")
+            key = self._service_of(labels)
+            if key is not None:
+                try:
+                    power_data[key] += float(value.split()[0])
+                except (ValueError, IndexError):
+                    continue
+        return power_data
 
 
-def fetch_metrics() -> str:
+def extract_power_metrics(metrics_text: str) -> dict:
     """
-    Retrieve Scaphandre metrics text from localhost endpoint.
+    Extract power (microwatts) for target services from a complete metrics page.
+    Sums across multiple PIDs for same service name.
     """
-    try:
-        resp = requests.get(SCAPHANDRE_URL, timeout=5)
-        resp.raise_for_status()
-        return resp.text
-    except requests.RequestException as e:
-        print(f"[ScaphandreCollector] Fetch failed: {type(e).__name__}: {e}")
-        return ""
+    return PowerMetricsParser().parse(line.encode() for line in metrics_text.splitlines())
+
+
+class ScaphandreScraper:
+    """Scrapes the Scaphandre exporter over one keep-alive connection and parses the response while streaming it."""
+    def __init__(self, url: str = SCAPHANDRE_URL, timeout: float = FETCH_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.parser = PowerMetricsParser()
+
+    def scrape(self):
+        """
+        Retrieve and parse one metrics page.
+        Returns (power data, scrape latency in seconds), or (None, latency) if the fetch failed.
+        """
+        start = time.monotonic()
+        try:
+            with self.session.get(self.url, timeout=self.timeout, stream=True) as resp:
+                resp.raise_for_status()
+                data = self.parser.parse(resp.iter_lines(chunk_size=65536))
+        except requests.RequestException as e:
+            print(f"[ScaphandreCollector] Fetch failed: {type(e).__name__}: {e}")
+            return None, time.monotonic() - start
+        return data, time.monotonic() - start
+
+    def close(self):
+        self.session.close()
 
 
 def main():
-    print(f"[ScaphandreCollector] Starting. Writing to {OUTPUT_FILE}")
+    parser = argparse.ArgumentParser(description="Record per-service power from Scaphandre.")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE, help="JSONL file to write (truncated at start)")
+    parser.add_argument("--interval", type=float, default=INTERVAL, help="Scrape period in seconds (sub-second is fine)")
+    parser.add_argument("--url", default=SCAPHANDRE_URL, help="Scaphandre Prometheus exporter URL")
+    args = parser.parse_args()
+
+    signal.signal(signal.SIGINT, handle_sigint)
+    signal.signal(signal.SIGTERM, handle_sigint)
+
+    print(f"[ScaphandreCollector] Starting. Scraping {args.url} every {args.interval}s. Writing to {args.output}")
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    scraper = ScaphandreScraper(args.url)
+    batch = []
+    records = 0
+    skipped_ticks = 0
+    last_flush = time.monotonic()
+    deadline = time.monotonic()
 
     # Clear file at start of every run
-    with open(OUTPUT_FILE, "w", encoding="utf-8"):
-        pass
-
-    with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
+    with open(args.output, "w", encoding="utf-8") as f:
         while RUNNING:
-            metrics_text = fetch_metrics()
-            if metrics_text:
-                data = extract_power_metrics(metrics_text)
+            data, latency = scraper.scrape()
+            if data is not None:
                 data["timestamp"] = datetime.now(timezone.utc).isoformat()
-                f.write(json.dumps(data) + "\n")
+                data["scrape_latency_ms"] = round(latency * 1000, 3)
+                batch.append(json.dumps(data))
+
+            now = time.monotonic()
+            if batch and (len(batch) >= BATCH_SIZE or now - last_flush >= FLUSH_INTERVAL):
+                f.write("\n".join(batch) + "\n")
                 f.flush()
-                print(f"[{data['timestamp']}] Recorded: {data}")
-            time.sleep(INTERVAL)
-    print("[ScaphandreCollector] Stopped.")
+                records += len(batch)
+                print(f"[{data['timestamp'] if data else 'n/a'}] Recorded {records} readings so far")
+                batch.clear()
+                last_flush = now
+
+            # Absolute deadlines: fetch and parse time never accumulate into the period
+            deadline += args.interval
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            elif -delay >= args.interval:
+                missed = math.floor(-delay / args.interval)
+                deadline += missed * args.interval
+                skipped_ticks += missed
+
+        if batch:
+            f.write("\n".join(batch) + "\n")
+            records += len(batch)
+
+    scraper.close()
+    print(f"[ScaphandreCollector] Stopped after {records} readings, {skipped_ticks} skipped ticks.")
 
 
 if __name__ == "__main__":
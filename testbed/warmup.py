@@ -1,28 +1,173 @@
-import sys
+#!/usr/bin/env python3
+"""
+Warmup load for the testbed: brings every core to a defined state before a run.
+
+Spawns one worker process per core, each busy for --utilization of every 100 ms period (duty cycle),
+so the whole package runs at the target utilization instead of one core at 100%. Optional phases:
+  --memory-mb  each work unit also copies a share of this many MiB, streaming through memory and the LLC
+  --io-mb      an extra process keeps writing and fsync-ing a file of this size
+
+Once a second the parent prints the mean time per work unit and the mean core frequency. When both
+stay within --tolerance over a --window of seconds, caches and frequencies count as steady and a
+`[Warmup] Steady state ...` line is printed; the load keeps running until --duration or `kill <pid>`.
+
+Usage: python3 warmup.py [--duration 60] [--utilization 0.5] [--processes 32] [--memory-mb 512] [--io-mb 64]
+"""
+
+import argparse
+import glob
+import multiprocessing as mp
+import os
+import signal
+import tempfile
+import time
+from collections import deque
+
+PERIOD = 0.1  # seconds; one duty cycle
+UNIT_ITERATIONS = 2000  # arithmetic iterations per work unit (about a millisecond)
+IO_CHUNK = 1024 * 1024  # bytes per write
+
+# Graceful stop flag
+RUNNING = True
+
+
+def handle_sigint(sig, frame):
+    global RUNNING
+    RUNNING = False
+
+
+def _work_unit(buffer, source, offset: int, span: int) -> int:
+    # Integer/float mix, then (optionally) a bulk copy through memory
+    acc = 0
+    x = 1.0001
+    for i in range(UNIT_ITERATIONS):
+        acc = (acc + i * i) & 0xFFFFFFFF
+        x = x * 1.0000001 + 0.5
+    if span:
+        buffer[offset:offset + span] = source[offset:offset + span]
+    return acc
+
+
+def cpu_worker(utilization: float, memory_bytes: int, stop, reports):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    buffer = bytearray(memory_bytes)
+    source = bytearray(os.urandom(min(memory_bytes, 1024 * 1024))) * max(1, memory_bytes // (1024 * 1024))
+    span = min(len(buffer), len(source), 256 * 1024) if memory_bytes else 0
+    offset = 0
+    units, unit_time, last_report = 0, 0.0, time.monotonic()
+
+    while not stop.is_set():
+        period_start = time.monotonic()
+        busy_until = period_start + PERIOD * utilization
+        while time.monotonic() < busy_until:
+            unit_start = time.perf_counter()
+            _work_unit(buffer, source, offset, span)
+            unit_time += time.perf_counter() - unit_start
+            units += 1
+            if span:
+                offset = (offset + span) % (len(buffer) - span + 1)
+        idle = period_start + PERIOD - time.monotonic()
+        if idle > 0:
+            time.sleep(idle)
+
+        now = time.monotonic()
+        if now - last_report >= 1.0 and units:
+            reports.put(unit_time / units)
+            units, unit_time, last_report = 0, 0.0, now
+
+
+def io_worker(io_bytes: int, directory: str, stop):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    chunk = os.urandom(IO_CHUNK)
+    with tempfile.TemporaryFile(dir=directory) as f:
+        while not stop.is_set():
+            f.seek(0)
+            for _ in range(max(1, io_bytes // IO_CHUNK)):
+                f.write(chunk)
+                if stop.is_set():
+                    break
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def mean_frequency_mhz() -> float:
+    readings = []
+    for path in glob.glob("/sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_cur_freq"):
+        try:
+            with open(path) as f:
+                readings.append(int(f.read()) / 1000)
+        except (OSError, ValueError):
+            continue
+    return sum(readings) / len(readings) if readings else float("nan")
+
+
+def is_steady(window: deque, tolerance: float) -> bool:
+    values = [value for value in window if value == value]  # Drop NaN
+    if len(values) < window.maxlen:
+        return not values and len(window) == window.maxlen  # Signal not available on this machine
+    mean = sum(values) / len(values)
+    return max(values) - min(values) <= tolerance * mean
 
-def fibonacci(n):
-    if n <= 0:
-        return 0
-    elif n == 1:
-        return 1
-    else:
-        return fibonacci(n - 1) + fibonacci(n - 2)
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python warmup.py <n>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to run (default: until killed)")
+    parser.add_argument("--utilization", type=float, default=0.5, help="Target utilization of every core, 0-1")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="Worker processes (default: one per core)")
+    parser.add_argument("--memory-mb", type=int, default=0, help="Memory streamed by the workers, MiB in total")
+    parser.add_argument("--io-mb", type=int, default=0, help="Size of the file rewritten by the I/O phase, MiB")
+    parser.add_argument("--io-dir", default=tempfile.gettempdir(), help="Directory of the I/O phase's file")
+    parser.add_argument("--window", type=int, default=10, help="Seconds the signals must be stable")
+    parser.add_argument("--tolerance", type=float, default=0.02, help="Allowed relative spread within the window")
+    args = parser.parse_args()
+
+    signal.signal(signal.SIGINT, handle_sigint)
+    signal.signal(signal.SIGTERM, handle_sigint)
 
+    stop = mp.Event()
+    reports = mp.Queue()
+    memory_bytes = args.memory_mb * 1024 * 1024 // args.processes
+    workers = [
+        mp.Process(target=cpu_worker, args=(args.utilization, memory_bytes, stop, reports), daemon=True)
+        for _ in range(args.processes)
+    ]
+    if args.io_mb:
+        workers.append(mp.Process(target=io_worker, args=(args.io_mb * 1024 * 1024, args.io_dir, stop), daemon=True))
+    for worker in workers:
+        worker.start()
+    print(f"[Warmup] {args.processes} workers at {args.utilization:.0%} utilization, "
+          f"memory {args.memory_mb} MiB, I/O {args.io_mb} MiB", flush=True)
+
+    start = time.monotonic()
+    unit_times = deque(maxlen=args.window)
+    frequencies = deque(maxlen=args.window)
+    steady_at = None
     try:
-        n = int(sys.argv[1])
-    except ValueError:
-        print("Please provide a valid integer.")
-        sys.exit(1)
-
-    print(f"First {n} Fibonacci numbers:")
-    for i in range(n):
-        print(fibonacci(i), end=' ')
-    print()
+        while RUNNING and (args.duration is None or time.monotonic() - start < args.duration):
+            time.sleep(1.0)
+            samples = []
+            while not reports.empty():
+                samples.append(reports.get_nowait())
+            if not samples:
+                continue
+            unit_times.append(sum(samples) / len(samples))
+            frequencies.append(mean_frequency_mhz())
+            elapsed = time.monotonic() - start
+            print(f"[Warmup] t={elapsed:5.0f}s work unit={unit_times[-1] * 1000:.3f} ms "
+                  f"frequency={frequencies[-1]:.0f} MHz", flush=True)
+            if steady_at is None and is_steady(unit_times, args.tolerance) and is_steady(frequencies, args.tolerance):
+                steady_at = elapsed
+                print(f"[Warmup] Steady state after {steady_at:.0f}s: work unit {unit_times[-1] * 1000:.3f} ms, "
+                      f"frequency {frequencies[-1]:.0f} MHz", flush=True)
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+    if steady_at is None:
+        print("[Warmup] Stopped before reaching a steady state", flush=True)
+
 
 if __name__ == "__main__":
     main()